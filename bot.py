@@ -12,6 +12,7 @@ Fitur:
 
 import asyncio
 import logging
+from functools import partial
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
@@ -19,8 +20,16 @@ from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from config import BOT_TOKEN
+from database.mongodb import check_query_plans, ensure_indexes, ensure_stats
 from handlers import register_all_routers
+from handlers.tools import notify_queue_position, run_check_job
 from middlewares.delete_middleware import AutoDeleteMiddleware
+from middlewares.user_context import UserContextMiddleware
+from services.check_queue import start_workers, stop_workers
+from services.account_pool import uses_free_proxies
+from services.instagram import restore_sessions
+from services.write_buffer import start_write_buffer, stop_write_buffer
+from utils.proxy_fetcher import close_proxy_session, run_proxy_pool
 
 # ── Logging ──
 logging.basicConfig(
@@ -38,6 +47,11 @@ async def main() -> None:
         logger.error("BOT_TOKEN belum diisi! Cek file .env")
         return
 
+    # Index MongoDB (idempotent), cek query yang sering dipakai & statistik awal
+    await ensure_indexes()
+    await check_query_plans()
+    await ensure_stats()
+
     # Buat instance Bot & Dispatcher
     bot = Bot(
         token=BOT_TOKEN,
@@ -45,6 +59,10 @@ async def main() -> None:
     )
     dp = Dispatcher(storage=MemoryStorage())
 
+    # Profil user (bahasa) dimuat sekali per update → data["user"], data["lang"]
+    dp.message.middleware(UserContextMiddleware())
+    dp.callback_query.middleware(UserContextMiddleware())
+
     # Daftarkan middleware auto-delete (berlaku global untuk semua pesan)
     dp.message.middleware(AutoDeleteMiddleware())
 
@@ -56,10 +74,33 @@ async def main() -> None:
     bot_info = await bot.get_me()
     logger.info("Bot @%s berhasil dijalankan!", bot_info.username)
 
+    # Pulihkan session akun IG di background (tidak menunda polling)
+    background = [asyncio.create_task(restore_sessions())]
+
+    # Warm pool proxy gratis (hanya jika ada akun tanpa proxy manual)
+    if uses_free_proxies():
+        background.append(asyncio.create_task(run_proxy_pool()))
+
+    # Penulisan user & history di-batch (write-behind)
+    start_write_buffer()
+
+    # Worker antrean pengecekan auto (bisa ditambah lewat worker.py)
+    start_workers(
+        partial(run_check_job, bot), partial(notify_queue_position, bot)
+    )
+
     # Mulai polling (skip update lama)
     try:
         await dp.start_polling(bot, skip_updates=True)
     finally:
+        for task in background:
+            task.cancel()
+        # Tunggu task background selesai beres-beres (simpan reputasi proxy)
+        await asyncio.gather(*background, return_exceptions=True)
+        await stop_workers()
+        # Setelah worker berhenti → history terakhir ikut tersimpan
+        await stop_write_buffer()
+        await close_proxy_session()
         await bot.session.close()
 
 
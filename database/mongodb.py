@@ -5,12 +5,18 @@ Menggunakan Motor (async driver) agar tidak blocking event loop.
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import logging
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 from config import MONGO_URI, MONGO_DB_NAME
 
+logger = logging.getLogger(__name__)
+
 # ── Inisialisasi koneksi ──
 client = AsyncIOMotorClient(MONGO_URI)
 db = client[MONGO_DB_NAME]
@@ -18,28 +24,188 @@ db = client[MONGO_DB_NAME]
 # ── Koleksi ──
 users_col = db["users"]
 history_col = db["history"]
+ig_sessions_col = db["ig_sessions"]
+snapshot_cache_col = db["snapshot_cache"]
+ig_profiles_col = db["ig_profiles"]
+snapshots_col = db["snapshots"]
+check_jobs_col = db["check_jobs"]
+proxy_reputation_col = db["proxy_reputation"]
+proxy_sources_col = db["proxy_sources"]
+stats_col = db["stats"]              # total global (satu dokumen)
+stats_daily_col = db["stats_daily"]  # rollup per hari, _id = "YYYY-MM-DD"
+stats_active_col = db["stats_active"]  # user aktif per hari (untuk hitung unik)
+
+# Field besar yang tidak perlu diambil saat menampilkan history/statistik
+# (dokumen history lama masih menyimpan daftar unfollowers lengkap)
+_HISTORY_PROJECTION = {"unfollowers": 0}
+
+# Status job yang masih "hidup" (satu per user)
+_OPEN_JOB_STATUSES = ["pending", "running"]
+
+
+# ═══════════════════════════════════════════
+#  INDEX — dibuat saat startup (idempotent)
+# ═══════════════════════════════════════════
+
+JOB_RETENTION = 7 * 24 * 60 * 60         # job dead/cancelled dihapus setelah 7 hari
+REPUTATION_RETENTION = 7 * 24 * 60 * 60  # reputasi proxy yang tidak dites lagi
+ACTIVE_RETENTION = 2 * 24 * 60 * 60      # penanda user aktif cukup untuk hari ini
+
+_INDEXES = {
+    users_col: [
+        IndexModel([("user_id", ASCENDING)], unique=True),
+    ],
+    history_col: [
+        IndexModel([("user_id", ASCENDING), ("checked_at", DESCENDING)]),
+    ],
+    ig_sessions_col: [
+        IndexModel([("username", ASCENDING)], unique=True),
+    ],
+    snapshot_cache_col: [
+        IndexModel([("user_pk", ASCENDING)], unique=True),
+    ],
+    ig_profiles_col: [
+        IndexModel([("username", ASCENDING)], unique=True),
+        # Profil kedaluwarsa dihapus otomatis oleh MongoDB
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    snapshots_col: [
+        # Satu snapshot per nomor urut → dua job yang menyambung rantai
+        # dari snapshot yang sama tidak bisa membuat cabang
+        IndexModel(
+            [("user_pk", ASCENDING), ("seq", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"seq": {"$exists": True}},
+            name="user_pk_seq",
+        ),
+        # Keyframe terakhir & rantai diff sesudahnya
+        IndexModel([
+            ("user_pk", ASCENDING), ("kind", ASCENDING),
+            ("seq", DESCENDING), ("taken_at", DESCENDING),
+        ]),
+        # Snapshot lama (sebelum ada seq)
+        IndexModel([("user_pk", ASCENDING), ("taken_at", ASCENDING)]),
+    ],
+    check_jobs_col: [
+        # Satu job pending/running per user (butuh MongoDB 6.0+ untuk $in)
+        IndexModel(
+            [("user_id", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"status": {"$in": _OPEN_JOB_STATUSES}},
+            name="user_id_open_job",
+        ),
+        IndexModel([("status", ASCENDING), ("run_after", ASCENDING)]),
+        # Hanya job dead/cancelled yang punya finished_at
+        IndexModel([("finished_at", ASCENDING)], expireAfterSeconds=JOB_RETENTION),
+    ],
+    proxy_reputation_col: [
+        IndexModel([("url", ASCENDING)], unique=True),
+        IndexModel([("saved_at", ASCENDING)], expireAfterSeconds=REPUTATION_RETENTION),
+    ],
+    proxy_sources_col: [
+        IndexModel([("url", ASCENDING)], unique=True),
+    ],
+    stats_active_col: [
+        IndexModel([("day", ASCENDING), ("user_id", ASCENDING)], unique=True),
+        IndexModel([("batch", ASCENDING)]),
+        IndexModel([("date", ASCENDING)], expireAfterSeconds=ACTIVE_RETENTION),
+    ],
+}
+
+
+async def ensure_indexes() -> None:
+    """
+    Buat semua index yang dibutuhkan query (aman dipanggil berulang).
+    Index yang gagal dibuat (mis. data duplikat lama, versi MongoDB)
+    dicatat di log tanpa menghentikan bot.
+    """
+    for col, indexes in _INDEXES.items():
+        for index in indexes:
+            try:
+                await col.create_indexes([index])
+            except OperationFailure as e:
+                logger.error(
+                    "Gagal membuat index %s.%s: %s",
+                    col.name, index.document["name"], e,
+                )
+
+
+def _plan_stages(plan) -> list[str]:
+    """Semua nama stage di sebuah query plan (rekursif)."""
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in _plan_stages(item)]
+    if not isinstance(plan, dict):
+        return []
+    stages = [plan["stage"]] if "stage" in plan else []
+    for key, value in plan.items():
+        if key != "stage":
+            stages += _plan_stages(value)
+    return stages
+
+
+async def check_query_plans() -> None:
+    """Explain query yang sering dipakai & peringatkan jika COLLSCAN."""
+    queries = [
+        ("users by user_id", users_col.find({"user_id": 0})),
+        (
+            "history by user_id",
+            history_col.find({"user_id": 0}).sort("checked_at", -1).limit(10),
+        ),
+        (
+            "snapshot keyframe",
+            snapshots_col.find({"user_pk": 0, "kind": "full"})
+            .sort([("seq", -1), ("taken_at", -1)]).limit(1),
+        ),
+        (
+            "snapshot chain",
+            snapshots_col.find({"user_pk": 0, "seq": {"$gt": 0}}).sort("seq", 1),
+        ),
+        (
+            "pending jobs",
+            check_jobs_col.find({"status": "pending"}).sort("run_after", 1),
+        ),
+    ]
+    for name, cursor in queries:
+        try:
+            explain = await cursor.explain()
+        except Exception as e:
+            logger.warning("Explain query '%s' gagal: %s", name, e)
+            continue
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        if "COLLSCAN" in stages:
+            logger.warning("Query '%s' memakai COLLSCAN — cek index!", name)
 
 
 # ═══════════════════════════════════════════
 #  USER
 # ═══════════════════════════════════════════
 
-async def save_user(user_id: int, username: str, lang: str = "id") -> None:
-    """Simpan atau update data user (upsert)."""
-    now = datetime.now(timezone.utc)
-    await users_col.update_one(
-        {"user_id": user_id},
-        {
-            "$set": {
-                "user_id": user_id,
-                "username": username,
-                "lang": lang,
-                "updated_at": now,
-            },
-            "$setOnInsert": {"created_at": now},
-        },
-        upsert=True,
-    )
+async def bulk_write_users(updates: dict[int, dict]) -> int:
+    """
+    Tulis banyak perubahan user sekaligus (satu bulk_write).
+
+    Args:
+        updates: user_id → {"set": field baru, "upsert": buat jika belum
+            ada, "created_at": waktu perubahan pertama}
+
+    Returns:
+        jumlah user baru yang dibuat
+    """
+    ops = []
+    for user_id, update in updates.items():
+        if update["upsert"]:
+            ops.append(UpdateOne(
+                {"user_id": user_id},
+                {
+                    "$set": {"user_id": user_id, **update["set"]},
+                    "$setOnInsert": {"created_at": update["created_at"]},
+                },
+                upsert=True,
+            ))
+        else:
+            ops.append(UpdateOne({"user_id": user_id}, {"$set": update["set"]}))
+    res = await users_col.bulk_write(ops, ordered=False)
+    return res.upserted_count
 
 
 async def get_user(user_id: int) -> Optional[dict]:
@@ -47,20 +213,13 @@ async def get_user(user_id: int) -> Optional[dict]:
     return await users_col.find_one({"user_id": user_id})
 
 
-async def set_user_lang(user_id: int, lang: str) -> None:
-    """Ubah bahasa preferensi user."""
-    await users_col.update_one(
-        {"user_id": user_id},
-        {"$set": {"lang": lang}},
+async def get_user_profile(user_id: int) -> Optional[dict]:
+    """Ambil field profil yang dipakai bot saja (username & bahasa)."""
+    return await users_col.find_one(
+        {"user_id": user_id}, {"_id": 0, "username": 1, "lang": 1}
     )
 
 
-async def get_user_lang(user_id: int) -> str:
-    """Ambil bahasa user, default 'id' jika belum ada."""
-    user = await users_col.find_one({"user_id": user_id})
-    return user.get("lang", "id") if user else "id"
-
-
 async def get_all_user_ids() -> list[int]:
     """Ambil semua user_id untuk broadcast."""
     cursor = users_col.find({}, {"user_id": 1})
@@ -72,31 +231,58 @@ async def get_all_user_ids() -> list[int]:
 #  HISTORY
 # ═══════════════════════════════════════════
 
-async def save_history(
+def make_history_doc(
     user_id: int,
     ig_username: str,
     method: str,
     result: dict,
-) -> None:
-    """Simpan riwayat pengecekan unfollowers."""
-    await history_col.insert_one(
-        {
-            "user_id": user_id,
-            "ig_username": ig_username,
-            "method": method,
-            "followers_count": result.get("followers_count", 0),
-            "following_count": result.get("following_count", 0),
-            "unfollowers_count": result.get("unfollowers_count", 0),
-            "unfollowers": result.get("unfollowers", []),
-            "checked_at": datetime.now(timezone.utc),
-        }
-    )
+) -> dict:
+    """Susun dokumen riwayat pengecekan unfollowers."""
+    doc = {
+        # _id dibuat di sini agar insert ulang (retry) tidak menggandakan
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "ig_username": ig_username,
+        "method": method,
+        "followers_count": result.get("followers_count", 0),
+        "following_count": result.get("following_count", 0),
+        "unfollowers_count": result.get("unfollowers_count", 0),
+        # Relasi lengkap ada di koleksi snapshots (hanya metode auto)
+        "ig_user_pk": result.get("user_pk"),
+        "snapshot_id": result.get("snapshot_id"),
+        "checked_at": datetime.now(timezone.utc),
+    }
+    # Ringkasan perubahan sejak snapshot sebelumnya (jika ada)
+    delta = result.get("delta")
+    if delta:
+        doc["lost_followers_count"] = len(delta.get("lost_followers", []))
+        doc["new_followers_count"] = len(delta.get("new_followers", []))
+    return doc
+
+
+async def insert_history(docs: list[dict]) -> list[dict]:
+    """
+    Simpan banyak riwayat sekaligus (dokumen yang sudah ada dilewati).
+
+    Returns:
+        dokumen yang benar-benar baru tersimpan (untuk statistik)
+    """
+    try:
+        await history_col.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # Duplikat _id = sudah tersimpan di percobaan sebelumnya
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+        skipped = {err["index"] for err in errors}
+        return [doc for i, doc in enumerate(docs) if i not in skipped]
+    return docs
 
 
 async def get_history(user_id: int, limit: int = 10) -> list[dict]:
     """Ambil riwayat pengecekan user (terbaru di atas)."""
     cursor = (
-        history_col.find({"user_id": user_id})
+        history_col.find({"user_id": user_id}, _HISTORY_PROJECTION)
         .sort("checked_at", -1)
         .limit(limit)
     )
@@ -107,19 +293,474 @@ async def get_last_check(user_id: int) -> Optional[dict]:
     """Ambil pengecekan terakhir user (untuk statistik)."""
     return await history_col.find_one(
         {"user_id": user_id},
+        _HISTORY_PROJECTION,
         sort=[("checked_at", -1)],
     )
 
 
+# ═══════════════════════════════════════════
+#  SESSION INSTAGRAM — reuse login antar restart
+# ═══════════════════════════════════════════
+
+async def save_ig_session(username: str, settings: str, proxy: str) -> None:
+    """Simpan settings Instagrapi (JSON) & proxy yang dipakai saat login."""
+    await ig_sessions_col.update_one(
+        {"username": username},
+        {
+            "$set": {
+                "username": username,
+                "settings": settings,
+                "proxy": proxy,
+                "updated_at": datetime.now(timezone.utc),
+            },
+        },
+        upsert=True,
+    )
+
+
+async def get_ig_session(username: str) -> Optional[dict]:
+    """Ambil session Instagrapi tersimpan untuk akun IG tertentu."""
+    return await ig_sessions_col.find_one({"username": username})
+
+
+# ═══════════════════════════════════════════
+#  CACHE SNAPSHOT — hasil followers/following per akun IG
+# ═══════════════════════════════════════════
+
+async def save_cached_snapshot(user_pk: int, snapshot: dict) -> None:
+    """Simpan hasil pengecekan terbaru satu akun IG (satu dokumen per pk)."""
+    await snapshot_cache_col.update_one(
+        {"user_pk": user_pk},
+        {"$set": snapshot},
+        upsert=True,
+    )
+
+
+async def get_cached_snapshot(user_pk: int, min_fetched_at: float) -> Optional[dict]:
+    """Ambil snapshot akun IG jika diambil setelah min_fetched_at (epoch)."""
+    return await snapshot_cache_col.find_one(
+        {"user_pk": user_pk, "fetched_at": {"$gte": min_fetched_at}},
+    )
+
+
+# ═══════════════════════════════════════════
+#  CACHE PROFIL — username IG → pk / status
+# ═══════════════════════════════════════════
+
+async def save_ig_profile(username: str, profile: dict, expires_at: datetime) -> None:
+    """Simpan profil (atau hasil negatif) username IG sampai expires_at."""
+    await ig_profiles_col.replace_one(
+        {"username": username},
+        {"username": username, **profile, "expires_at": expires_at},
+        upsert=True,
+    )
+
+
+async def get_ig_profile(username: str, now: datetime) -> Optional[dict]:
+    """Ambil profil username IG yang belum kedaluwarsa."""
+    return await ig_profiles_col.find_one(
+        {"username": username, "expires_at": {"$gt": now}},
+    )
+
+
+# ═══════════════════════════════════════════
+#  SNAPSHOT RELASI — followers/following terkompres per akun IG
+# ═══════════════════════════════════════════
+
+async def insert_snapshot(doc: dict):
+    """
+    Simpan satu snapshot relasi (full/diff), return _id-nya.
+    Return None jika nomor urut (seq) sudah dipakai proses lain.
+    """
+    try:
+        res = await snapshots_col.insert_one(doc)
+    except DuplicateKeyError:
+        # Job lain sudah menyambung rantai dari snapshot yang sama
+        return None
+    return res.inserted_id
+
+
+async def get_snapshot_chain(user_pk: int) -> list[dict]:
+    """
+    Ambil keyframe terakhir akun IG beserta semua diff sesudahnya
+    (urut lama → baru). List kosong jika belum ada snapshot.
+    """
+    keyframe = await snapshots_col.find_one(
+        {"user_pk": user_pk, "kind": "full"},
+        sort=[("seq", -1), ("taken_at", -1)],
+    )
+    if not keyframe:
+        return []
+    if "seq" in keyframe:
+        cursor = snapshots_col.find(
+            {"user_pk": user_pk, "seq": {"$gt": keyframe["seq"]}}
+        ).sort("seq", 1)
+    else:
+        # Keyframe lama tanpa seq — diff sesudahnya diurutkan per waktu
+        cursor = snapshots_col.find(
+            {"user_pk": user_pk, "taken_at": {"$gt": keyframe["taken_at"]}}
+        ).sort([("seq", 1), ("taken_at", 1)])
+    return [keyframe] + await cursor.to_list(length=None)
+
+
+# ═══════════════════════════════════════════
+#  ANTREAN CEK — job pengecekan auto (dipakai bersama semua worker)
+# ═══════════════════════════════════════════
+
+async def insert_check_job(doc: dict) -> Optional[dict]:
+    """
+    Simpan job baru jika user belum punya job pending/running.
+    Return dokumen job, atau None jika user sudah punya job.
+    """
+    try:
+        res = await check_jobs_col.update_one(
+            {"user_id": doc["user_id"], "status": {"$in": _OPEN_JOB_STATUSES}},
+            {"$setOnInsert": doc},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Upsert bersamaan dari proses lain (index user_id_open_job)
+        return None
+    if res.upserted_id is None:
+        return None
+    return {**doc, "_id": res.upserted_id}
+
+
+async def claim_check_job(worker_id: str, lease_seconds: int) -> Optional[dict]:
+    """
+    Ambil satu job secara atomik (find-and-modify): job pending yang
+    sudah waktunya, atau job running yang lease-nya habis (worker mati).
+    """
+    now = datetime.now(timezone.utc)
+    return await check_jobs_col.find_one_and_update(
+        {
+            "$or": [
+                {"status": "pending", "run_after": {"$lte": now}},
+                {"status": "running", "lease_until": {"$lt": now}},
+            ]
+        },
+        {
+            "$set": {
+                "status": "running",
+                "worker_id": worker_id,
+                "lease_until": now + timedelta(seconds=lease_seconds),
+                "started_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("run_after", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def renew_check_job(job_id, worker_id: str, lease_seconds: int) -> bool:
+    """Perpanjang lease job. False jika job sudah bukan milik worker ini."""
+    res = await check_jobs_col.update_one(
+        {"_id": job_id, "worker_id": worker_id, "status": "running"},
+        {"$set": {
+            "lease_until": datetime.now(timezone.utc)
+            + timedelta(seconds=lease_seconds),
+        }},
+    )
+    return res.matched_count == 1
+
+
+async def finish_check_job(job_id, worker_id: str) -> None:
+    """Job selesai (atau dibatalkan) → hapus dari antrean."""
+    await check_jobs_col.delete_one({"_id": job_id, "worker_id": worker_id})
+
+
+async def retry_check_job(
+    job_id, worker_id: str, run_after: datetime, error: str
+) -> None:
+    """Kembalikan job ke antrean untuk dicoba lagi setelah run_after."""
+    await check_jobs_col.update_one(
+        {"_id": job_id, "worker_id": worker_id, "status": "running"},
+        {"$set": {
+            "status": "pending",
+            "run_after": run_after,
+            "last_error": error,
+            "worker_id": None,
+        }},
+    )
+
+
+async def release_check_job(job_id, worker_id: str) -> None:
+    """Worker berhenti (deploy) → job kembali ke antrean tanpa dihitung gagal."""
+    await check_jobs_col.update_one(
+        {"_id": job_id, "worker_id": worker_id, "status": "running"},
+        {
+            "$set": {"status": "pending", "worker_id": None},
+            "$inc": {"attempts": -1},
+        },
+    )
+
+
+async def bury_check_job(job_id, worker_id: str, error: str) -> None:
+    """Job gagal terus → pindahkan ke status dead (dead-letter)."""
+    await check_jobs_col.update_one(
+        {"_id": job_id, "worker_id": worker_id},
+        {"$set": {
+            "status": "dead",
+            "last_error": error,
+            "finished_at": datetime.now(timezone.utc),
+        }},
+    )
+
+
+async def cancel_check_job(user_id: int) -> Optional[dict]:
+    """
+    Batalkan job milik user. Job pending langsung dihapus; job running
+    ditandai cancelled (worker pemiliknya berhenti saat heartbeat).
+    Return job-nya jika ada.
+    """
+    job = await check_jobs_col.find_one_and_delete(
+        {"user_id": user_id, "status": "pending"}
+    )
+    if job is not None:
+        return job
+    return await check_jobs_col.find_one_and_update(
+        {"user_id": user_id, "status": "running"},
+        {"$set": {
+            "status": "cancelled",
+            "finished_at": datetime.now(timezone.utc),
+        }},
+    )
+
+
+async def get_pending_jobs(limit: int) -> list[dict]:
+    """Job yang menunggu, urut sesuai giliran."""
+    cursor = check_jobs_col.find(
+        {"status": "pending"},
+        {"user_id": 1, "chat_id": 1, "message_id": 1, "username": 1,
+         "lang": 1, "position": 1},
+    ).sort("run_after", 1)
+    return await cursor.to_list(length=limit)
+
+
+async def set_job_position(job_id, position: int) -> None:
+    """Catat posisi antrean terakhir yang sudah diberitahukan ke user."""
+    await check_jobs_col.update_one(
+        {"_id": job_id}, {"$set": {"position": position}}
+    )
+
+
+async def count_check_jobs() -> dict:
+    """Jumlah job per status."""
+    pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+    return {
+        doc["_id"]: doc["count"]
+        async for doc in check_jobs_col.aggregate(pipeline)
+    }
+
+
+# ═══════════════════════════════════════════
+#  REPUTASI PROXY — hasil validasi per proxy & per sumber daftar proxy
+# ═══════════════════════════════════════════
+
+async def save_proxy_reputation(entries: list[dict]) -> None:
+    """
+    Upsert reputasi beberapa proxy sekaligus (key: url).
+    Penulis terakhir menang: EWMA tidak bisa digabung dari dua proses,
+    jadi reputasi proxy yang sama dari proses lain ditimpa.
+    """
+    if not entries:
+        return
+    now = datetime.now(timezone.utc)
+    await proxy_reputation_col.bulk_write(
+        [
+            UpdateOne(
+                {"url": entry["url"]},
+                {"$set": {**entry, "saved_at": now}},
+                upsert=True,
+            )
+            for entry in entries
+        ],
+        ordered=False,
+    )
+
+
+async def load_proxy_reputation(limit: int) -> list[dict]:
+    """Reputasi proxy yang paling baru diperbarui (urut lama → baru)."""
+    cursor = proxy_reputation_col.find({}, {"_id": 0, "saved_at": 0})
+    docs = await cursor.sort("saved_at", -1).to_list(length=limit)
+    docs.reverse()
+    return docs
+
+
+async def save_proxy_sources(deltas: dict[str, dict]) -> dict[str, dict]:
+    """
+    Tambahkan counter per sumber daftar proxy ($inc, key: url).
+    Yang dikirim delta sejak flush terakhir, bukan total — beberapa proses
+    bisa menulis sumber yang sama tanpa saling menimpa.
+    Return: delta yang gagal ditulis (untuk dicoba lagi di flush berikutnya).
+    """
+    if not deltas:
+        return {}
+    urls = list(deltas)
+    try:
+        await proxy_sources_col.bulk_write(
+            [
+                UpdateOne({"url": url}, {"$inc": deltas[url]}, upsert=True)
+                for url in urls
+            ],
+            ordered=False,
+        )
+    except BulkWriteError as e:
+        # ordered=False → op lain tetap jalan; hanya yang error diulang
+        return {
+            urls[err["index"]]: deltas[urls[err["index"]]]
+            for err in e.details.get("writeErrors", [])
+        }
+    return {}
+
+
+async def load_proxy_sources() -> list[dict]:
+    return await proxy_sources_col.find({}, {"_id": 0}).to_list(length=None)
+
+
 # ═══════════════════════════════════════════
 #  ADMIN — Statistik Global
+#  Dijaga dengan $inc setiap ada user baru / riwayat baru, jadi panel
+#  admin cukup membaca beberapa dokumen kecil tanpa menghitung ulang.
+#  Tiap batch punya id; dokumen statistik mencatat id batch terakhir
+#  yang sudah ditambahkan, jadi batch yang diulang tidak terhitung dua kali
 # ═══════════════════════════════════════════
 
-async def get_total_users() -> int:
-    """Hitung total user terdaftar."""
-    return await users_col.count_documents({})
+_TOTALS_ID = "totals"
+RECENT_BATCHES = 100  # id batch terakhir yang diingat per dokumen statistik
+
+
+def _day(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d")
+
+
+async def ensure_stats() -> None:
+    """
+    Isi dokumen total dari data lama jika belum ada (sekali, saat startup).
+    Rollup harian mulai terisi sejak fitur ini aktif.
+    """
+    if await stats_col.find_one({"_id": _TOTALS_ID}, {"_id": 1}):
+        return
+    users = await users_col.count_documents({})
+    checks = await history_col.count_documents({})
+    await stats_col.update_one(
+        {"_id": _TOTALS_ID},
+        {"$setOnInsert": {"users": users, "checks": checks}},
+        upsert=True,
+    )
+    logger.info("Statistik awal: %d user, %d pengecekan", users, checks)
+
+
+def _inc_once(doc_id: str, batch_id: str, fields: dict) -> UpdateOne:
+    """
+    $inc yang hanya berlaku sekali per batch untuk satu dokumen statistik.
+    Tanpa upsert (dokumen dibuat dulu oleh _inc_stats_once): tidak ada
+    dokumen yang cocok = batch ini sudah diterapkan.
+    """
+    return UpdateOne(
+        {"_id": doc_id, "batches": {"$ne": batch_id}},
+        {
+            "$inc": fields,
+            "$push": {"batches": {"$each": [batch_id], "$slice": -RECENT_BATCHES}},
+        },
+    )
+
+
+async def _bulk_write_once(col, ops: list) -> None:
+    """
+    bulk_write upsert murni ($setOnInsert) yang menganggap duplicate key
+    sebagai "dokumen sudah ada" (dibuat proses lain di saat bersamaan).
+    """
+    try:
+        await col.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+
+
+async def _inc_stats_once(col, batch_id: str, docs: dict[str, dict]) -> None:
+    """
+    Tambahkan counter ke beberapa dokumen statistik, sekali per batch.
+    Dokumen dibuat dulu dengan upsert murni per _id (aman bentrok saat dua
+    proses membuat dokumen hari baru), baru kemudian $inc tanpa upsert —
+    jadi duplicate key tidak pernah menelan penambahan.
+    """
+    await _bulk_write_once(col, [
+        UpdateOne({"_id": doc_id}, {"$setOnInsert": {"batches": []}}, upsert=True)
+        for doc_id in docs
+    ])
+    result = await col.bulk_write(
+        [_inc_once(doc_id, batch_id, fields) for doc_id, fields in docs.items()],
+        ordered=False,
+    )
+    if result.matched_count < len(docs):
+        logger.debug(
+            "Batch statistik %s sudah diterapkan di %d dokumen",
+            batch_id, len(docs) - result.matched_count,
+        )
+
+
+async def record_stats(batch_id: str, new_users: int, history: list[dict]) -> None:
+    """
+    Tambahkan user baru & riwayat baru ke total dan rollup harian.
+    Aman diulang dengan batch_id yang sama (mis. setelah gagal di tengah).
+
+    Args:
+        batch_id: id unik batch, tetap sama saat batch diulang
+        new_users: jumlah user yang baru dibuat (hasil bulk_write_users)
+        history: dokumen riwayat yang baru tersimpan (hasil insert_history)
+    """
+    now = datetime.now(timezone.utc)
+    daily: dict[str, dict] = {}
+
+    def inc(day: str, field: str, amount: int = 1) -> None:
+        fields = daily.setdefault(day, {})
+        fields[field] = fields.get(field, 0) + amount
+
+    if new_users:
+        inc(_day(now), "new_users", new_users)
+    for doc in history:
+        day = _day(doc["checked_at"])
+        inc(day, "checks")
+        inc(day, f"methods.{doc['method']}")
+        inc(day, "unfollowers", doc.get("unfollowers_count", 0))
+
+    # User aktif dihitung unik per hari: penanda (hari, user) dibuat sekali
+    # & mencatat batch pembuatnya, jadi saat batch diulang penanda yang
+    # sama tetap terhitung untuk batch ini
+    active = {(_day(doc["checked_at"]), doc["user_id"]) for doc in history}
+    if active:
+        await _bulk_write_once(stats_active_col, [
+            UpdateOne(
+                {"day": day, "user_id": user_id},
+                {"$setOnInsert": {"date": now, "batch": batch_id}},
+                upsert=True,
+            )
+            for day, user_id in active
+        ])
+        async for marker in stats_active_col.find({"batch": batch_id}, {"day": 1}):
+            inc(marker["day"], "active_users")
+
+    if new_users or history:
+        await _inc_stats_once(stats_col, batch_id, {
+            _TOTALS_ID: {"users": new_users, "checks": len(history)},
+        })
+    if daily:
+        await _inc_stats_once(stats_daily_col, batch_id, daily)
+
+
+async def get_stats_totals() -> dict:
+    """Total user & pengecekan (satu dokumen)."""
+    doc = await stats_col.find_one({"_id": _TOTALS_ID}) or {}
+    return {"users": doc.get("users", 0), "checks": doc.get("checks", 0)}
 
 
-async def get_total_checks() -> int:
-    """Hitung total pengecekan yang pernah dilakukan."""
-    return await history_col.count_documents({})
+async def get_daily_stats(days: int) -> list[dict]:
+    """Rollup harian `days` hari terakhir (terbaru di atas, hari kosong dilewati)."""
+    since = _day(datetime.now(timezone.utc) - timedelta(days=days - 1))
+    cursor = stats_daily_col.find(
+        {"_id": {"$gte": since}}, {"batches": 0}
+    ).sort("_id", -1)
+    return await cursor.to_list(length=days)
@@ -4,6 +4,7 @@ Menampilkan statistik global & fitur broadcast.
 """
 
 import logging
+from datetime import datetime, timedelta, timezone
 
 from aiogram import Router, F
 from aiogram.fsm.context import FSMContext
@@ -12,12 +13,18 @@ from aiogram.types import Message
 
 from config import ADMIN_IDS
 from database.mongodb import (
-    get_user_lang,
-    get_total_users,
-    get_total_checks,
     get_all_user_ids,
+    get_daily_stats,
+    get_stats_totals,
 )
+from services.account_pool import get_account_stats
+from services.check_queue import get_queue_stats
+from services.profile_cache import get_profile_cache_stats
+from services.snapshot_cache import get_snapshot_cache_stats
+from services.user_cache import get_user_cache_stats
+from services.write_buffer import get_write_buffer_stats
 from utils.auto_delete import mark_important
+from utils.proxy_fetcher import get_proxy_stats
 from utils.helpers import MenuFilter
 from utils.i18n import get_text
 
@@ -25,6 +32,8 @@ logger = logging.getLogger(__name__)
 
 router = Router()
 
+TREND_DAYS = 7  # tren dibandingkan dengan periode yang sama sebelumnya
+
 
 # ── FSM untuk broadcast ──
 class AdminStates(StatesGroup):
@@ -36,10 +45,9 @@ class AdminStates(StatesGroup):
 # ══════════════════════════════════════════════
 
 @router.message(MenuFilter("menu_admin"))
-async def menu_admin(message: Message) -> None:
+async def menu_admin(message: Message, lang: str) -> None:
     """Tampilkan panel admin — hanya untuk admin."""
     user_id = message.from_user.id
-    lang = await get_user_lang(user_id)
 
     # Cek akses admin
     if user_id not in ADMIN_IDS:
@@ -49,31 +57,129 @@ async def menu_admin(message: Message) -> None:
         )
         return
 
-    total_users = await get_total_users()
-    total_checks = await get_total_checks()
+    totals = await get_stats_totals()
 
-    sent = await message.answer(
-        get_text(
-            "admin_panel",
-            lang,
-            total_users=total_users,
-            total_checks=total_checks,
-        ),
-        parse_mode="HTML",
+    text = get_text(
+        "admin_panel",
+        lang,
+        total_users=totals["users"],
+        total_checks=totals["checks"],
     )
+    text += _format_trend(lang, await get_daily_stats(2 * TREND_DAYS))
+    text += _format_ig_accounts(lang)
+    text += get_text("admin_antrean", lang, **await get_queue_stats())
+    text += get_text("admin_proxy", lang, **get_proxy_stats())
+    text += get_text("admin_cache", lang, **get_snapshot_cache_stats())
+    text += get_text("admin_profile_cache", lang, **get_profile_cache_stats())
+    text += get_text("admin_user_cache", lang, **get_user_cache_stats())
+    text += get_text("admin_write_buffer", lang, **get_write_buffer_stats())
+
+    sent = await message.answer(text, parse_mode="HTML")
     mark_important(message.chat.id, sent.message_id)
 
 
+def _format_trend(lang: str, daily: list[dict]) -> str:
+    """Susun ringkasan hari ini & tren mingguan dari rollup harian."""
+    today = datetime.now(timezone.utc).date()
+    by_day = {doc["_id"]: doc for doc in daily}
+
+    def day(offset: int) -> dict:
+        return by_day.get((today - timedelta(days=offset)).isoformat(), {})
+
+    def average(docs: list[dict]) -> float:
+        checks = sum(doc.get("checks", 0) for doc in docs)
+        unfollowers = sum(doc.get("unfollowers", 0) for doc in docs)
+        return round(unfollowers / checks, 1) if checks else 0
+
+    week = [day(i) for i in range(TREND_DAYS)]
+    prev_week = [day(i) for i in range(TREND_DAYS, 2 * TREND_DAYS)]
+    week_checks = sum(doc.get("checks", 0) for doc in week)
+    prev_checks = sum(doc.get("checks", 0) for doc in prev_week)
+    if prev_checks:
+        trend = f"{(week_checks - prev_checks) * 100 / prev_checks:+.0f}%"
+    else:
+        trend = "—"
+
+    current = week[0]
+    methods = current.get("methods", {})
+    return get_text(
+        "admin_trend",
+        lang,
+        checks=current.get("checks", 0),
+        auto=methods.get("auto", 0),
+        manual=methods.get("manual", 0),
+        active_users=current.get("active_users", 0),
+        new_users=current.get("new_users", 0),
+        avg_unfollowers=average([current]),
+        days=TREND_DAYS,
+        week_checks=week_checks,
+        trend=trend,
+        week_avg=average(week),
+        series=" · ".join(str(doc.get("checks", 0)) for doc in reversed(week)),
+    )
+
+
+def _format_ig_accounts(lang: str) -> str:
+    """Susun ringkasan pemakaian per akun IG di pool."""
+    accounts = get_account_stats()
+    text = get_text("admin_ig_title", lang)
+    if not accounts:
+        return text + get_text("admin_ig_kosong", lang)
+
+    for acc in accounts:
+        if acc["quarantine_left"]:
+            status = get_text(
+                "admin_ig_karantina",
+                lang,
+                minutes=acc["quarantine_left"] // 60 + 1,
+                reason=acc["last_error"],
+            )
+        elif acc["logged_in"]:
+            status = get_text("admin_ig_siap", lang)
+        else:
+            status = get_text("admin_ig_belum_login", lang)
+
+        gov = acc["governor"]
+        if gov["state"] == "open":
+            circuit = get_text(
+                "admin_circuit_open", lang, minutes=gov["open_left"] // 60 + 1
+            )
+        elif gov["state"] == "half_open":
+            circuit = get_text("admin_circuit_half_open", lang)
+        else:
+            circuit = get_text("admin_circuit_closed", lang)
+
+        text += get_text(
+            "admin_ig_item",
+            lang,
+            username=acc["username"],
+            status=status,
+            active=acc["active"],
+            total_checks=acc["total_checks"],
+            total_errors=acc["total_errors"],
+        )
+        text += get_text(
+            "admin_ig_governor",
+            lang,
+            circuit=circuit,
+            rate=gov["rate"],
+            max_rate=gov["max_rate"],
+            throttles=gov["throttles"],
+        )
+    return text
+
+
 # ══════════════════════════════════════════════
 #  BROADCAST — kirim pesan ke semua user
 #  (Fitur tambahan admin, gunakan command /broadcast)
 # ══════════════════════════════════════════════
 
 @router.message(F.text == "/broadcast")
-async def cmd_broadcast(message: Message, state: FSMContext) -> None:
+async def cmd_broadcast(
+    message: Message, state: FSMContext, lang: str
+) -> None:
     """Admin memulai broadcast."""
     user_id = message.from_user.id
-    lang = await get_user_lang(user_id)
 
     if user_id not in ADMIN_IDS:
         await message.answer(
@@ -92,10 +198,11 @@ async def cmd_broadcast(message: Message, state: FSMContext) -> None:
 
 
 @router.message(AdminStates.waiting_broadcast, F.text)
-async def process_broadcast(message: Message, state: FSMContext) -> None:
+async def process_broadcast(
+    message: Message, state: FSMContext, lang: str
+) -> None:
     """Proses & kirim broadcast ke semua user."""
     user_id = message.from_user.id
-    lang = await get_user_lang(user_id)
     broadcast_text = message.text
 
     user_ids = await get_all_user_ids()
@@ -5,7 +5,7 @@ Handler History — menampilkan riwayat pengecekan unfollowers user
 from aiogram import Router
 from aiogram.types import Message
 
-from database.mongodb import get_user_lang, get_history
+from database.mongodb import get_history
 from utils.auto_delete import mark_important
 from utils.helpers import MenuFilter
 from utils.i18n import get_text
@@ -14,10 +14,9 @@ router = Router()
 
 
 @router.message(MenuFilter("menu_history"))
-async def menu_history(message: Message) -> None:
+async def menu_history(message: Message, lang: str) -> None:
     """Tampilkan 10 riwayat pengecekan terakhir."""
     user_id = message.from_user.id
-    lang = await get_user_lang(user_id)
 
     # Ambil riwayat dari database
     records = await get_history(user_id, limit=10)
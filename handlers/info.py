@@ -5,7 +5,6 @@ Handler Info — menampilkan informasi & bantuan penggunaan bot
 from aiogram import Router
 from aiogram.types import Message
 
-from database.mongodb import get_user_lang
 from utils.auto_delete import mark_important
 from utils.helpers import MenuFilter
 from utils.i18n import get_text
@@ -14,9 +13,8 @@ router = Router()
 
 
 @router.message(MenuFilter("menu_info"))
-async def menu_info(message: Message) -> None:
+async def menu_info(message: Message, lang: str) -> None:
     """Tampilkan halaman info & bantuan."""
-    lang = await get_user_lang(message.from_user.id)
 
     sent = await message.answer(
         get_text("info", lang),
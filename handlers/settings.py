@@ -6,9 +6,9 @@ from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 
 from config import ADMIN_IDS
-from database.mongodb import get_user_lang, set_user_lang, save_user
 from keyboards.inline_kb import bahasa_kb
 from keyboards.reply_kb import main_menu_kb
+from services.user_cache import save_user, set_user_lang
 from utils.auto_delete import safe_delete, mark_important
 from utils.helpers import MenuFilter
 from utils.i18n import get_text
@@ -17,9 +17,8 @@ router = Router()
 
 
 @router.message(MenuFilter("menu_settings"))
-async def menu_settings(message: Message) -> None:
+async def menu_settings(message: Message, lang: str) -> None:
     """Tampilkan pengaturan — pilih bahasa."""
-    lang = await get_user_lang(message.from_user.id)
 
     sent = await message.answer(
         get_text("pengaturan", lang),
@@ -32,20 +31,18 @@ async def menu_settings(message: Message) -> None:
 # ── Callback: ganti bahasa ──
 
 @router.callback_query(F.data.startswith("lang_"))
-async def cb_change_lang(callback: CallbackQuery) -> None:
+async def cb_change_lang(callback: CallbackQuery, user: dict) -> None:
     """Proses perubahan bahasa dari InlineKeyboard."""
     user_id = callback.from_user.id
     new_lang = callback.data.replace("lang_", "")  # "id" atau "en"
 
     await callback.answer()
 
-    # Simpan bahasa baru ke database
-    await set_user_lang(user_id, new_lang)
-    await save_user(
-        user_id,
-        callback.from_user.username or "",
-        new_lang,
-    )
+    # Simpan bahasa baru ke database (user baru sekalian didaftarkan)
+    if user["registered"]:
+        set_user_lang(user_id, new_lang)
+    else:
+        save_user(user_id, callback.from_user.username or "", new_lang)
 
     # Hapus pesan pengaturan lama
     await safe_delete(
@@ -9,8 +9,8 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
 from config import ADMIN_IDS
-from database.mongodb import save_user, get_user_lang
 from keyboards.reply_kb import main_menu_kb
+from services.user_cache import save_user
 from utils.auto_delete import safe_delete, mark_important
 from utils.helpers import MenuFilter
 from utils.i18n import get_text
@@ -19,17 +19,19 @@ router = Router()
 
 
 @router.message(CommandStart())
-async def cmd_start(message: Message, state: FSMContext) -> None:
+async def cmd_start(
+    message: Message, state: FSMContext, user: dict, lang: str
+) -> None:
     """Command /start — tampilkan welcome & menu utama."""
     # Reset state FSM jika ada
     await state.clear()
 
     user_id = message.from_user.id
     username = message.from_user.username or ""
-    lang = await get_user_lang(user_id)
 
-    # Simpan/update data user di database
-    await save_user(user_id, username, lang)
+    # Simpan/update data user di database (dilewati jika tidak berubah)
+    if not user["registered"] or user["username"] != username:
+        save_user(user_id, username, lang)
 
     is_admin = user_id in ADMIN_IDS
 
@@ -43,13 +45,12 @@ async def cmd_start(message: Message, state: FSMContext) -> None:
 
 
 @router.message(MenuFilter("kembali"))
-async def btn_kembali(message: Message, state: FSMContext) -> None:
+async def btn_kembali(message: Message, state: FSMContext, lang: str) -> None:
     """Tombol 🔙 Kembali — kembali ke menu utama."""
     # Reset state FSM
     await state.clear()
 
     user_id = message.from_user.id
-    lang = await get_user_lang(user_id)
     is_admin = user_id in ADMIN_IDS
 
     # Kirim menu utama (ditandai penting)
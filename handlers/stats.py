@@ -5,7 +5,7 @@ Handler Statistik — menampilkan statistik pengecekan terakhir user
 from aiogram import Router
 from aiogram.types import Message
 
-from database.mongodb import get_user_lang, get_last_check
+from database.mongodb import get_last_check
 from utils.auto_delete import mark_important
 from utils.helpers import MenuFilter, calculate_ratio
 from utils.i18n import get_text
@@ -14,10 +14,9 @@ router = Router()
 
 
 @router.message(MenuFilter("menu_stats"))
-async def menu_stats(message: Message) -> None:
+async def menu_stats(message: Message, lang: str) -> None:
     """Tampilkan statistik pengecekan terakhir."""
     user_id = message.from_user.id
-    lang = await get_user_lang(user_id)
 
     # Ambil pengecekan terakhir dari database
     last = await get_last_check(user_id)
@@ -36,17 +35,24 @@ async def menu_stats(message: Message) -> None:
         last.get("following_count", 0),
     )
 
-    sent = await message.answer(
-        get_text(
-            "stats_title",
-            lang,
-            username=last.get("ig_username", "-"),
-            following=last.get("following_count", 0),
-            followers=last.get("followers_count", 0),
-            ratio=ratio,
-            unfollowers=last.get("unfollowers_count", 0),
-        ),
-        parse_mode="HTML",
+    text = get_text(
+        "stats_title",
+        lang,
+        username=last.get("ig_username", "-"),
+        following=last.get("following_count", 0),
+        followers=last.get("followers_count", 0),
+        ratio=ratio,
+        unfollowers=last.get("unfollowers_count", 0),
     )
+    # Perubahan sejak pengecekan sebelumnya (hanya jika ada snapshot lama)
+    if "lost_followers_count" in last:
+        text += get_text(
+            "stats_delta",
+            lang,
+            lost=last["lost_followers_count"],
+            new=last.get("new_followers_count", 0),
+        )
+
+    sent = await message.answer(text, parse_mode="HTML")
     # Pesan statistik penting — tidak dihapus
     mark_important(message.chat.id, sent.message_id)
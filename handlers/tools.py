@@ -5,9 +5,11 @@ Menggunakan FSM (Finite State Machine) untuk alur percakapan.
 """
 
 import io
+import time
 import logging
 
 from aiogram import Router, F, Bot
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import (
@@ -17,23 +19,30 @@ from aiogram.types import (
     BufferedInputFile,
 )
 
-from database.mongodb import get_user_lang, save_history
-from keyboards.inline_kb import metode_cek_kb
+from keyboards.inline_kb import batal_cek_kb, metode_cek_kb
 from keyboards.reply_kb import back_kb, main_menu_kb
-from services.instagram import (
-    check_unfollowers_auto,
-    parse_instagram_zip,
-    parse_instagram_json,
+from services.check_queue import (
+    RetryJob,
+    cancel_check,
+    enqueue_check,
+    is_last_attempt,
 )
+from services.instagram import check_unfollowers_auto
+from services.parse_pool import parse_file
+from services.write_buffer import record_history
 from utils.auto_delete import safe_delete, mark_important
 from utils.helpers import MenuFilter, format_unfollowers_list
 from utils.i18n import get_text
+from utils.spool import spool_document
 from config import ADMIN_IDS
 
 logger = logging.getLogger(__name__)
 
 router = Router()
 
+# Jeda minimal antar edit pesan progress (hindari limit Telegram)
+PROGRESS_INTERVAL = 2.0
+
 
 # ── FSM States ──
 class CheckStates(StatesGroup):
@@ -47,9 +56,8 @@ class CheckStates(StatesGroup):
 # ══════════════════════════════════════════════
 
 @router.message(MenuFilter("menu_cek"))
-async def menu_cek_unfollowers(message: Message) -> None:
+async def menu_cek_unfollowers(message: Message, lang: str) -> None:
     """Tampilkan pilihan metode pengecekan (InlineKeyboard)."""
-    lang = await get_user_lang(message.from_user.id)
 
     sent = await message.answer(
         get_text("pilih_metode", lang),
@@ -64,9 +72,10 @@ async def menu_cek_unfollowers(message: Message) -> None:
 # ══════════════════════════════════════════════
 
 @router.callback_query(F.data == "cek_auto")
-async def cb_cek_auto(callback: CallbackQuery, state: FSMContext) -> None:
+async def cb_cek_auto(
+    callback: CallbackQuery, state: FSMContext, lang: str
+) -> None:
     """User memilih metode Auto → minta username IG."""
-    lang = await get_user_lang(callback.from_user.id)
     await callback.answer()
 
     # Hapus pesan pilihan metode
@@ -91,9 +100,10 @@ async def cb_cek_auto(callback: CallbackQuery, state: FSMContext) -> None:
 # ══════════════════════════════════════════════
 
 @router.callback_query(F.data == "cek_manual")
-async def cb_cek_manual(callback: CallbackQuery, state: FSMContext) -> None:
+async def cb_cek_manual(
+    callback: CallbackQuery, state: FSMContext, lang: str
+) -> None:
     """User memilih metode Manual → minta upload file."""
-    lang = await get_user_lang(callback.from_user.id)
     await callback.answer()
 
     # Hapus pesan pilihan metode
@@ -118,9 +128,11 @@ async def cb_cek_manual(callback: CallbackQuery, state: FSMContext) -> None:
 # ══════════════════════════════════════════════
 
 @router.message(CheckStates.waiting_username, F.text)
-async def process_username(message: Message, state: FSMContext) -> None:
-    """Proses username yang dikirim user — cek unfollowers via Instagrapi."""
-    lang = await get_user_lang(message.from_user.id)
+async def process_username(
+    message: Message, state: FSMContext, lang: str
+) -> None:
+    """Proses username yang dikirim user — masukkan pengecekan ke antrean."""
+    user_id = message.from_user.id
     username = message.text.strip().lstrip("@").lower()
 
     # Validasi format username sederhana
@@ -131,55 +143,154 @@ async def process_username(message: Message, state: FSMContext) -> None:
         )
         return
 
-    # Kirim pesan proses
+    # Kirim pesan proses (di-update dengan posisi antrean & progress)
     proses_msg = await message.answer(
         get_text("proses", lang),
+        reply_markup=batal_cek_kb(lang),
         parse_mode="HTML",
     )
 
-    # Jalankan pengecekan
-    result = await check_unfollowers_auto(username)
-
-    # Hapus pesan "sedang memproses"
-    await safe_delete(message.bot, message.chat.id, proses_msg.message_id)
+    # Pengecekan dijalankan worker antrean; hasil dikirim oleh job
+    queued = await enqueue_check(
+        user_id, message.chat.id, proses_msg.message_id, username, lang
+    )
+    await state.clear()
 
-    if not result["success"]:
-        # Tangani error spesifik
-        error = result.get("error", "")
-        if error == "private_account":
-            error_text = get_text("error_private", lang, username=username)
-        elif error in ("user_not_found",):
-            error_text = get_text("error_username", lang)
-        elif error == "ig_account_error":
-            error_text = get_text("error_ig_account", lang)
-        elif error in ("login_required", "rate_limited"):
-            error_text = get_text("error_ig_login", lang)
-        elif error == "ip_blacklisted":
-            error_text = get_text("error_ip_blacklist", lang)
+    if not queued["success"]:
+        await safe_delete(message.bot, message.chat.id, proses_msg.message_id)
+        if queued["error"] == "already_queued":
+            error_text = get_text("error_antrean_ada", lang)
         else:
-            error_text = get_text("error_umum", lang)
-
+            error_text = get_text("error_antrean_penuh", lang)
         await message.answer(error_text, parse_mode="HTML")
-        await state.clear()
         return
 
-    # Berhasil — tampilkan hasil & simpan history
-    await _send_result(message, lang, username, result, method="auto")
+    if queued["position"]:
+        await notify_queue_position(
+            message.bot,
+            {
+                "user_id": user_id,
+                "chat_id": message.chat.id,
+                "message_id": proses_msg.message_id,
+                "username": username,
+                "lang": lang,
+            },
+            queued["position"],
+        )
 
-    # Simpan ke database
-    await save_history(message.from_user.id, username, "auto", result)
 
-    # Reset FSM
-    await state.clear()
+# ══════════════════════════════════════════════
+#  JOB ANTREAN — dijalankan worker (bot.py / worker.py)
+# ══════════════════════════════════════════════
 
-    # Kembalikan ke menu utama
-    is_admin = message.from_user.id in ADMIN_IDS
-    sent = await message.answer(
-        get_text("welcome", lang),
-        reply_markup=main_menu_kb(lang, is_admin),
-        parse_mode="HTML",
+# Error sementara → job dikembalikan ke antrean & dicoba lagi
+RETRY_ERRORS = ("rate_limited", "login_required")
+
+
+async def run_check_job(bot: Bot, job: dict) -> None:
+    """Cek unfollowers untuk satu job antrean lalu kirim hasilnya ke user."""
+    user_id = job["user_id"]
+    chat_id = job["chat_id"]
+    username = job["username"]
+    lang = job["lang"]
+
+    try:
+        # Jalankan pengecekan (pesan proses di-update dengan progress)
+        result = await check_unfollowers_auto(
+            username,
+            on_progress=_progress_editor(bot, job),
+        )
+
+        if not result["success"]:
+            error = result.get("error", "")
+            if error in RETRY_ERRORS and not is_last_attempt(job):
+                raise RetryJob(error)
+
+        # Hapus pesan "sedang memproses"
+        await safe_delete(bot, chat_id, job["message_id"])
+
+        if not result["success"]:
+            # Tangani error spesifik
+            if error == "private_account":
+                error_text = get_text("error_private", lang, username=username)
+            elif error in ("user_not_found",):
+                error_text = get_text("error_username", lang)
+            elif error == "ig_account_error":
+                error_text = get_text("error_ig_account", lang)
+            elif error in ("login_required", "rate_limited"):
+                error_text = get_text("error_ig_login", lang)
+            elif error == "ip_blacklisted":
+                error_text = get_text("error_ip_blacklist", lang)
+            else:
+                error_text = get_text("error_umum", lang)
+
+            await bot.send_message(chat_id, error_text, parse_mode="HTML")
+            return
+
+        # Berhasil — tampilkan hasil & simpan history
+        await _send_result(bot, chat_id, lang, username, result, method="auto")
+
+        # Simpan ke database
+        record_history(user_id, username, "auto", result)
+
+        # Kembalikan ke menu utama
+        await _send_menu(bot, chat_id, lang, user_id)
+    except TelegramForbiddenError:
+        # User memblokir bot selama pengecekan — hasil tidak bisa dikirim
+        logger.info(
+            "User %s tidak bisa dihubungi, hasil @%s dibuang", user_id, username
+        )
+    except RetryJob:
+        raise
+    except Exception:
+        # Percobaan terakhir gagal → beri tahu user sebelum job dibuang
+        if is_last_attempt(job):
+            await safe_delete(bot, chat_id, job["message_id"])
+            await bot.send_message(
+                chat_id, get_text("error_umum", lang), parse_mode="HTML"
+            )
+        raise
+
+
+async def notify_queue_position(bot: Bot, job: dict, position: int) -> None:
+    """Edit pesan proses dengan posisi antrean terkini."""
+    lang = job["lang"]
+    try:
+        await bot.edit_message_text(
+            get_text(
+                "antrean_posisi", lang, position=position, username=job["username"]
+            ),
+            chat_id=job["chat_id"],
+            message_id=job["message_id"],
+            reply_markup=batal_cek_kb(lang),
+            parse_mode="HTML",
+        )
+    except TelegramForbiddenError:
+        await cancel_check(job["user_id"])  # User memblokir bot → batalkan job
+    except TelegramAPIError:
+        pass  # Pesan sudah dihapus / tidak berubah / kena limit
+
+
+# ══════════════════════════════════════════════
+#  CALLBACK — batalkan pengecekan auto
+# ══════════════════════════════════════════════
+
+@router.callback_query(F.data == "cek_batal")
+async def cb_cek_batal(callback: CallbackQuery, lang: str) -> None:
+    """User membatalkan pengecekan yang antre / sedang berjalan."""
+    user_id = callback.from_user.id
+
+    if await cancel_check(user_id):
+        await callback.answer(get_text("cek_dibatalkan", lang))
+    else:
+        await callback.answer(get_text("cek_tidak_ada", lang))
+
+    await safe_delete(
+        callback.bot, callback.message.chat.id, callback.message.message_id
     )
-    mark_important(message.chat.id, sent.message_id)
+
+    # Kembalikan ke menu utama
+    await _send_menu(callback.bot, callback.message.chat.id, lang, user_id)
 
 
 # ══════════════════════════════════════════════
@@ -187,9 +298,8 @@ async def process_username(message: Message, state: FSMContext) -> None:
 # ══════════════════════════════════════════════
 
 @router.message(CheckStates.waiting_file, F.document)
-async def process_file(message: Message, state: FSMContext) -> None:
+async def process_file(message: Message, state: FSMContext, lang: str) -> None:
     """Proses file ZIP/JSON yang diupload user."""
-    lang = await get_user_lang(message.from_user.id)
     doc = message.document
 
     # Validasi tipe file
@@ -207,24 +317,25 @@ async def process_file(message: Message, state: FSMContext) -> None:
         parse_mode="HTML",
     )
 
-    # Download file dari Telegram
-    file = await message.bot.download(doc)
-    file_bytes = file.read()
-
-    # Parse berdasarkan tipe file
-    if file_name.endswith(".zip"):
-        result = parse_instagram_zip(file_bytes)
-    else:
-        result = parse_instagram_json(file_bytes)
+    # Download file dari Telegram ke disk, lalu parse di pool proses
+    # (tidak memblokir event loop, file sementara dihapus otomatis)
+    kind = "zip" if file_name.endswith(".zip") else "json"
+    async with spool_document(message.bot, doc, suffix=f".{kind}") as path:
+        result = await parse_file(kind, path)
 
     # Hapus pesan proses
     await safe_delete(message.bot, message.chat.id, proses_msg.message_id)
 
     if not result["success"]:
-        await message.answer(
-            get_text("error_file", lang),
-            parse_mode="HTML",
-        )
+        error = result.get("error", "")
+        if error == "busy":
+            error_text = get_text("error_sibuk", lang)
+        elif error == "timeout":
+            error_text = get_text("error_file_timeout", lang)
+        else:
+            error_text = get_text("error_file", lang)
+
+        await message.answer(error_text, parse_mode="HTML")
         await state.clear()
         return
 
@@ -232,27 +343,65 @@ async def process_file(message: Message, state: FSMContext) -> None:
     ig_username = file_name.replace(".zip", "").replace(".json", "")
 
     # Berhasil — tampilkan hasil & simpan history
-    await _send_result(message, lang, ig_username, result, method="manual")
+    await _send_result(
+        message.bot, message.chat.id, lang, ig_username, result, method="manual"
+    )
 
-    await save_history(message.from_user.id, ig_username, "manual", result)
+    record_history(message.from_user.id, ig_username, "manual", result)
     await state.clear()
 
     # Kembalikan ke menu utama
-    is_admin = message.from_user.id in ADMIN_IDS
-    sent = await message.answer(
-        get_text("welcome", lang),
-        reply_markup=main_menu_kb(lang, is_admin),
-        parse_mode="HTML",
-    )
-    mark_important(message.chat.id, sent.message_id)
+    await _send_menu(message.bot, message.chat.id, lang, message.from_user.id)
 
 
 # ══════════════════════════════════════════════
 #  HELPER — kirim hasil ke user
 # ══════════════════════════════════════════════
 
+async def _send_menu(bot: Bot, chat_id: int, lang: str, user_id: int) -> None:
+    """Kirim menu utama (ditandai penting)."""
+    is_admin = user_id in ADMIN_IDS
+    sent = await bot.send_message(
+        chat_id,
+        get_text("welcome", lang),
+        reply_markup=main_menu_kb(lang, is_admin),
+        parse_mode="HTML",
+    )
+    mark_important(chat_id, sent.message_id)
+
+
+def _progress_editor(bot: Bot, job: dict):
+    """Buat callback yang meng-edit pesan proses dengan jumlah terkini."""
+    lang = job["lang"]
+    last_edit = 0.0
+
+    async def on_progress(progress: dict) -> None:
+        nonlocal last_edit
+        now = time.monotonic()
+        if now - last_edit < PROGRESS_INTERVAL:
+            return
+        last_edit = now
+        try:
+            await bot.edit_message_text(
+                get_text(
+                    "proses_progress", lang, username=job["username"], **progress
+                ),
+                chat_id=job["chat_id"],
+                message_id=job["message_id"],
+                reply_markup=batal_cek_kb(lang),
+                parse_mode="HTML",
+            )
+        except TelegramForbiddenError:
+            await cancel_check(job["user_id"])  # User memblokir bot → hentikan job
+        except TelegramAPIError:
+            pass  # Pesan sudah dihapus / tidak berubah / kena limit
+
+    return on_progress
+
+
 async def _send_result(
-    message: Message,
+    bot: Bot,
+    chat_id: int,
     lang: str,
     username: str,
     result: dict,
@@ -260,24 +409,39 @@ async def _send_result(
 ) -> None:
     """
     Kirim hasil pengecekan ke user.
-    Jika daftar terlalu panjang → kirim sebagai file TXT.
+    Jika daftar terlalu panjang → kirim juga sebagai file TXT.
+    Jika ada snapshot sebelumnya → tambahkan pesan perubahan followers
+    (delta). Snapshot dipakai bersama semua user bot, jadi daftar penuh
+    tetap selalu dikirim.
     """
     unfollowers = result.get("unfollowers", [])
+    delta = result.get("delta")
+
+    # Keterangan umur data jika hasil diambil dari cache
+    cache_note = ""
+    if result.get("cache_age") is not None:
+        cache_note = get_text(
+            "hasil_cache", lang, minutes=result["cache_age"] // 60
+        )
 
     if not unfollowers:
         # Tidak ada unfollowers
-        sent = await message.answer(
-            get_text("tidak_ada_unfollowers", lang),
+        sent = await bot.send_message(
+            chat_id,
+            get_text("tidak_ada_unfollowers", lang) + cache_note,
             parse_mode="HTML",
         )
-        mark_important(message.chat.id, sent.message_id)
+        mark_important(chat_id, sent.message_id)
+        if delta:
+            await _send_delta(bot, chat_id, lang, delta)
         return
 
     # Format daftar unfollowers (maks 50 untuk chat)
     unfollowers_text = format_unfollowers_list(unfollowers, max_display=50)
 
     # Kirim hasil (pesan penting — tidak dihapus)
-    sent = await message.answer(
+    sent = await bot.send_message(
+        chat_id,
         get_text(
             "hasil_unfollowers",
             lang,
@@ -286,10 +450,10 @@ async def _send_result(
             followers=result["followers_count"],
             unfollowers_count=result["unfollowers_count"],
             unfollowers_list=unfollowers_text,
-        ),
+        ) + cache_note,
         parse_mode="HTML",
     )
-    mark_important(message.chat.id, sent.message_id)
+    mark_important(chat_id, sent.message_id)
 
     # Jika lebih dari 50 unfollowers, kirim file TXT tambahan
     if len(unfollowers) > 50:
@@ -300,8 +464,45 @@ async def _send_result(
             file_content.encode("utf-8"),
             filename=f"unfollowers_{username}.txt",
         )
-        sent_file = await message.answer_document(
+        sent_file = await bot.send_document(
+            chat_id,
             file_buf,
             caption=get_text("file_terlalu_besar", lang),
         )
-        mark_important(message.chat.id, sent_file.message_id)
+        mark_important(chat_id, sent_file.message_id)
+
+    # Perubahan followers sejak snapshot sebelumnya (pesan tambahan)
+    if delta:
+        await _send_delta(bot, chat_id, lang, delta)
+
+
+async def _send_delta(bot: Bot, chat_id: int, lang: str, delta: dict) -> None:
+    """Kirim perubahan followers sejak pengecekan sebelumnya."""
+    lost = delta.get("lost_followers", [])
+    new = delta.get("new_followers", [])
+    since = delta.get("since")
+
+    text = get_text(
+        "delta_title",
+        lang,
+        date=since.strftime("%d/%m/%Y %H:%M") if since else "-",
+    )
+    if not lost and not new:
+        text += get_text("delta_kosong", lang)
+    if lost:
+        text += get_text(
+            "delta_lost",
+            lang,
+            count=len(lost),
+            users=format_unfollowers_list(lost, max_display=30),
+        )
+    if new:
+        text += get_text(
+            "delta_new",
+            lang,
+            count=len(new),
+            users=format_unfollowers_list(new, max_display=30),
+        )
+
+    sent = await bot.send_message(chat_id, text, parse_mode="HTML")
+    mark_important(chat_id, sent.message_id)
@@ -27,6 +27,20 @@ def metode_cek_kb(lang: str = "id") -> InlineKeyboardMarkup:
     )
 
 
+def batal_cek_kb(lang: str = "id") -> InlineKeyboardMarkup:
+    """Tombol batalkan pengecekan auto (antre / berjalan)."""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text=get_text("tombol_batal_cek", lang),
+                    callback_data="cek_batal",
+                ),
+            ],
+        ]
+    )
+
+
 def bahasa_kb() -> InlineKeyboardMarkup:
     """Pilih bahasa: Indonesia / English."""
     return InlineKeyboardMarkup(
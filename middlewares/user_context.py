@@ -0,0 +1,33 @@
+"""
+Middleware User Context — profil user dimuat sekali per update
+Profil (lihat services/user_cache.py) disisipkan ke data handler:
+- user: {"user_id", "username", "lang", "registered"}
+- lang: bahasa user (shortcut, hampir semua handler memakainya)
+"""
+
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from services.user_cache import load_user
+
+
+class UserContextMiddleware(BaseMiddleware):
+    """
+    Middleware yang memuat profil pengirim update sebelum handler
+    dijalankan, jadi handler tidak perlu membaca database sendiri.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        from_user = data.get("event_from_user")
+        if from_user is not None:
+            user = await load_user(from_user.id)
+            data["user"] = user
+            data["lang"] = user["lang"]
+        return await handler(event, data)
@@ -0,0 +1,128 @@
+"""
+Pool akun Instagram untuk metode auto
+Beban pengecekan dibagi ke beberapa akun IG (masing-masing dengan proxy
+& session sendiri), bukan lewat satu akun saja.
+
+Aturan:
+- Pengecekan diarahkan ke akun sehat dengan beban (job aktif) paling kecil
+- Akun yang kena challenge / gagal login masuk karantina sementara
+  & tidak dipilih sampai masa karantina habis
+- Akun yang circuit breaker-nya terbuka (kena throttle, lihat
+  services/rate_governor.py) tidak dipilih sampai boleh di-probe
+"""
+
+from __future__ import annotations
+
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from instagrapi import Client
+
+from config import IG_ACCOUNTS
+from services.rate_governor import Governor
+
+logger = logging.getLogger(__name__)
+
+# ── Lama karantina per jenis masalah (detik) ──
+QUARANTINE_CHALLENGE = 6 * 60 * 60  # challenge / verifikasi keamanan
+QUARANTINE_LOGIN_FAILED = 30 * 60   # gagal login (semua proxy gagal, dll)
+
+
+class IGAccount:
+    """Satu akun IG di pool beserta client, proxy & statistik pemakaiannya."""
+
+    def __init__(self, username: str, password: str, proxy: str = "") -> None:
+        self.username = username
+        self.password = password
+        self.proxy = proxy                   # proxy tetap dari .env (opsional)
+        self.client: Optional[Client] = None  # client yang sudah login
+        self.active = 0                      # pengecekan yang sedang jalan
+        self.total_checks = 0                # total pengecekan sejak start
+        self.total_errors = 0                # total pengecekan gagal
+        self.quarantined_until = 0.0         # epoch akhir karantina
+        self.last_error = ""                 # alasan karantina terakhir
+        self.governor = Governor(username)   # rate limit & circuit breaker
+
+    def is_healthy(self, now: Optional[float] = None) -> bool:
+        """Akun tidak sedang dikarantina & circuit-nya tidak terbuka."""
+        return (
+            (now or time.time()) >= self.quarantined_until
+            and self.governor.available()
+        )
+
+
+# ── Daftar akun dari .env ──
+_accounts: List[IGAccount] = [
+    IGAccount(acc["username"], acc["password"], acc["proxy"])
+    for acc in IG_ACCOUNTS
+]
+
+
+def has_accounts() -> bool:
+    """Cek apakah minimal satu akun IG sudah dikonfigurasi."""
+    return bool(_accounts)
+
+
+def uses_free_proxies() -> bool:
+    """Ada akun tanpa proxy manual → butuh proxy gratis (warm pool)."""
+    return any(not acc.proxy for acc in _accounts)
+
+
+def get_accounts() -> List[IGAccount]:
+    """Semua akun di pool."""
+    return list(_accounts)
+
+
+def pick_account() -> Optional[IGAccount]:
+    """
+    Pilih akun sehat dengan beban paling kecil.
+    Seri → akun dengan total pengecekan paling sedikit (rata).
+    Return None jika semua akun sedang dikarantina / circuit terbuka.
+    """
+    now = time.time()
+    healthy = [acc for acc in _accounts if acc.is_healthy(now)]
+    if not healthy:
+        return None
+    return min(healthy, key=lambda acc: (acc.active, acc.total_checks))
+
+
+@asynccontextmanager
+async def use_account(account: IGAccount) -> AsyncIterator[IGAccount]:
+    """Tandai akun sedang dipakai selama blok berjalan (hitung beban)."""
+    account.active += 1
+    account.total_checks += 1
+    try:
+        yield account
+    finally:
+        account.active -= 1
+
+
+def quarantine(account: IGAccount, seconds: int, reason: str) -> None:
+    """Karantina akun: tidak dipilih sampai `seconds` ke depan."""
+    account.quarantined_until = time.time() + seconds
+    account.last_error = reason
+    account.total_errors += 1
+    logger.warning(
+        "Akun IG @%s dikarantina %d menit (%s)",
+        account.username, seconds // 60, reason,
+    )
+
+
+def get_account_stats() -> List[dict]:
+    """Statistik pemakaian per akun untuk admin panel."""
+    now = time.time()
+    return [
+        {
+            "username": acc.username,
+            "active": acc.active,
+            "total_checks": acc.total_checks,
+            "total_errors": acc.total_errors,
+            "logged_in": acc.client is not None,
+            "quarantine_left": max(0, int(acc.quarantined_until - now)),
+            "last_error": acc.last_error,
+            "governor": acc.governor.stats(),
+        }
+        for acc in _accounts
+    ]
@@ -0,0 +1,282 @@
+"""
+Antrean pengecekan auto (MongoDB)
+Job disimpan di koleksi check_jobs, bukan di memori proses:
+- Antrean tidak hilang saat bot restart / deploy
+- Beberapa proses worker (satu server atau lebih) bisa menguras antrean
+  bersamaan — job diklaim secara atomik (find-and-modify)
+- Job yang berjalan punya lease yang diperpanjang lewat heartbeat; jika
+  worker mati, lease habis & job diambil worker lain
+- Job gagal dicoba ulang dengan backoff, setelah CHECK_MAX_ATTEMPTS kali
+  dipindahkan ke status dead (dead-letter)
+- Satu user hanya boleh punya satu job (menunggu atau berjalan)
+- User yang menunggu diberi tahu posisinya di antrean
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from config import CHECK_MAX_ATTEMPTS, CHECK_QUEUE_SIZE, CHECK_WORKERS
+from database.mongodb import (
+    bury_check_job,
+    cancel_check_job,
+    claim_check_job,
+    count_check_jobs,
+    finish_check_job,
+    get_pending_jobs,
+    insert_check_job,
+    release_check_job,
+    renew_check_job,
+    retry_check_job,
+    set_job_position,
+)
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 60        # job dianggap yatim jika tidak di-heartbeat selama ini
+HEARTBEAT_INTERVAL = 20   # jeda perpanjangan lease
+POLL_INTERVAL = 2.0       # jeda cek antrean saat kosong (job dari proses lain)
+RETRY_BASE = 30           # backoff percobaan ulang: 30s, 60s, 120s, ...
+RETRY_MAX = 10 * 60
+
+# Runner: jalankan pengecekan & kirim hasil ke user
+JobRunner = Callable[[dict], Awaitable[None]]
+# Notifier: kabari user posisinya di antrean
+PositionNotifier = Callable[[dict, int], Awaitable[None]]
+
+
+class RetryJob(Exception):
+    """Dilempar runner untuk mengembalikan job ke antrean (error sementara)."""
+
+
+# ── State worker di proses ini ──
+_worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+_workers: List[asyncio.Task] = []
+_running: Dict[int, asyncio.Task] = {}  # user_id → task job yang berjalan
+_notify_tasks: Set[asyncio.Task] = set()
+_wakeup = asyncio.Event()
+_runner: Optional[JobRunner] = None
+_notifier: Optional[PositionNotifier] = None
+_idle = 0
+_completed = 0
+
+
+def is_last_attempt(job: dict) -> bool:
+    """True jika job tidak akan dicoba ulang lagi setelah percobaan ini."""
+    return job["attempts"] >= CHECK_MAX_ATTEMPTS
+
+
+def _backoff(attempts: int) -> int:
+    return min(RETRY_BASE * 2 ** (attempts - 1), RETRY_MAX)
+
+
+async def _notify_positions() -> None:
+    """Beri tahu job yang menunggu jika posisinya berubah."""
+    if _notifier is None:
+        return
+    jobs = await get_pending_jobs(CHECK_QUEUE_SIZE)
+    # Job terdepan sebanyak worker menganggur langsung diambil
+    for position, job in enumerate(jobs, 1 - _idle):
+        if position <= 0 or job.get("position") == position:
+            continue
+        await set_job_position(job["_id"], position)
+        task = asyncio.create_task(_notifier(job, position))
+        _notify_tasks.add(task)
+        task.add_done_callback(_notify_tasks.discard)
+
+
+async def _heartbeat(job: dict, worker_id: str, task: asyncio.Task) -> None:
+    """Perpanjang lease selama job berjalan; hentikan job jika lease hilang."""
+    while True:
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        try:
+            owned = await renew_check_job(job["_id"], worker_id, LEASE_SECONDS)
+        except Exception as e:
+            logger.warning("Heartbeat job %s gagal: %s", job["_id"], e)
+            continue
+        if not owned:
+            # Dibatalkan user atau lease sudah diambil worker lain
+            logger.info("Job %s bukan milik %s lagi, dihentikan", job["_id"], worker_id)
+            task.cancel()
+            return
+
+
+async def _run_job(job: dict, worker_id: str) -> None:
+    """Jalankan satu job yang sudah diklaim & catat hasilnya."""
+    global _completed
+
+    user_id = job["user_id"]
+    task = asyncio.create_task(_runner(job))
+    _running[user_id] = task
+    heartbeat = asyncio.create_task(_heartbeat(job, worker_id, task))
+    try:
+        await asyncio.wait({task})
+    except asyncio.CancelledError:
+        # Worker dihentikan (deploy) → kembalikan job ke antrean
+        task.cancel()
+        try:
+            await release_check_job(job["_id"], worker_id)
+        except Exception as e:
+            logger.warning("Gagal mengembalikan job %s: %s", job["_id"], e)
+        raise
+    finally:
+        heartbeat.cancel()
+        _running.pop(user_id, None)
+
+    try:
+        if task.cancelled() or task.exception() is None:
+            await finish_check_job(job["_id"], worker_id)
+        elif is_last_attempt(job):
+            logger.error(
+                "Job cek @%s (user %s) gagal %d kali, dipindah ke dead: %s",
+                job["username"], user_id, job["attempts"], task.exception(),
+            )
+            await bury_check_job(job["_id"], worker_id, repr(task.exception()))
+        else:
+            delay = _backoff(job["attempts"])
+            logger.warning(
+                "Job cek @%s (user %s) gagal, dicoba lagi dalam %ds: %s",
+                job["username"], user_id, delay, task.exception(),
+            )
+            await retry_check_job(
+                job["_id"],
+                worker_id,
+                datetime.now(timezone.utc) + timedelta(seconds=delay),
+                repr(task.exception()),
+            )
+    except Exception as e:
+        logger.warning("Gagal update status job %s: %s", job["_id"], e)
+    _completed += 1
+
+
+async def _worker(worker_id: str) -> None:
+    """Klaim job dari antrean & jalankan satu per satu."""
+    global _idle
+
+    while True:
+        try:
+            job = await claim_check_job(worker_id, LEASE_SECONDS)
+        except Exception as e:
+            logger.warning("Gagal mengambil job antrean: %s", e)
+            job = None
+
+        if job is None:
+            # Antrean kosong → tunggu job baru dari proses ini / poll berkala
+            _idle += 1
+            try:
+                await asyncio.wait_for(_wakeup.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                _idle -= 1
+            continue
+
+        try:
+            await _notify_positions()
+        except Exception as e:
+            logger.warning("Gagal update posisi antrean: %s", e)
+        await _run_job(job, worker_id)
+
+
+def _wake_workers() -> None:
+    # set() membangunkan semua worker yang sedang menunggu sekaligus
+    _wakeup.set()
+    _wakeup.clear()
+
+
+async def enqueue_check(
+    user_id: int, chat_id: int, message_id: int, username: str, lang: str
+) -> dict:
+    """
+    Masukkan job ke antrean.
+
+    Returns:
+        {"success": True, "position": n} — n = 0 jika langsung dijalankan
+        {"success": False, "error": "already_queued" | "busy"}
+    """
+    counts = await count_check_jobs()
+    pending = counts.get("pending", 0)
+    if pending >= CHECK_QUEUE_SIZE:
+        return {"success": False, "error": "busy"}
+
+    now = datetime.now(timezone.utc)
+    ahead = pending - _idle
+    position = 0 if ahead < 0 else ahead + 1
+    job = await insert_check_job({
+        "user_id": user_id,
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "username": username,
+        "lang": lang,
+        "status": "pending",
+        "attempts": 0,
+        "position": position,
+        "run_after": now,
+        "created_at": now,
+    })
+    if job is None:
+        return {"success": False, "error": "already_queued"}
+
+    _wake_workers()
+    return {"success": True, "position": position}
+
+
+async def cancel_check(user_id: int) -> bool:
+    """Batalkan job milik user (menunggu atau berjalan). True jika ada."""
+    job = await cancel_check_job(user_id)
+    if job is None:
+        return False
+
+    # Berjalan di proses ini → hentikan sekarang; di proses lain
+    # dihentikan oleh heartbeat worker-nya
+    task = _running.get(user_id)
+    if task is not None:
+        task.cancel()
+    logger.info("Job cek @%s (user %s) dibatalkan", job["username"], user_id)
+    if job["status"] == "pending":
+        try:
+            await _notify_positions()
+        except Exception as e:
+            logger.warning("Gagal update posisi antrean: %s", e)
+    return True
+
+
+def start_workers(
+    runner: JobRunner,
+    notifier: Optional[PositionNotifier] = None,
+    count: int = CHECK_WORKERS,
+) -> None:
+    """Jalankan worker antrean di proses ini (dipanggil sekali saat startup)."""
+    global _runner, _notifier
+    _runner = runner
+    _notifier = notifier
+    for i in range(count):
+        worker_id = f"{_worker_prefix}:{i}"
+        _workers.append(asyncio.create_task(_worker(worker_id)))
+    logger.info("Antrean cek auto: %d worker (%s)", count, _worker_prefix)
+
+
+async def stop_workers() -> None:
+    """Hentikan semua worker; job yang berjalan dikembalikan ke antrean."""
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+async def get_queue_stats() -> dict:
+    """Statistik antrean untuk admin panel."""
+    counts = await count_check_jobs()
+    return {
+        "workers": len(_workers),
+        "active": len(_running),
+        "running": counts.get("running", 0),
+        "pending": counts.get("pending", 0),
+        "dead": counts.get("dead", 0),
+        "completed": _completed,
+    }
@@ -0,0 +1,166 @@
+"""
+Parser file Instagram Data Download (metode manual)
+Dipisah dari services/instagram.py agar proses parsing (pool proses)
+tidak ikut memuat Instagrapi & koneksi database.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import zipfile
+import logging
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Set
+
+from utils.json_stream import iter_json_items
+
+logger = logging.getLogger(__name__)
+
+# ══════════════════════════════════════════════
+#  METODE 2 — MANUAL (Upload file ZIP/JSON)
+# ══════════════════════════════════════════════
+
+def _extract_usernames_from_item(item) -> Iterator[str]:
+    """Ekstrak username dari satu item list Instagram JSON."""
+    if isinstance(item, dict) and "string_list_data" in item:
+        for sd in item["string_list_data"]:
+            val = sd.get("value", "")
+            if val:
+                yield val
+    elif isinstance(item, str):
+        yield item
+
+
+def _followers_key(key: Optional[str]) -> Optional[str]:
+    """Klasifikasi key di file followers*.json."""
+    if key is None or "follower" in key.lower():
+        return "followers"
+    return None
+
+
+def _following_key(key: Optional[str]) -> Optional[str]:
+    """Klasifikasi key di file following*.json."""
+    if key is None or "following" in key.lower():
+        return "following"
+    return None
+
+
+def _single_json_key(key: Optional[str]) -> Optional[str]:
+    """Klasifikasi key di file JSON tunggal (format lama & baru)."""
+    # Single list — anggap ini followers, following perlu file terpisah
+    if key is None:
+        return "followers"
+    lower_key = key.lower()
+    if "follower" in lower_key:
+        return "followers"
+    if "following" in lower_key:
+        return "following"
+    return None
+
+
+def _collect_usernames(
+    stream: BinaryIO,
+    classify: Callable[[Optional[str]], Optional[str]],
+    sets: Dict[str, Set[str]],
+) -> None:
+    """
+    Baca stream JSON secara streaming & masukkan username ke set.
+    Hanya username yang disimpan — item JSON langsung dibuang.
+    """
+    for label, item in iter_json_items(stream, classify):
+        sets[label].update(_extract_usernames_from_item(item))
+
+
+def _build_manual_result(sets: Dict[str, Set[str]]) -> dict:
+    """Susun hasil pengecekan manual dari set followers & following."""
+    followers_set = sets["followers"]
+    following_set = sets["following"]
+
+    if not followers_set and not following_set:
+        return {"success": False, "error": "file_empty"}
+
+    unfollowers = sorted(following_set - followers_set)
+
+    return {
+        "success": True,
+        "followers_count": len(followers_set),
+        "following_count": len(following_set),
+        "unfollowers": unfollowers,
+        "unfollowers_count": len(unfollowers),
+    }
+
+
+class _MmapFile:
+    """
+    Adapter mmap → file object untuk zipfile.
+    mmap sebelum Python 3.13 belum punya seekable().
+    """
+
+    def __init__(self, mm: mmap.mmap) -> None:
+        self._mm = mm
+
+    def seekable(self) -> bool:
+        return True
+
+    def __getattr__(self, name: str):
+        return getattr(self._mm, name)
+
+
+def parse_instagram_zip(file_path: str) -> dict:
+    """
+    Parse file ZIP dari Instagram Data Download.
+    Mencari followers_1.json dan following.json di dalamnya.
+    File ZIP dibaca langsung dari disk via mmap & JSON di dalamnya dibaca
+    secara streaming (per potongan), jadi pemakaian memori sebanding
+    dengan jumlah username, bukan ukuran export.
+    """
+    try:
+        with open(file_path, "rb") as raw, mmap.mmap(
+            raw.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm, zipfile.ZipFile(_MmapFile(mm)) as zf:
+            sets: Dict[str, Set[str]] = {"followers": set(), "following": set()}
+
+            for name in zf.namelist():
+                # Cocokkan nama file saja — folder export Instagram bernama
+                # "followers_and_following/" sehingga path penuh selalu
+                # mengandung kata "followers"
+                lower = name.rsplit("/", 1)[-1].lower()
+                if not lower.endswith(".json"):
+                    continue
+                # Cari file followers / following
+                if "followers" in lower:
+                    classify = _followers_key
+                elif "following" in lower:
+                    classify = _following_key
+                else:
+                    continue
+                with zf.open(name) as f:
+                    _collect_usernames(f, classify, sets)
+
+            return _build_manual_result(sets)
+    except json.JSONDecodeError:
+        # Harus sebelum ValueError (JSONDecodeError turunan ValueError)
+        return {"success": False, "error": "invalid_json"}
+    except (zipfile.BadZipFile, ValueError):
+        # ValueError: mmap tidak bisa memetakan file kosong
+        return {"success": False, "error": "bad_zip"}
+    except Exception as e:
+        logger.error("Error parse ZIP: %s", e)
+        return {"success": False, "error": str(e)}
+
+
+def parse_instagram_json(file_path: str) -> dict:
+    """
+    Parse file JSON tunggal dari Instagram Data Download.
+    Mendukung format lama & baru.
+    """
+    try:
+        sets: Dict[str, Set[str]] = {"followers": set(), "following": set()}
+        with open(file_path, "rb") as f:
+            _collect_usernames(f, _single_json_key, sets)
+        return _build_manual_result(sets)
+    except json.JSONDecodeError:
+        return {"success": False, "error": "invalid_json"}
+    except Exception as e:
+        logger.error("Error parse JSON: %s", e)
+        return {"success": False, "error": str(e)}
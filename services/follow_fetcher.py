@@ -0,0 +1,146 @@
+"""
+Pengambilan followers/following bertahap (per halaman)
+Daripada satu panggilan user_followers() yang baru selesai setelah
+seluruh daftar terkumpul, daftar diambil per halaman (cursor max_id):
+- Set dibangun bertahap & progress dilaporkan tiap halaman
+- Jika pengambilan terputus (rate limit, error, dibatalkan), cursor &
+  data yang sudah terkumpul disimpan sementara sehingga pengecekan
+  berikutnya untuk akun yang sama melanjutkan, bukan mengulang dari awal
+- Mode incremental: Instagram mengembalikan daftar dari yang terbaru,
+  jadi jika snapshot sebelumnya ada, paging berhenti begitu menemukan
+  deretan panjang user yang sudah dikenal. Hasilnya hanya dipakai jika
+  jumlahnya sama persis dengan jumlah di profil — unfollow di luar
+  halaman yang sudah diambil tidak terlihat, jadi selisih sekecil apa pun
+  berarti daftar diambil penuh. Tetap ada re-sync penuh berkala
+"""
+
+from __future__ import annotations
+
+import time
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from instagrapi import Client
+
+from services.rate_governor import Governor
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 200           # jumlah user per halaman
+RESUME_TTL = 30 * 60      # data setengah jalan dianggap basi setelah 30 menit
+MAX_RESUME_STATES = 50    # batas jumlah fetch setengah jalan yang disimpan
+
+# ── Mode incremental ──
+KNOWN_RUN_STOP = 50              # berhenti setelah sekian user dikenal berturut-turut
+FULL_RESYNC_INTERVAL = 24 * 60 * 60  # re-sync penuh minimal sekali sehari
+
+# Callback progress: menerima jumlah user yang sudah terkumpul
+PageCallback = Callable[[int], Awaitable[None]]
+
+
+class _FetchState:
+    """Progress satu daftar (followers/following) yang sedang diambil."""
+
+    def __init__(self) -> None:
+        self.users: Dict[int, str] = {}  # pk → username
+        self.cursor = ""                 # max_id halaman berikutnya
+        self.updated_at = time.time()
+
+
+# ── Fetch yang terputus, key: (user_pk, kind) ──
+_resume_states: "OrderedDict[Tuple[int, str], _FetchState]" = OrderedDict()
+
+
+def _remember(key: Tuple[int, str], state: _FetchState) -> None:
+    """Simpan progress fetch yang terputus (buang yang paling lama jika penuh)."""
+    _resume_states[key] = state
+    _resume_states.move_to_end(key)
+    while len(_resume_states) > MAX_RESUME_STATES:
+        _resume_states.popitem(last=False)
+
+
+def _take_resume_state(key: Tuple[int, str]) -> _FetchState:
+    """Ambil progress lama jika masih segar, atau mulai baru."""
+    state = _resume_states.pop(key, None)
+    if state is None or time.time() - state.updated_at > RESUME_TTL:
+        return _FetchState()
+    logger.info(
+        "Melanjutkan %s pk=%s dari %d user", key[1], key[0], len(state.users)
+    )
+    return state
+
+
+async def fetch_relationship(
+    cl: Client,
+    governor: Governor,
+    user_pk: int,
+    kind: str,
+    on_page: Optional[PageCallback] = None,
+    known: Optional[Dict[int, str]] = None,
+    expected: Optional[int] = None,
+) -> Tuple[Dict[int, str], bool]:
+    """
+    Ambil followers/following satu akun per halaman.
+
+    Args:
+        governor: governor akun IG pemilik client (batas laju & circuit)
+        kind: "followers" atau "following"
+        on_page: dipanggil setelah tiap halaman dengan jumlah user terkumpul
+        known: daftar dari snapshot sebelumnya → aktifkan mode incremental
+        expected: jumlah di profil IG; jika hasil incremental tidak sama
+            persis (ada yang dihapus) atau tidak diketahui, paging
+            dilanjutkan sampai lengkap
+
+    Returns:
+        (dict pk → username, complete) — complete False berarti hasil
+        incremental (digabung dengan `known`, penghapusan tidak terdeteksi)
+    """
+    if kind == "followers":
+        fetch_chunk = cl.user_followers_v1_chunk
+    else:
+        fetch_chunk = cl.user_following_v1_chunk
+
+    key = (user_pk, kind)
+    state = _take_resume_state(key)
+    known_run = 0  # jumlah user dikenal berturut-turut di akhir halaman
+
+    try:
+        while True:
+            users, next_cursor = await governor.call(
+                fetch_chunk, str(user_pk), PAGE_SIZE, state.cursor
+            )
+            for u in users:
+                pk = int(u.pk)
+                state.users[pk] = u.username
+                if known is not None:
+                    known_run = known_run + 1 if pk in known else 0
+            state.cursor = next_cursor or ""
+            state.updated_at = time.time()
+
+            if on_page:
+                await on_page(len(state.users))
+            if not next_cursor:
+                break
+
+            if known is not None and known_run >= KNOWN_RUN_STOP:
+                merged = {**known, **state.users}
+                if len(merged) == expected:
+                    logger.info(
+                        "Incremental %s pk=%s: berhenti setelah %d user baru",
+                        kind, user_pk, len(state.users),
+                    )
+                    return merged, False
+                # Jumlah tidak cocok → ada yang dihapus, lanjutkan sampai habis
+                logger.info(
+                    "Incremental %s pk=%s tidak cocok (%d vs %s), ambil penuh",
+                    kind, user_pk, len(merged), expected,
+                )
+                known = None
+    except BaseException:
+        # Termasuk CancelledError — simpan agar bisa dilanjutkan
+        if state.users:
+            _remember(key, state)
+        raise
+
+    return state.users, True
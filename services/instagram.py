@@ -1,28 +1,55 @@
 """
 Layanan Instagram — dua metode pengecekan unfollowers:
 1. Auto  : via Instagrapi (unofficial API), user cukup kirim username.
-2. Manual: user upload file ZIP/JSON dari Instagram Data Download.
+2. Manual: user upload file ZIP/JSON dari Instagram Data Download
+           (parser ada di services/export_parser.py).
 """
 
 from __future__ import annotations
 
 import asyncio
 import json
-import io
-import zipfile
 import logging
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
 
 from instagrapi import Client
 from instagrapi.exceptions import (
     LoginRequired,
     ClientError,
     ChallengeRequired,
-    PleaseWaitFewMinutes,
+    UserNotFound,
 )
 
-from config import IG_USERNAME, IG_PASSWORD, IG_PROXY
-from utils.proxy_fetcher import get_best_proxy, blacklist_proxy, format_proxy_for_requests
+from database.mongodb import get_ig_session, save_ig_session
+from services.account_pool import (
+    IGAccount,
+    QUARANTINE_CHALLENGE,
+    QUARANTINE_LOGIN_FAILED,
+    get_accounts,
+    has_accounts,
+    pick_account,
+    quarantine,
+    use_account,
+)
+from services.follow_fetcher import FULL_RESYNC_INTERVAL, fetch_relationship
+from services.rate_governor import THROTTLE_ERRORS, CircuitOpen, Governor
+from services.profile_cache import get_profile, save_negative, save_profile
+from services.snapshot_cache import get_snapshot, put_snapshot
+from services.snapshot_store import (
+    follower_delta,
+    load_latest_snapshot,
+    save_relationship_snapshot,
+)
+from utils.proxy_fetcher import (
+    FAIL_IG_BLACKLISTED,
+    FAIL_LOGIN,
+    get_best_proxy,
+    blacklist_proxy,
+    format_proxy_for_requests,
+    validate_proxy,
+)
+from utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -30,288 +57,427 @@ logger = logging.getLogger(__name__)
 #  METODE 1 — AUTO (Instagrapi)
 # ══════════════════════════════════════════════
 
-# Singleton client Instagram
-_client: Optional[Client] = None
 # Jumlah percobaan proxy sebelum menyerah (tiap percobaan sudah divalidasi)
 MAX_PROXY_RETRIES = 5
 
+# Callback progress pengecekan auto (lihat check_unfollowers_auto)
+ProgressCallback = Callable[[dict], Awaitable[None]]
+
+# Login paralel untuk akun yang sama digabung jadi satu
+_login_flight = SingleFlight()
+
+# Pengecekan paralel untuk username yang sama digabung jadi satu
+_check_flight = SingleFlight()
+_progress_listeners: Dict[str, List[ProgressCallback]] = {}
+
+
+async def _load_session(username: str) -> Optional[dict]:
+    """Ambil session tersimpan; error database tidak boleh menggagalkan login."""
+    try:
+        return await get_ig_session(username)
+    except Exception as e:
+        logger.warning("Gagal baca session @%s: %s", username, e)
+        return None
+
 
-def _is_ig_configured() -> bool:
-    """Cek apakah akun IG sudah dikonfigurasi."""
-    return bool(IG_USERNAME and IG_PASSWORD)
+async def _store_session(account: IGAccount, cl: Client, proxy_url: str) -> None:
+    """Simpan settings Instagrapi agar restart berikutnya tidak login ulang."""
+    try:
+        await save_ig_session(
+            account.username, json.dumps(cl.get_settings()), proxy_url
+        )
+    except Exception as e:
+        logger.warning("Gagal simpan session @%s: %s", account.username, e)
 
 
-async def _try_login_with_proxy(proxy_url: str) -> Client:
-    """Coba login Instagram dengan proxy tertentu."""
+async def _login_with_proxy(
+    account: IGAccount,
+    proxy_url: str,
+    saved: Optional[dict],
+) -> Client:
+    """
+    Login Instagram dengan proxy tertentu.
+    Session tersimpan dicoba dulu — login penuh hanya jika session
+    benar-benar ditolak Instagram (LoginRequired).
+    """
     cl = Client()
-    # Format proxy untuk requests (socks5 → socks5h)
-    req_proxy = format_proxy_for_requests(proxy_url)
-    cl.set_proxy(req_proxy)
-    await asyncio.to_thread(cl.login, IG_USERNAME, IG_PASSWORD)
+    cl.set_proxy(proxy_url)
+
+    if saved and saved.get("settings"):
+        cl.set_settings(json.loads(saved["settings"]))
+        cl.set_proxy(proxy_url)
+        try:
+            await account.governor.call(cl.get_timeline_feed)
+            logger.info("Session tersimpan @%s masih valid.", account.username)
+            return cl
+        except LoginRequired:
+            logger.info("Session @%s kedaluwarsa, login ulang...", account.username)
+            # Login ulang dengan device (uuids) yang sama agar tidak dicurigai
+            uuids = cl.get_settings().get("uuids")
+            cl.set_settings({})
+            if uuids:
+                cl.set_uuids(uuids)
+            cl.set_proxy(proxy_url)
+
+    await account.governor.call(cl.login, account.username, account.password)
     return cl
 
 
-async def _get_client() -> Client:
+async def _connect(account: IGAccount) -> Client:
     """
-    Dapatkan client Instagram yang sudah login (singleton).
+    Login satu akun pool & simpan session-nya.
     Prioritas proxy:
-    1. IG_PROXY dari .env (jika diisi)
-    2. Proxy gratis dari GitHub (auto-rotate & retry)
+    1. Proxy milik akun dari .env (IG_ACCOUNTS / IG_PROXY)
+    2. Proxy terakhir yang dipakai session tersimpan (jika masih jalan)
+    3. Proxy gratis dari GitHub (auto-rotate & retry)
     """
-    global _client
-    if _client is None:
-        if not _is_ig_configured():
-            raise LoginRequired("Akun Instagram belum dikonfigurasi di .env")
-
-        # === Opsi 1: Proxy manual dari .env ===
-        if IG_PROXY:
-            _client = Client()
-            _client.set_proxy(IG_PROXY)
-            logger.info("Menggunakan proxy manual: %s", IG_PROXY.split("@")[-1])
-            try:
-                await asyncio.to_thread(_client.login, IG_USERNAME, IG_PASSWORD)
-                logger.info("Login Instagram berhasil via proxy manual.")
-                return _client
-            except Exception as e:
-                logger.error("Gagal login via proxy manual: %s", e)
-                _client = None
-                raise
+    saved = await _load_session(account.username)
 
-        # === Opsi 2: Proxy gratis dari GitHub (validasi dulu) ===
-        logger.info("IG_PROXY kosong, mencari proxy valid dari GitHub...")
-        for attempt in range(1, MAX_PROXY_RETRIES + 1):
+    # === Opsi 1: Proxy manual dari .env ===
+    if account.proxy:
+        logger.info(
+            "@%s menggunakan proxy manual: %s",
+            account.username, account.proxy.split("@")[-1],
+        )
+        try:
+            cl = await _login_with_proxy(account, account.proxy, saved)
+            logger.info("Login Instagram @%s berhasil via proxy manual.", account.username)
+        except Exception as e:
+            logger.error("Gagal login @%s via proxy manual: %s", account.username, e)
+            raise
+        await _store_session(account, cl, account.proxy)
+        account.client = cl
+        return cl
+
+    # === Opsi 2: Proxy lama dari session tersimpan ===
+    # Session IG lebih awet jika IP tidak berganti-ganti
+    sticky_proxy = saved.get("proxy") if saved else None
+    if sticky_proxy and not await validate_proxy(sticky_proxy):
+        sticky_proxy = None
+
+    # === Opsi 3: Proxy gratis dari GitHub (validasi dulu) ===
+    logger.info("@%s tanpa proxy, mencari proxy valid...", account.username)
+    for attempt in range(1, MAX_PROXY_RETRIES + 1):
+        if sticky_proxy:
+            proxy_url, sticky_proxy = sticky_proxy, None
+        else:
             # get_best_proxy() sudah test koneksi proxy sebelum return
             proxy_url = await get_best_proxy()
-            if not proxy_url:
-                logger.error("Tidak ada proxy tersedia sama sekali.")
-                break
+        if not proxy_url:
+            logger.error("Tidak ada proxy tersedia sama sekali.")
+            break
 
-            logger.info(
-                "Percobaan %d/%d — proxy tervalidasi: %s",
-                attempt, MAX_PROXY_RETRIES, proxy_url
-            )
-            try:
-                _client = await _try_login_with_proxy(proxy_url)
-                logger.info("✓ Login Instagram berhasil via: %s", proxy_url)
-                return _client
-            except Exception as e:
-                err = str(e).lower()
-
-                # Error akun IG → jangan retry, ini bukan masalah proxy
-                if "can't find" in err or "not found" in err or "sign up" in err:
-                    logger.error("Akun IG '%s' tidak ditemukan oleh API!", IG_USERNAME)
-                    raise LoginRequired(
-                        f"Akun Instagram '{IG_USERNAME}' tidak ditemukan. "
-                        "Pastikan username benar & akun sudah diverifikasi."
-                    )
-
-                # Error challenge/2FA → jangan retry
-                if "challenge" in err:
-                    logger.error("IG minta verifikasi challenge!")
-                    raise LoginRequired(
-                        "Instagram minta verifikasi keamanan. "
-                        "Login manual dulu di HP, selesaikan challenge, lalu coba lagi."
-                    )
-
-                if "blacklist" in err:
-                    logger.warning("Proxy %s di-blacklist IG, coba lain...", proxy_url)
-                else:
-                    logger.warning("Proxy %s gagal login IG: %s", proxy_url, e)
-                # Tandai proxy ini gagal agar tidak dipakai lagi
-                blacklist_proxy(proxy_url)
-                _client = None
-
-        # Semua proxy gagal
-        raise LoginRequired(
-            "Semua proxy gagal. Tambahkan proxy residensial di IG_PROXY (.env)"
+        logger.info(
+            "Percobaan %d/%d — proxy tervalidasi: %s",
+            attempt, MAX_PROXY_RETRIES, proxy_url
         )
-    return _client
+        try:
+            # Format proxy untuk requests (socks5 → socks5h)
+            cl = await _login_with_proxy(
+                account, format_proxy_for_requests(proxy_url), saved
+            )
+            logger.info("✓ Login Instagram @%s berhasil via: %s", account.username, proxy_url)
+            await _store_session(account, cl, proxy_url)
+            account.client = cl
+            return cl
+        except (CircuitOpen, *THROTTLE_ERRORS):
+            # Throttle akun, bukan masalah proxy → jangan ganti proxy
+            raise
+        except Exception as e:
+            err = str(e).lower()
+
+            # Error akun IG → jangan retry, ini bukan masalah proxy
+            if "can't find" in err or "not found" in err or "sign up" in err:
+                logger.error("Akun IG '%s' tidak ditemukan oleh API!", account.username)
+                raise LoginRequired(
+                    f"Akun Instagram '{account.username}' tidak ditemukan. "
+                    "Pastikan username benar & akun sudah diverifikasi."
+                )
+
+            # Error challenge/2FA → jangan retry
+            if "challenge" in err:
+                logger.error("IG minta verifikasi challenge untuk @%s!", account.username)
+                raise LoginRequired(
+                    "Instagram minta verifikasi keamanan. "
+                    "Login manual dulu di HP, selesaikan challenge, lalu coba lagi."
+                )
+
+            # Tandai proxy ini gagal agar tidak dipakai lagi (sementara)
+            if "blacklist" in err:
+                logger.warning("Proxy %s di-blacklist IG, coba lain...", proxy_url)
+                blacklist_proxy(proxy_url, FAIL_IG_BLACKLISTED)
+            else:
+                logger.warning("Proxy %s gagal login IG: %s", proxy_url, e)
+                blacklist_proxy(proxy_url, FAIL_LOGIN)
+
+    # Semua proxy gagal
+    raise LoginRequired(
+        "Semua proxy gagal. Tambahkan proxy residensial di IG_PROXY (.env)"
+    )
+
+
+async def _get_client(account: IGAccount) -> Client:
+    """
+    Dapatkan client Instagram yang sudah login untuk satu akun pool.
+    Pemanggil paralel yang mendapati akun belum login berbagi satu
+    proses login yang sama (single-flight), bukan login masing-masing.
+    """
+    if account.client is not None:
+        return account.client
+    return await _login_flight.do(account.username, lambda: _connect(account))
+
+
+async def restore_sessions() -> None:
+    """Pulihkan session semua akun pool saat bot start (di background)."""
+    accounts = get_accounts()
+    results = await asyncio.gather(
+        *(_get_client(acc) for acc in accounts),
+        return_exceptions=True,
+    )
+    for acc, res in zip(accounts, results):
+        if isinstance(res, Exception):
+            logger.warning("Session @%s belum siap: %s", acc.username, res)
+
+
+async def _fetch_unfollowers(
+    cl: Client,
+    governor: Governor,
+    username: str,
+    profile: Optional[dict] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> dict:
+    """
+    Ambil followers & following satu akun lalu hitung unfollowers.
+    Jika profil (pk, jumlah followers) sudah ada di cache, langkah
+    resolve username & user_info dilewati.
+    """
+    fresh_profile = profile is None
+    if profile is None:
+        # Ambil info user
+        try:
+            user_id = await governor.call(cl.user_id_from_username, username)
+        except UserNotFound:
+            await save_negative(username, "user_not_found")
+            return {"success": False, "error": "user_not_found"}
 
+        # Data masih segar di cache → tidak perlu ambil ulang
+        cached = await get_snapshot(int(user_id))
+        if cached:
+            return {"success": True, **cached, "username": username}
+
+        user_info = await governor.call(cl.user_info, user_id)
+        profile = await save_profile(username, user_info)
+
+    # Cek akun private
+    if profile["is_private"]:
+        return {"success": False, "error": "private_account"}
+
+    # Snapshot terakhir → dasar mode incremental & laporan perubahan
+    user_pk = profile["pk"]
+    try:
+        previous = await load_latest_snapshot(user_pk)
+    except Exception as e:
+        logger.warning("Gagal baca snapshot relasi pk=%s: %s", user_pk, e)
+        previous = None
+    incremental = previous is not None and (
+        datetime.now(timezone.utc) - previous["full_sync_at"]
+    ).total_seconds() < FULL_RESYNC_INTERVAL
+
+    # Mode incremental memvalidasi hasil dengan jumlah di profil,
+    # jadi jumlah dari cache profil (bisa berumur 1 jam) diperbarui dulu
+    if incremental and not fresh_profile:
+        user_info = await governor.call(cl.user_info, user_pk)
+        profile = await save_profile(username, user_info)
+        if profile["is_private"]:
+            return {"success": False, "error": "private_account"}
 
-async def check_unfollowers_auto(username: str) -> dict:
+    # Progress berjalan: jumlah terkumpul vs total dari profil
+    progress = {
+        "followers_done": 0,
+        "followers_total": profile["follower_count"],
+        "following_done": 0,
+        "following_total": profile["following_count"],
+    }
+
+    def _reporter(kind: str):
+        async def report(done: int) -> None:
+            progress[f"{kind}_done"] = done
+            if on_progress:
+                await on_progress(dict(progress))
+        return report
+
+    # Ambil followers & following per halaman (di thread terpisah)
+    followers, followers_complete = await fetch_relationship(
+        cl, governor, user_pk, "followers", _reporter("followers"),
+        known=previous["followers"] if incremental else None,
+        expected=profile["follower_count"],
+    )
+    following, following_complete = await fetch_relationship(
+        cl, governor, user_pk, "following", _reporter("following"),
+        known=previous["following"] if incremental else None,
+        expected=profile["following_count"],
+    )
+
+    # Bandingkan: yang di-follow tapi tidak follow-back = unfollowers
+    unfollowers = sorted(
+        following[pk] for pk in following.keys() - followers.keys()
+    )
+
+    # Simpan relasi lengkap (terkompres) & bandingkan dengan snapshot lalu
+    try:
+        snapshot_id = await save_relationship_snapshot(
+            user_pk, followers, following, previous,
+            full_sync=followers_complete and following_complete,
+        )
+    except Exception as e:
+        logger.warning("Gagal simpan snapshot relasi pk=%s: %s", user_pk, e)
+        snapshot_id = None
+    delta = None
+    if previous:
+        delta = await asyncio.to_thread(
+            follower_delta, previous["followers"], followers
+        )
+        delta["since"] = previous["taken_at"]
+
+    result = {
+        "success": True,
+        "username": username,
+        "user_pk": user_pk,
+        "followers_count": len(followers),
+        "following_count": len(following),
+        "unfollowers": unfollowers,
+        "unfollowers_count": len(unfollowers),
+        "snapshot_id": snapshot_id,
+        "delta": delta,
+    }
+    await put_snapshot(user_pk, result)
+    return result
+
+
+async def check_unfollowers_auto(
+    username: str,
+    on_progress: Optional[ProgressCallback] = None,
+) -> dict:
     """
     Cek unfollowers secara otomatis via Instagrapi.
     Hanya bisa untuk akun publik.
+    Pengecekan dijalankan lewat akun pool yang paling sedikit bebannya.
+    on_progress (opsional) dipanggil tiap halaman followers/following
+    dengan dict {followers_done, followers_total, following_done,
+    following_total}.
+
+    Permintaan paralel untuk username yang sama digabung: hanya satu
+    pengambilan ke Instagram, semua penunggu menerima hasil yang sama
+    (progress juga diteruskan ke semua penunggu).
 
     Returns:
         dict: {success, username, followers_count, following_count,
-               unfollowers, unfollowers_count} atau {success, error}
+               unfollowers, unfollowers_count, delta} atau {success, error}.
+               delta = perubahan followers sejak pengecekan sebelumnya
+               ({since, lost_followers, new_followers}) atau None.
+               Hasil dari cache berisi juga cache_age (detik).
     """
-    try:
-        cl = await _get_client()
+    key = username.lower()
+    listeners = _progress_listeners.setdefault(key, [])
+    if on_progress:
+        listeners.append(on_progress)
 
-        # Ambil info user
-        user_id = await asyncio.to_thread(
-            cl.user_id_from_username, username
-        )
-        user_info = await asyncio.to_thread(cl.user_info, user_id)
-
-        # Cek akun private
-        if user_info.is_private:
-            return {"success": False, "error": "private_account"}
+    async def broadcast(progress: dict) -> None:
+        for callback in list(listeners):
+            try:
+                await callback(progress)
+            except Exception as e:
+                logger.debug("Callback progress gagal: %s", e)
 
-        # Ambil followers & following (di thread terpisah)
-        followers_raw = await asyncio.to_thread(cl.user_followers, user_id)
-        following_raw = await asyncio.to_thread(cl.user_following, user_id)
-
-        # Bandingkan: yang di-follow tapi tidak follow-back = unfollowers
-        followers_set = {u.username for u in followers_raw.values()}
-        following_set = {u.username for u in following_raw.values()}
-        unfollowers = sorted(following_set - followers_set)
-
-        return {
-            "success": True,
-            "username": username,
-            "followers_count": len(followers_raw),
-            "following_count": len(following_raw),
-            "unfollowers": unfollowers,
-            "unfollowers_count": len(unfollowers),
-        }
-
-    except (LoginRequired, ChallengeRequired) as e:
-        # Reset client agar login ulang di request berikutnya
-        global _client
-        _client = None
-        err_msg = str(e).lower()
-        # Error akun bot IG tidak ditemukan
-        if "tidak ditemukan" in err_msg or "can't find" in err_msg:
-            return {"success": False, "error": "ig_account_error"}
-        # Error challenge/verifikasi
-        if "challenge" in err_msg or "verifikasi" in err_msg:
-            return {"success": False, "error": "ig_account_error"}
+    try:
+        result = await _check_flight.do(key, lambda: _run_check(key, broadcast))
+    finally:
+        if on_progress:
+            listeners.remove(on_progress)
+        if not listeners and not _check_flight.in_flight(key):
+            _progress_listeners.pop(key, None)
+
+    # Copy per penunggu agar hasil bersama tidak ikut termodifikasi
+    return dict(result)
+
+
+def _drop_blacklisted_proxy(account: IGAccount) -> None:
+    """IP proxy gratis akun diblokir IG → blacklist & login ulang via proxy lain."""
+    if account.proxy or account.client is None:
+        return  # Proxy manual tidak bisa diganti otomatis
+    proxy_url = getattr(account.client, "proxy", None)
+    if proxy_url:
+        blacklist_proxy(proxy_url, FAIL_IG_BLACKLISTED)
+    account.client = None
+
+
+async def _run_check(username: str, on_progress: ProgressCallback) -> dict:
+    """Satu pengecekan auto lewat akun pool (dipanggil via single-flight)."""
+    # Profil & snapshot yang sudah dikenal dijawab tanpa ke Instagram
+    profile = await get_profile(username)
+    if profile and profile.get("error"):
+        return {"success": False, "error": profile["error"]}
+    if profile:
+        cached = await get_snapshot(profile["pk"])
+        if cached:
+            return {"success": True, **cached, "username": username}
+
+    if not has_accounts():
+        logger.error("Akun Instagram belum dikonfigurasi di .env")
         return {"success": False, "error": "login_required"}
-    except PleaseWaitFewMinutes:
-        return {"success": False, "error": "rate_limited"}
-    except ClientError as e:
-        err = str(e).lower()
-        if "not found" in err:
-            return {"success": False, "error": "user_not_found"}
-        # Deteksi error IP blacklist
-        if "blacklist" in err or "change your ip" in err:
-            return {"success": False, "error": "ip_blacklisted"}
-        return {"success": False, "error": str(e)}
-    except Exception as e:
-        err_msg = str(e).lower()
-        # Tangkap error blacklist dari exception umum juga
-        if "blacklist" in err_msg or "change your ip" in err_msg:
-            return {"success": False, "error": "ip_blacklisted"}
-        logger.error("Error cek unfollowers auto: %s", e)
-        return {"success": False, "error": str(e)}
-
-
-# ══════════════════════════════════════════════
-#  METODE 2 — MANUAL (Upload file ZIP/JSON)
-# ══════════════════════════════════════════════
 
-def _extract_usernames_from_list(data: list) -> List[str]:
-    """Ekstrak username dari format list Instagram JSON."""
-    usernames = []
-    for item in data:
-        if isinstance(item, dict) and "string_list_data" in item:
-            for sd in item["string_list_data"]:
-                val = sd.get("value", "")
-                if val:
-                    usernames.append(val)
-        elif isinstance(item, str):
-            usernames.append(item)
-    return usernames
-
-
-def parse_instagram_zip(file_bytes: bytes) -> dict:
-    """
-    Parse file ZIP dari Instagram Data Download.
-    Mencari followers_1.json dan following.json di dalamnya.
-    """
-    try:
-        with zipfile.ZipFile(io.BytesIO(file_bytes)) as zf:
-            followers_data = []
-            following_data = []
-
-            for name in zf.namelist():
-                lower = name.lower()
-                # Cari file followers
-                if "followers" in lower and lower.endswith(".json"):
-                    with zf.open(name) as f:
-                        raw = json.load(f)
-                        if isinstance(raw, list):
-                            followers_data.extend(raw)
-                        elif isinstance(raw, dict):
-                            # Format baru: key relationships_followers
-                            for key in raw:
-                                if "follower" in key.lower():
-                                    followers_data.extend(raw[key])
-                # Cari file following
-                elif "following" in lower and lower.endswith(".json"):
-                    with zf.open(name) as f:
-                        raw = json.load(f)
-                        if isinstance(raw, list):
-                            following_data.extend(raw)
-                        elif isinstance(raw, dict):
-                            for key in raw:
-                                if "following" in key.lower():
-                                    following_data.extend(raw[key])
-
-            if not followers_data and not following_data:
-                return {"success": False, "error": "file_empty"}
-
-            followers_set = set(_extract_usernames_from_list(followers_data))
-            following_set = set(_extract_usernames_from_list(following_data))
-            unfollowers = sorted(following_set - followers_set)
-
-            return {
-                "success": True,
-                "followers_count": len(followers_set),
-                "following_count": len(following_set),
-                "unfollowers": unfollowers,
-                "unfollowers_count": len(unfollowers),
-            }
-    except zipfile.BadZipFile:
-        return {"success": False, "error": "bad_zip"}
-    except Exception as e:
-        logger.error("Error parse ZIP: %s", e)
-        return {"success": False, "error": str(e)}
+    account = pick_account()
+    if account is None:
+        # Semua akun sedang dikarantina / circuit-nya terbuka
+        return {"success": False, "error": "rate_limited"}
 
+    async with use_account(account):
+        try:
+            cl = await _get_client(account)
+            return await _fetch_unfollowers(
+                cl, account.governor, username, profile, on_progress
+            )
 
-def parse_instagram_json(file_bytes: bytes) -> dict:
-    """
-    Parse file JSON tunggal dari Instagram Data Download.
-    Mendukung format lama & baru.
-    """
-    try:
-        data = json.loads(file_bytes)
-        followers_list: List[str] = []
-        following_list: List[str] = []
-
-        if isinstance(data, dict):
-            # Format: {"relationships_followers": [...], ...}
-            for key, val in data.items():
-                lower_key = key.lower()
-                if "follower" in lower_key and isinstance(val, list):
-                    followers_list.extend(_extract_usernames_from_list(val))
-                elif "following" in lower_key and isinstance(val, list):
-                    following_list.extend(_extract_usernames_from_list(val))
-
-        elif isinstance(data, list):
-            # Single list — anggap ini followers, following perlu file terpisah
-            followers_list = _extract_usernames_from_list(data)
-
-        followers_set = set(followers_list)
-        following_set = set(following_list)
-
-        if not followers_set and not following_set:
-            return {"success": False, "error": "file_empty"}
-
-        unfollowers = sorted(following_set - followers_set)
-
-        return {
-            "success": True,
-            "followers_count": len(followers_set),
-            "following_count": len(following_set),
-            "unfollowers": unfollowers,
-            "unfollowers_count": len(unfollowers),
-        }
-    except json.JSONDecodeError:
-        return {"success": False, "error": "invalid_json"}
-    except Exception as e:
-        logger.error("Error parse JSON: %s", e)
-        return {"success": False, "error": str(e)}
+        except (LoginRequired, ChallengeRequired) as e:
+            # Reset client agar login ulang di request berikutnya
+            account.client = None
+            err_msg = str(e).lower()
+            # Error akun bot IG tidak ditemukan
+            if "tidak ditemukan" in err_msg or "can't find" in err_msg:
+                quarantine(account, QUARANTINE_CHALLENGE, "account_not_found")
+                return {"success": False, "error": "ig_account_error"}
+            # Error challenge/verifikasi
+            if (
+                isinstance(e, ChallengeRequired)
+                or "challenge" in err_msg
+                or "verifikasi" in err_msg
+            ):
+                quarantine(account, QUARANTINE_CHALLENGE, "challenge")
+                return {"success": False, "error": "ig_account_error"}
+            if "semua proxy gagal" in err_msg:
+                quarantine(account, QUARANTINE_LOGIN_FAILED, "login_failed")
+            return {"success": False, "error": "login_required"}
+        except (CircuitOpen, *THROTTLE_ERRORS):
+            # Governor sudah membuka circuit akun ini → akun lain dipilih
+            # sampai probe berhasil
+            account.total_errors += 1
+            return {"success": False, "error": "rate_limited"}
+        except ClientError as e:
+            err = str(e).lower()
+            if "not found" in err:
+                return {"success": False, "error": "user_not_found"}
+            # Deteksi error IP blacklist
+            if "blacklist" in err or "change your ip" in err:
+                _drop_blacklisted_proxy(account)
+                return {"success": False, "error": "ip_blacklisted"}
+            account.total_errors += 1
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            err_msg = str(e).lower()
+            # Tangkap error blacklist dari exception umum juga
+            if "blacklist" in err_msg or "change your ip" in err_msg:
+                _drop_blacklisted_proxy(account)
+                return {"success": False, "error": "ip_blacklisted"}
+            logger.error("Error cek unfollowers auto: %s", e)
+            account.total_errors += 1
+            return {"success": False, "error": str(e)}
@@ -0,0 +1,119 @@
+"""
+Pool proses untuk parsing file manual (ZIP/JSON)
+Parsing file besar memakan CPU & bisa lama — kalau dijalankan langsung
+di handler, event loop macet dan semua user lain ikut menunggu.
+
+Cara kerja:
+- Tiap parsing berjalan di proses anak terpisah (slot worker terbatas)
+- Kalau semua slot terpakai, job menunggu di antrian (kedalaman terbatas)
+- Antrian penuh → job langsung ditolak (error "busy")
+- Parsing yang melewati batas waktu → proses anak di-kill
+- Menunggu hasil (poll/recv/join) memakai thread pool sendiri seukuran
+  PARSE_WORKERS, bukan default executor yang dipakai panggilan Instagram
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from config import PARSE_WORKERS, PARSE_QUEUE_SIZE, PARSE_TIMEOUT
+from services.export_parser import parse_instagram_zip, parse_instagram_json
+
+logger = logging.getLogger(__name__)
+
+# forkserver: proses anak di-fork dari server bersih (tanpa thread
+# event loop / motor), lebih aman daripada fork langsung
+_METHOD = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+_ctx = mp.get_context(_METHOD)
+if _METHOD == "forkserver":
+    _ctx.set_forkserver_preload(["services.export_parser"])
+
+# ── State pool ──
+_slots = asyncio.Semaphore(PARSE_WORKERS)  # slot worker aktif
+_waiting = 0                               # job yang sedang antri
+# Satu thread per slot: tiap job hanya memakai satu thread sekaligus
+# (poll → recv → join berurutan), jadi job tidak saling menunggu thread
+_executor = ThreadPoolExecutor(
+    max_workers=max(1, PARSE_WORKERS), thread_name_prefix="parse-pool"
+)
+
+
+def _worker(conn, kind: str, file_path: str) -> None:
+    """Entry point proses anak: parse file & kirim hasil lewat pipe."""
+    try:
+        if kind == "zip":
+            result = parse_instagram_zip(file_path)
+        else:
+            result = parse_instagram_json(file_path)
+        conn.send(result)
+    finally:
+        conn.close()
+
+
+async def _run_in_process(kind: str, file_path: str, timeout: float) -> dict:
+    """Jalankan satu parsing di proses anak, kill jika timeout/dibatalkan."""
+    loop = asyncio.get_running_loop()
+    parent_conn, child_conn = _ctx.Pipe(duplex=False)
+    proc = _ctx.Process(
+        target=_worker,
+        args=(child_conn, kind, file_path),
+        daemon=True,
+    )
+    proc.start()
+    child_conn.close()
+
+    try:
+        ready = await loop.run_in_executor(_executor, parent_conn.poll, timeout)
+        if not ready:
+            logger.warning("Parsing %s melewati %ss, proses di-kill", kind, timeout)
+            return {"success": False, "error": "timeout"}
+        return await loop.run_in_executor(_executor, parent_conn.recv)
+    except EOFError:
+        # Proses anak mati tanpa kirim hasil (OOM, crash)
+        logger.error("Proses parsing %s mati (exitcode=%s)", kind, proc.exitcode)
+        return {"success": False, "error": "parse_crashed"}
+    finally:
+        if proc.is_alive():
+            proc.kill()
+        await loop.run_in_executor(_executor, proc.join)
+        parent_conn.close()
+
+
+async def parse_file(
+    kind: str,
+    file_path: str,
+    timeout: Optional[float] = None,
+) -> dict:
+    """
+    Parse file manual di pool proses tanpa memblokir event loop.
+
+    Args:
+        kind: "zip" atau "json"
+        file_path: path file upload di disk (hanya path yang dikirim
+            ke proses anak, isi file tidak di-copy)
+
+    Returns:
+        dict hasil parsing, atau {success: False, error: "busy"/"timeout"}
+    """
+    global _waiting
+
+    # Tolak jika semua slot terpakai & antrian sudah penuh
+    if _slots.locked() and _waiting >= PARSE_QUEUE_SIZE:
+        logger.warning("Antrian parsing penuh (%d), job ditolak", _waiting)
+        return {"success": False, "error": "busy"}
+
+    _waiting += 1
+    try:
+        await _slots.acquire()
+    finally:
+        _waiting -= 1
+
+    try:
+        return await _run_in_process(kind, file_path, timeout or PARSE_TIMEOUT)
+    finally:
+        _slots.release()
+
@@ -0,0 +1,100 @@
+"""
+Cache username → profil IG (pk, status private, jumlah followers)
+Setiap pengecekan auto diawali user_id_from_username + user_info —
+dua round trip ke Instagram. Dengan cache ini:
+- Username yang baru saja di-resolve tidak perlu ke Instagram lagi
+- Hasil negatif (user_not_found / private_account) juga disimpan,
+  jadi permintaan buruk yang berulang tidak pernah sampai ke Instagram
+
+Dua tingkat: LRU in-process (L1) + koleksi MongoDB (L2, persisten).
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from config import PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL
+from database.mongodb import get_ig_profile, save_ig_profile
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# ── Masa berlaku entri negatif (detik) ──
+NEGATIVE_TTL = {
+    "user_not_found": 60 * 60,   # username bisa saja didaftarkan kemudian
+    "private_account": 30 * 60,  # pemilik bisa membuka akunnya
+}
+
+_l1 = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL)
+
+
+async def get_profile(username: str) -> Optional[dict]:
+    """
+    Ambil profil tersimpan untuk username.
+
+    Returns:
+        None jika belum ada / kedaluwarsa;
+        {"error": ...} untuk entri negatif;
+        {"pk", "is_private", "follower_count", "following_count"}
+    """
+    key = username.lower()
+    profile = _l1.get(key)
+    if profile is not None:
+        return profile
+
+    try:
+        doc = await get_ig_profile(key, datetime.now(timezone.utc))
+    except Exception as e:
+        logger.warning("Gagal baca cache profil @%s: %s", key, e)
+        return None
+    if doc is None:
+        return None
+
+    profile = {
+        field: doc[field]
+        for field in ("pk", "is_private", "follower_count", "following_count", "error")
+        if doc.get(field) is not None
+    }
+    expires_at = doc["expires_at"].replace(tzinfo=timezone.utc)
+    remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+    _l1.set(key, profile, ttl=max(remaining, 0))
+    return profile
+
+
+async def _store(username: str, profile: dict, ttl: float) -> None:
+    """Simpan profil ke L1 & L2 dengan masa berlaku ttl detik."""
+    key = username.lower()
+    _l1.set(key, profile, ttl=ttl)
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+    try:
+        await save_ig_profile(key, profile, expires_at)
+    except Exception as e:
+        logger.warning("Gagal simpan cache profil @%s: %s", key, e)
+
+
+async def save_profile(username: str, user_info) -> dict:
+    """Simpan profil dari objek User Instagrapi, return dict profilnya."""
+    profile = {
+        "pk": int(user_info.pk),
+        "is_private": bool(user_info.is_private),
+        "follower_count": user_info.follower_count,
+        "following_count": user_info.following_count,
+    }
+    if profile["is_private"]:
+        profile["error"] = "private_account"
+        await _store(username, profile, NEGATIVE_TTL["private_account"])
+    else:
+        await _store(username, profile, PROFILE_CACHE_TTL)
+    return profile
+
+
+async def save_negative(username: str, error: str) -> None:
+    """Simpan hasil negatif (mis. user_not_found) agar tidak dicek ulang."""
+    await _store(username, {"error": error}, NEGATIVE_TTL.get(error, 30 * 60))
+
+
+def get_profile_cache_stats() -> dict:
+    """Counter cache profil untuk admin panel."""
+    return _l1.stats()
@@ -0,0 +1,191 @@
+"""
+Governor panggilan Instagram per akun IG
+Semua panggilan Instagrapi lewat Governor akun yang dipakai:
+- Token bucket: maksimal IG_RATE_PER_MINUTE panggilan per menit
+  (boleh burst hingga IG_RATE_BURST); panggilan berikutnya menunggu
+- Adaptif: kena 429 / PleaseWaitFewMinutes → laju dipotong setengah,
+  lalu naik pelan-pelan lagi setiap panggilan berhasil
+- Circuit breaker: kena throttle → circuit "open" & semua panggilan
+  langsung gagal (CircuitOpen) selama cooldown yang naik eksponensial.
+  Setelah cooldown, satu panggilan dijadikan probe ("half-open"):
+  berhasil → circuit tertutup lagi, throttle lagi → open lebih lama
+- Throttle dari panggilan yang sudah berjalan sebelum circuit terbuka
+  adalah bagian dari kejadian yang sama → tidak menambah strike
+- State governor hanya ada di memori proses. Jika beberapa proses
+  (IG_PROCESSES) memakai akun yang sama, laju & burst dibagi rata agar
+  totalnya tetap dalam batas; circuit breaker tidak dibagi antar proses
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+import logging
+from typing import Any, Callable
+
+from instagrapi.exceptions import (
+    ClientThrottledError,
+    PleaseWaitFewMinutes,
+    RateLimitError,
+)
+
+from config import IG_PROCESSES, IG_RATE_BURST, IG_RATE_PER_MINUTE
+
+logger = logging.getLogger(__name__)
+
+# Error Instagram yang berarti "terlalu banyak request"
+THROTTLE_ERRORS = (PleaseWaitFewMinutes, RateLimitError, ClientThrottledError)
+
+# ── Cooldown circuit breaker (detik) ──
+COOLDOWN_BASE = 5 * 60      # throttle pertama
+COOLDOWN_MAX = 2 * 60 * 60  # batas atas setelah throttle berulang
+
+# ── Laju adaptif ──
+MIN_RATE_FACTOR = 0.1       # laju tidak turun di bawah 10% laju normal
+RECOVERY_STEP = 0.02        # tiap panggilan berhasil menaikkan laju 2%
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Circuit akun sedang terbuka — panggilan ditolak tanpa ke Instagram."""
+
+    def __init__(self, username: str, retry_after: float) -> None:
+        super().__init__(
+            f"Circuit @{username} terbuka, coba lagi {int(retry_after)} detik lagi"
+        )
+        self.retry_after = retry_after
+
+
+class Governor:
+    """Token bucket + circuit breaker untuk satu akun IG."""
+
+    def __init__(
+        self,
+        username: str,
+        rate_per_minute: float = IG_RATE_PER_MINUTE / IG_PROCESSES,
+        burst: int = max(1, IG_RATE_BURST // IG_PROCESSES),
+    ) -> None:
+        self.username = username
+        self.max_rate = rate_per_minute / 60.0  # token per detik (normal)
+        self.rate = self.max_rate                # token per detik (saat ini)
+        self.burst = burst
+        self.tokens = float(burst)
+        self.refilled_at = time.monotonic()
+
+        self.state = CLOSED
+        self.open_until = 0.0       # monotonic akhir cooldown
+        self.opened_at = float("-inf")  # monotonic saat circuit terakhir terbuka
+        self.strikes = 0            # throttle berturut-turut (untuk cooldown)
+        self.probing = False        # probe half-open sedang berjalan
+
+        self.total_calls = 0
+        self.total_throttles = 0
+
+    # ── Circuit breaker ──
+
+    def available(self) -> bool:
+        """True jika panggilan baru boleh dicoba (untuk pemilihan akun)."""
+        if self.state == OPEN:
+            return time.monotonic() >= self.open_until
+        if self.state == HALF_OPEN:
+            return not self.probing
+        return True
+
+    def _admit(self) -> bool:
+        """Cek circuit sebelum panggilan. Return True jika ini probe."""
+        if self.state == CLOSED:
+            return False
+        now = time.monotonic()
+        if self.state == OPEN and now < self.open_until:
+            raise CircuitOpen(self.username, self.open_until - now)
+        if self.probing:
+            raise CircuitOpen(self.username, 0)
+        # Cooldown habis → satu panggilan jadi probe
+        self.state = HALF_OPEN
+        self.probing = True
+        logger.info("Circuit @%s half-open, mengirim probe", self.username)
+        return True
+
+    def _on_success(self, probe: bool) -> None:
+        if probe:
+            logger.info("Probe @%s berhasil, circuit ditutup", self.username)
+            self.state = CLOSED
+            self.probing = False
+            self.strikes = 0
+        self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+    def _on_throttle(self, started: float) -> None:
+        self.total_throttles += 1
+        if started < self.opened_at:
+            # Panggilan lama yang baru selesai — circuit sudah dibuka karenanya
+            logger.debug(
+                "Throttle @%s dari panggilan sebelum circuit terbuka, diabaikan",
+                self.username,
+            )
+            return
+        self.strikes += 1
+        self.probing = False
+        self.rate = max(self.max_rate * MIN_RATE_FACTOR, self.rate / 2)
+        cooldown = min(COOLDOWN_BASE * 2 ** (self.strikes - 1), COOLDOWN_MAX)
+        cooldown *= random.uniform(0.9, 1.1)  # jitter agar akun tidak serempak
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.open_until = self.opened_at + cooldown
+        logger.warning(
+            "Akun IG @%s kena throttle (%dx), circuit terbuka %d menit",
+            self.username, self.strikes, cooldown // 60,
+        )
+
+    # ── Token bucket ──
+
+    async def _take_token(self) -> None:
+        """Ambil satu token; tunggu jika bucket kosong."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.refilled_at) * self.rate
+            )
+            self.refilled_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    # ── API ──
+
+    async def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Jalankan panggilan Instagrapi (sync) di thread lewat governor."""
+        probe = self._admit()
+        try:
+            await self._take_token()
+            # Circuit bisa terbuka selama menunggu token → cek ulang
+            probe = probe or self._admit()
+            started = time.monotonic()
+            self.total_calls += 1
+            result = await asyncio.to_thread(fn, *args, **kwargs)
+        except THROTTLE_ERRORS:
+            self._on_throttle(started)
+            raise
+        except BaseException:
+            # Gagal karena hal lain → probe belum membuktikan apa-apa
+            if probe:
+                self.probing = False
+            raise
+        self._on_success(probe)
+        return result
+
+    def stats(self) -> dict:
+        """Kondisi governor untuk admin panel."""
+        return {
+            "state": self.state,
+            "open_left": max(0, int(self.open_until - time.monotonic()))
+            if self.state == OPEN else 0,
+            "rate": round(self.rate * 60, 1),
+            "max_rate": round(self.max_rate * 60, 1),
+            "throttles": self.total_throttles,
+            "calls": self.total_calls,
+        }
@@ -0,0 +1,89 @@
+"""
+Cache hasil followers/following per akun IG (key: user pk)
+Pengecekan ulang akun yang sama dalam beberapa menit tidak perlu
+mengambil ulang semuanya dari Instagram.
+
+Dua tingkat:
+1. L1 — LRU in-process (cepat, terbatas ukuran & TTL)
+2. L2 — koleksi MongoDB (dipakai bersama oleh semua proses bot)
+"""
+
+from __future__ import annotations
+
+import time
+import logging
+from typing import Optional
+
+from config import SNAPSHOT_CACHE_SIZE, SNAPSHOT_CACHE_TTL
+from database.mongodb import get_cached_snapshot, save_cached_snapshot
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Field hasil pengecekan yang disimpan di cache
+_CACHED_FIELDS = (
+    "username",
+    "user_pk",
+    "followers_count",
+    "following_count",
+    "unfollowers",
+    "unfollowers_count",
+    "snapshot_id",
+    "delta",
+)
+
+_l1 = TTLCache(maxsize=SNAPSHOT_CACHE_SIZE, ttl=SNAPSHOT_CACHE_TTL)
+_l2_hits = 0
+
+
+async def get_snapshot(user_pk: int) -> Optional[dict]:
+    """
+    Ambil hasil pengecekan yang masih segar untuk akun ini.
+    Hasil berisi "cache_age" (detik sejak data diambil dari Instagram).
+    """
+    global _l2_hits
+
+    snapshot = _l1.get(user_pk)
+    if snapshot is None:
+        try:
+            snapshot = await get_cached_snapshot(
+                user_pk, time.time() - SNAPSHOT_CACHE_TTL
+            )
+        except Exception as e:
+            logger.warning("Gagal baca cache snapshot pk=%s: %s", user_pk, e)
+            snapshot = None
+        if snapshot is None:
+            return None
+        _l2_hits += 1
+        # Promosikan ke L1 dengan sisa umur data yang sama
+        remaining = SNAPSHOT_CACHE_TTL - (time.time() - snapshot["fetched_at"])
+        _l1.set(user_pk, snapshot, ttl=max(remaining, 0))
+
+    result = {field: snapshot.get(field) for field in _CACHED_FIELDS}
+    result["cache_age"] = int(time.time() - snapshot["fetched_at"])
+    return result
+
+
+async def put_snapshot(user_pk: int, result: dict) -> None:
+    """Simpan hasil pengecekan yang baru diambil ke L1 & L2."""
+    snapshot = {field: result.get(field) for field in _CACHED_FIELDS}
+    snapshot["fetched_at"] = time.time()
+    _l1.set(user_pk, snapshot)
+    try:
+        await save_cached_snapshot(user_pk, snapshot)
+    except Exception as e:
+        logger.warning("Gagal simpan cache snapshot pk=%s: %s", user_pk, e)
+
+
+def get_snapshot_cache_stats() -> dict:
+    """Counter cache untuk admin panel."""
+    stats = _l1.stats()
+    # Miss L1 yang ketemu di L2 bukan miss total
+    return {
+        "size": stats["size"],
+        "maxsize": stats["maxsize"],
+        "l1_hits": stats["hits"],
+        "l2_hits": _l2_hits,
+        "misses": stats["misses"] - _l2_hits,
+        "evictions": stats["evictions"],
+    }
@@ -0,0 +1,219 @@
+"""
+Penyimpanan snapshot relasi (followers & following) per akun IG
+Snapshot disimpan di koleksi terpisah dari history, dalam format ringkas:
+- pk terurut, delta + varint, dikompres zlib (lihat utils/pk_codec.py)
+- Snapshot "full" (keyframe) menyimpan seluruh set
+- Snapshot berikutnya disimpan sebagai "diff" terhadap state sebelumnya
+  (pk yang bertambah, berkurang & ganti username), dan tiap
+  KEYFRAME_INTERVAL snapshot dibuat keyframe baru agar rantai diff pendek
+- full_sync_at mencatat kapan daftar terakhir diambil lengkap (bukan
+  incremental) — dipakai untuk menjadwalkan re-sync penuh
+- Tiap snapshot punya nomor urut (seq) yang unik per akun IG; jika dua
+  job menyambung rantai dari snapshot yang sama, yang kalah membaca
+  ulang snapshot terakhir & menyusun diff-nya lagi
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from database.mongodb import get_snapshot_chain, insert_snapshot
+from utils.pk_codec import decode_names, decode_pks, encode_names, encode_pks
+
+logger = logging.getLogger(__name__)
+
+KEYFRAME_INTERVAL = 10  # maksimal panjang rantai diff sebelum keyframe baru
+SAVE_ATTEMPTS = 3       # percobaan simpan jika rantai disambung job lain
+
+Relation = Dict[int, str]  # pk → username
+
+
+# ══════════════════════════════════════════════
+#  ENCODE / DECODE (CPU — dijalankan di thread)
+# ══════════════════════════════════════════════
+
+def _encode_full(relation: Relation) -> dict:
+    """Encode seluruh set relasi."""
+    pks = sorted(relation)
+    return {
+        "pks": encode_pks(pks),
+        "names": encode_names(relation[pk] for pk in pks),
+    }
+
+
+def _decode_full(data: dict) -> Relation:
+    return dict(zip(decode_pks(data["pks"]), decode_names(data["names"])))
+
+
+def _encode_diff(old: Relation, new: Relation) -> dict:
+    """Encode perubahan old → new (tambah/ganti nama, dan hapus)."""
+    changed = sorted(
+        pk for pk, name in new.items() if old.get(pk) != name
+    )
+    removed = sorted(old.keys() - new.keys())
+    return {
+        "changed_pks": encode_pks(changed),
+        "changed_names": encode_names(new[pk] for pk in changed),
+        "removed_pks": encode_pks(removed),
+    }
+
+
+def _apply_diff(relation: Relation, data: dict) -> None:
+    relation.update(
+        zip(decode_pks(data["changed_pks"]), decode_names(data["changed_names"]))
+    )
+    for pk in decode_pks(data["removed_pks"]):
+        relation.pop(pk, None)
+
+
+def _rebuild(chain: list) -> Tuple[Relation, Relation]:
+    """Susun ulang state terakhir dari keyframe + rantai diff."""
+    followers: Relation = {}
+    following: Relation = {}
+    for doc in chain:
+        if doc["kind"] == "full":
+            followers = _decode_full(doc["followers"])
+            following = _decode_full(doc["following"])
+        else:
+            _apply_diff(followers, doc["followers"])
+            _apply_diff(following, doc["following"])
+    return followers, following
+
+
+def _next_seq(previous: Optional[dict]) -> int:
+    """Nomor urut snapshot berikutnya (snapshot lama tanpa seq dihitung 0)."""
+    if previous is None:
+        return 0
+    return previous["chain"][-1].get("seq", 0) + 1
+
+
+def _build_doc(
+    user_pk: int,
+    followers: Relation,
+    following: Relation,
+    previous: Optional[dict],
+    full_sync: bool,
+) -> dict:
+    """Buat dokumen snapshot baru: keyframe atau diff dari state terakhir."""
+    now = datetime.now(timezone.utc)
+    doc = {
+        "user_pk": user_pk,
+        "seq": _next_seq(previous),
+        "followers_count": len(followers),
+        "following_count": len(following),
+        "taken_at": now,
+        "full_sync_at": now if full_sync or not previous else previous["full_sync_at"],
+    }
+    if previous is None or len(previous["chain"]) >= KEYFRAME_INTERVAL:
+        doc.update(
+            kind="full",
+            followers=_encode_full(followers),
+            following=_encode_full(following),
+        )
+        return doc
+
+    doc.update(
+        kind="diff",
+        base_id=previous["chain"][-1]["_id"],
+        followers=_encode_diff(previous["followers"], followers),
+        following=_encode_diff(previous["following"], following),
+    )
+    return doc
+
+
+def diff_sorted(old: List[int], new: List[int]) -> Tuple[List[int], List[int]]:
+    """
+    Bandingkan dua list pk terurut dalam satu kali merge.
+
+    Returns:
+        (removed, added) — pk yang hanya ada di old, dan yang hanya di new
+    """
+    removed: List[int] = []
+    added: List[int] = []
+    i = j = 0
+    while i < len(old) and j < len(new):
+        if old[i] == new[j]:
+            i += 1
+            j += 1
+        elif old[i] < new[j]:
+            removed.append(old[i])
+            i += 1
+        else:
+            added.append(new[j])
+            j += 1
+    removed.extend(old[i:])
+    added.extend(new[j:])
+    return removed, added
+
+
+def follower_delta(old: Relation, new: Relation) -> dict:
+    """
+    Hitung perubahan followers sejak snapshot sebelumnya.
+
+    Returns:
+        {"lost_followers": [...], "new_followers": [...]} — username terurut
+    """
+    removed, added = diff_sorted(sorted(old), sorted(new))
+    return {
+        "lost_followers": sorted(old[pk] for pk in removed),
+        "new_followers": sorted(new[pk] for pk in added),
+    }
+
+
+# ══════════════════════════════════════════════
+#  API
+# ══════════════════════════════════════════════
+
+async def load_latest_snapshot(user_pk: int) -> Optional[dict]:
+    """
+    Ambil state relasi terakhir akun IG.
+
+    Returns:
+        {followers, following, taken_at, full_sync_at, chain} atau None
+        jika belum ada snapshot. chain dipakai ulang oleh
+        save_relationship_snapshot agar tidak membaca database dua kali.
+    """
+    chain = await get_snapshot_chain(user_pk)
+    if not chain:
+        return None
+    followers, following = await asyncio.to_thread(_rebuild, chain)
+    last = chain[-1]
+    # Snapshot lama (sebelum ada full_sync_at) dianggap hasil fetch penuh
+    full_sync_at = last.get("full_sync_at", last["taken_at"])
+    return {
+        "followers": followers,
+        "following": following,
+        "taken_at": last["taken_at"].replace(tzinfo=timezone.utc),
+        "full_sync_at": full_sync_at.replace(tzinfo=timezone.utc),
+        "chain": chain,
+    }
+
+
+async def save_relationship_snapshot(
+    user_pk: int,
+    followers: Relation,
+    following: Relation,
+    previous: Optional[dict] = None,
+    full_sync: bool = True,
+):
+    """
+    Simpan snapshot relasi akun IG, return _id snapshot baru.
+
+    Args:
+        previous: hasil load_latest_snapshot() (None = snapshot pertama)
+        full_sync: True jika followers & following diambil lengkap
+    """
+    for _ in range(SAVE_ATTEMPTS):
+        doc = await asyncio.to_thread(
+            _build_doc, user_pk, followers, following, previous, full_sync
+        )
+        snapshot_id = await insert_snapshot(doc)
+        if snapshot_id is not None:
+            return snapshot_id
+        # seq sudah dipakai job lain → susun diff dari snapshot terbarunya
+        logger.info("Rantai snapshot pk=%s disambung job lain, ulangi", user_pk)
+        previous = await load_latest_snapshot(user_pk)
+    raise RuntimeError(f"Gagal menyambung rantai snapshot pk={user_pk}")
@@ -0,0 +1,89 @@
+"""
+Cache profil user bot (bahasa & username) per proses
+Hampir setiap update butuh bahasa user. Profil dibaca sekali dari
+MongoDB (hanya field yang dipakai) lalu disimpan di LRU + TTL:
+- User yang belum terdaftar juga di-cache, jadi update berikutnya
+  tidak ke database lagi
+- Perubahan lewat save_user / set_user_lang langsung masuk cache &
+  antre ke write-behind (services/write_buffer.py), jadi bahasa lama
+  tidak pernah tampil setelah diganti & handler tidak menunggu database
+"""
+
+from __future__ import annotations
+
+import logging
+
+from config import USER_CACHE_SIZE, USER_CACHE_TTL
+from database.mongodb import get_user_profile
+from services.write_buffer import pending_user, queue_user, queue_user_lang
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANG = "id"
+
+_users = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+
+def _profile(user_id: int, username: str, lang: str, registered: bool) -> dict:
+    return {
+        "user_id": user_id,
+        "username": username,
+        "lang": lang,
+        "registered": registered,  # sudah ada di koleksi users
+    }
+
+
+async def load_user(user_id: int) -> dict:
+    """
+    Ambil profil user (dari cache jika ada).
+
+    Returns:
+        {"user_id", "username", "lang", "registered"} — user yang belum
+        terdaftar mendapat bahasa default
+    """
+    profile = _users.get(user_id)
+    if profile is not None:
+        return profile
+
+    try:
+        doc = await get_user_profile(user_id)
+    except Exception as e:
+        # Database bermasalah → tetap layani dengan bahasa default
+        logger.warning("Gagal baca profil user %s: %s", user_id, e)
+        return _profile(user_id, "", DEFAULT_LANG, False)
+
+    # Perubahan yang belum di-flush lebih baru dari isi database
+    pending = pending_user(user_id)
+    if pending:
+        doc = {**(doc or {}), **pending}
+
+    if doc is None:
+        profile = _profile(user_id, "", DEFAULT_LANG, False)
+    else:
+        profile = _profile(
+            user_id, doc.get("username", ""), doc.get("lang", DEFAULT_LANG), True
+        )
+    _users.set(user_id, profile)
+    return profile
+
+
+def save_user(user_id: int, username: str, lang: str = DEFAULT_LANG) -> dict:
+    """Simpan / update user (cache sekarang, database lewat write-behind)."""
+    queue_user(user_id, username, lang)
+    profile = _profile(user_id, username, lang, True)
+    _users.set(user_id, profile)
+    return profile
+
+
+def set_user_lang(user_id: int, lang: str) -> None:
+    """Ubah bahasa user (cache sekarang, database lewat write-behind)."""
+    queue_user_lang(user_id, lang)
+    profile = _users.get(user_id)
+    if profile is not None:
+        _users.set(user_id, {**profile, "lang": lang})
+
+
+def get_user_cache_stats() -> dict:
+    """Statistik cache profil user untuk admin panel."""
+    return _users.stats()
@@ -0,0 +1,279 @@
+"""
+Write-behind untuk penulisan user & history
+Handler tidak lagi menunggu MongoDB: perubahan user & riwayat
+pengecekan ditampung di memori lalu ditulis per batch oleh task flush:
+- Perubahan untuk user yang sama digabung (hanya nilai terakhir ditulis)
+- Batch ditulis dengan satu bulk_write (users) & insert_many (history)
+  saat buffer mencapai WRITE_BUFFER_SIZE atau tiap WRITE_BUFFER_INTERVAL
+- Batch yang gagal dikembalikan ke buffer & dicoba lagi (history punya
+  _id sendiri, jadi insert ulang tidak menggandakan). Selama database
+  terus gagal, buffer user, history & batch statistik masing-masing
+  dibatasi MAX_PENDING — yang terlama dibuang
+- Setelah tertulis, user baru & riwayat baru ditambahkan ke statistik
+  (record_stats) per batch ber-id; jika gagal, batch yang sama dicoba
+  lagi di flush berikutnya tanpa menulis ulang datanya & tanpa
+  terhitung dua kali
+- Saat berhenti, sisa buffer ditulis dulu (stop_write_buffer)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from config import WRITE_BUFFER_INTERVAL, WRITE_BUFFER_SIZE
+from database.mongodb import (
+    bulk_write_users,
+    insert_history,
+    make_history_doc,
+    record_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_PENDING = 50 * WRITE_BUFFER_SIZE  # batas buffer saat database terus gagal
+LATENCY_ALPHA = 0.2                   # bobot flush terbaru pada rata-rata latency
+
+# ── Buffer ──
+_users: Dict[int, dict] = {}   # user_id → {"set", "upsert", "created_at"}
+_history: List[dict] = []
+_wakeup = asyncio.Event()
+_flush_lock = asyncio.Lock()
+_flusher: Optional[asyncio.Task] = None
+
+# ── Sudah tertulis tapi belum masuk statistik ──
+_unrecorded: List[dict] = []  # {"id", "users", "history"} urut lama → baru
+
+# ── Statistik ──
+_stats = {
+    "flushes": 0,
+    "failures": 0,
+    "written": 0,
+    "max_batch": 0,
+    "last_latency_ms": 0,
+    "avg_latency_ms": 0.0,
+}
+
+
+def _pending() -> int:
+    return len(_users) + len(_history) + sum(
+        len(stats["history"]) for stats in _unrecorded
+    )
+
+
+def _queue_user(user_id: int, fields: dict, upsert: bool) -> None:
+    """Gabungkan perubahan user ke buffer (field terbaru menang)."""
+    entry = _users.get(user_id)
+    if entry is None:
+        _users[user_id] = {
+            "set": dict(fields),
+            "upsert": upsert,
+            "created_at": datetime.now(timezone.utc),
+        }
+    else:
+        entry["set"].update(fields)
+        entry["upsert"] = entry["upsert"] or upsert
+    if _pending() >= WRITE_BUFFER_SIZE:
+        _wakeup.set()
+
+
+def queue_user(user_id: int, username: str, lang: str) -> None:
+    """Simpan / update user (upsert) di batch berikutnya."""
+    fields = {
+        "username": username,
+        "lang": lang,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    _queue_user(user_id, fields, upsert=True)
+
+
+def queue_user_lang(user_id: int, lang: str) -> None:
+    """Ubah bahasa user yang sudah terdaftar di batch berikutnya."""
+    _queue_user(user_id, {"lang": lang}, upsert=False)
+
+
+def pending_user(user_id: int) -> Optional[dict]:
+    """Field user yang belum tertulis ke database (untuk baca-tulis konsisten)."""
+    entry = _users.get(user_id)
+    return entry["set"] if entry else None
+
+
+def record_history(
+    user_id: int, ig_username: str, method: str, result: dict
+) -> None:
+    """Simpan riwayat pengecekan di batch berikutnya."""
+    _history.append(make_history_doc(user_id, ig_username, method, result))
+    if _pending() >= WRITE_BUFFER_SIZE:
+        _wakeup.set()
+
+
+def _requeue(users: Dict[int, dict], history: List[dict]) -> None:
+    """Kembalikan batch gagal ke buffer; perubahan yang lebih baru tetap menang."""
+    for user_id, entry in users.items():
+        newer = _users.get(user_id)
+        if newer is not None:
+            entry["set"].update(newer["set"])
+            entry["upsert"] = entry["upsert"] or newer["upsert"]
+        _users[user_id] = entry
+    _history[:0] = history
+    _trim()
+
+
+def _trim() -> None:
+    """Batasi buffer saat database terus gagal (yang terlama dibuang)."""
+    overflow = len(_history) - MAX_PENDING
+    if overflow > 0:
+        del _history[:overflow]
+        logger.error("Buffer history penuh, %d riwayat terlama dibuang", overflow)
+
+    overflow = len(_users) - MAX_PENDING
+    if overflow > 0:
+        oldest = sorted(_users, key=lambda user_id: _users[user_id]["created_at"])
+        for user_id in oldest[:overflow]:
+            del _users[user_id]
+        logger.error("Buffer user penuh, %d perubahan user terlama dibuang", overflow)
+
+    # Batch yang sudah tertulis tapi statistiknya belum tercatat
+    unrecorded = sum(len(stats["history"]) for stats in _unrecorded)
+    dropped = 0
+    while _unrecorded and (
+        unrecorded > MAX_PENDING or len(_unrecorded) > MAX_PENDING
+    ):
+        unrecorded -= len(_unrecorded.pop(0)["history"])
+        dropped += 1
+    if dropped:
+        logger.error(
+            "Antrean statistik penuh, %d batch terlama tidak dihitung", dropped
+        )
+
+
+async def flush() -> None:
+    """Tulis semua isi buffer sekarang."""
+    global _users, _history
+
+    async with _flush_lock:
+        if not _pending() and not _unrecorded:
+            return
+        users, _users = _users, {}
+        history, _history = _history, []
+        batch = len(users) + len(history)
+
+        started = time.monotonic()
+        stats = {"id": uuid.uuid4().hex, "users": 0, "history": []}
+        try:
+            # Tiap tahap yang berhasil dikosongkan → tidak ditulis ulang
+            try:
+                if users:
+                    try:
+                        stats["users"] = await bulk_write_users(users)
+                    except BulkWriteError as e:
+                        # Upsert yang sudah masuk tidak terhitung baru lagi
+                        # saat batch diulang → catat sebelum dikembalikan
+                        stats["users"] = e.details.get("nUpserted", 0)
+                        raise
+                    users = {}
+                if history:
+                    try:
+                        stats["history"] = await insert_history(history)
+                    except BulkWriteError as e:
+                        # ordered=False → sebagian sudah masuk; yang masuk
+                        # dicatat sekarang (saat diulang jadi duplikat &
+                        # tidak terhitung lagi), hanya yang gagal diulang.
+                        # 11000 = sudah tersimpan di percobaan sebelumnya
+                        errors = e.details.get("writeErrors", [])
+                        failed = {err["index"] for err in errors}
+                        retry = {
+                            err["index"] for err in errors
+                            if err.get("code") != 11000
+                        }
+                        stats["history"] = [
+                            doc for i, doc in enumerate(history) if i not in failed
+                        ]
+                        history = [doc for i, doc in enumerate(history) if i in retry]
+                        raise
+                    history = []
+            finally:
+                if stats["users"] or stats["history"]:
+                    _unrecorded.append(stats)
+            # Batch statistik diterapkan berurutan; yang gagal diulang
+            # dengan id yang sama di flush berikutnya
+            while _unrecorded:
+                pending = _unrecorded[0]
+                await record_stats(
+                    pending["id"], pending["users"], pending["history"]
+                )
+                _unrecorded.pop(0)
+        except Exception as e:
+            _stats["failures"] += 1
+            logger.error(
+                "Flush gagal, %d user & %d history dicoba lagi: %s",
+                len(users), len(history), e,
+            )
+            _requeue(users, history)
+            return
+
+        if not batch:
+            return
+        latency_ms = (time.monotonic() - started) * 1000
+        _stats["flushes"] += 1
+        _stats["written"] += batch
+        _stats["max_batch"] = max(_stats["max_batch"], batch)
+        _stats["last_latency_ms"] = int(latency_ms)
+        if _stats["flushes"] == 1:
+            _stats["avg_latency_ms"] = latency_ms
+        else:
+            _stats["avg_latency_ms"] += LATENCY_ALPHA * (
+                latency_ms - _stats["avg_latency_ms"]
+            )
+        logger.debug("Flush %d penulisan dalam %d ms", batch, latency_ms)
+
+
+async def _run_flusher() -> None:
+    """Flush saat buffer penuh atau setiap WRITE_BUFFER_INTERVAL."""
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), WRITE_BUFFER_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        # Dibatalkan saat berhenti → flush yang sedang jalan tetap selesai
+        await asyncio.shield(flush())
+
+
+def start_write_buffer() -> None:
+    """Jalankan task flush (dipanggil sekali saat startup)."""
+    global _flusher
+    _flusher = asyncio.create_task(_run_flusher())
+
+
+async def stop_write_buffer() -> None:
+    """Hentikan task flush & tulis sisa buffer."""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        await asyncio.gather(_flusher, return_exceptions=True)
+        _flusher = None
+    await flush()
+    if _pending():
+        logger.error("%d penulisan tidak tersimpan saat berhenti", _pending())
+
+
+def get_write_buffer_stats() -> dict:
+    """Statistik write-behind untuk admin panel."""
+    flushes = _stats["flushes"]
+    written = _stats["written"]
+    return {
+        "pending": _pending(),
+        "flushes": flushes,
+        "failures": _stats["failures"],
+        "avg_batch": round(written / flushes, 1) if flushes else 0,
+        "max_batch": _stats["max_batch"],
+        "last_latency_ms": _stats["last_latency_ms"],
+        "avg_latency_ms": int(_stats["avg_latency_ms"]),
+    }
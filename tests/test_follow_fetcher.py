@@ -0,0 +1,80 @@
+"""
+Tes pengambilan followers/following per halaman (mode incremental).
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from services.follow_fetcher import KNOWN_RUN_STOP, PAGE_SIZE, fetch_relationship
+
+
+class _Governor:
+    """Governor tanpa batas laju — panggil fungsi langsung."""
+
+    async def call(self, fn, *args):
+        return fn(*args)
+
+
+class _Client:
+    """Client palsu: daftar followers terbaru di depan, per halaman."""
+
+    def __init__(self, pks: list) -> None:
+        self.pks = pks
+        self.pages = 0
+
+    def user_followers_v1_chunk(self, user_id: str, amount: int, max_id: str):
+        self.pages += 1
+        start = int(max_id or 0)
+        end = start + amount
+        users = [
+            SimpleNamespace(pk=pk, username=f"user{pk}")
+            for pk in self.pks[start:end]
+        ]
+        return users, str(end) if end < len(self.pks) else ""
+
+
+def _fetch(client: _Client, known: dict, expected: int):
+    return asyncio.run(fetch_relationship(
+        client, _Governor(), 1, "followers", known=known, expected=expected,
+    ))
+
+
+def _known(pks) -> dict:
+    return {pk: f"user{pk}" for pk in pks}
+
+
+def test_unfollow_behind_stop_window_triggers_full_fetch():
+    # 1000 followers dikenal; follower terlama (pk 1) unfollow — posisinya
+    # jauh di belakang halaman pertama tempat mode incremental berhenti
+    known = _known(range(1, 1001))
+    current = list(range(1000, 1, -1))  # terbaru di depan, tanpa pk 1
+    client = _Client(current)
+
+    users, complete = _fetch(client, known, expected=999)
+
+    assert complete
+    assert 1 not in users
+    assert len(users) == 999
+    assert client.pages == -(-999 // PAGE_SIZE)
+
+
+def test_new_follower_with_exact_count_stops_early():
+    known = _known(range(1, 1001))
+    current = [1001] + list(range(1000, 0, -1))
+    client = _Client(current)
+
+    users, complete = _fetch(client, known, expected=1001)
+
+    assert not complete
+    assert len(users) == 1001 and 1001 in users
+    assert client.pages * PAGE_SIZE < len(current)
+    assert PAGE_SIZE >= KNOWN_RUN_STOP
+
+
+def test_without_expected_count_fetches_full_list():
+    known = _known(range(1, 1001))
+    client = _Client(list(range(1000, 0, -1)))
+
+    users, complete = _fetch(client, known, expected=None)
+
+    assert complete and len(users) == 1000
@@ -0,0 +1,152 @@
+"""
+Tes parser JSON streaming & parser export Instagram (metode manual).
+"""
+
+import io
+import json
+import tracemalloc
+import zipfile
+
+import pytest
+
+from services.export_parser import parse_instagram_json, parse_instagram_zip
+from utils.json_stream import MAX_VALUE_SIZE, iter_json_items
+
+ENTRIES = 500_000             # jumlah followers di export sintetis
+PEAK_LIMIT = 80 * 1024 * 1024  # json.load untuk export ini butuh beberapa ratus MB
+
+
+def _all_keys(key):
+    return key or "root"
+
+
+def _items(data: bytes, chunk_size: int) -> list:
+    return list(iter_json_items(io.BytesIO(data), _all_keys, chunk_size))
+
+
+# ══════════════════════════════════════════════
+#  Angka terpotong di batas chunk
+# ══════════════════════════════════════════════
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7])
+@pytest.mark.parametrize("doc", [
+    {"x": 1.5e10, "a": ["q"]},
+    {"a": [12345, -6.25, 1e-7, 0, 987654321012]},
+    [3.14159, -2, 4E+2, 100],
+])
+def test_split_numbers(doc, chunk_size):
+    data = json.dumps(doc).encode()
+    expected = list(iter_json_items(io.BytesIO(data), _all_keys))
+    assert _items(data, chunk_size) == expected
+    assert expected  # dokumen memang punya item array
+
+
+def test_split_number_at_digit_boundary():
+    # "12" | "34" tidak boleh ter-decode sebagai 12
+    assert _items(b'{"a": [1234, 5]}', 1) == [("a", 1234), ("a", 5)]
+
+
+def test_unicode_and_nested_items_chunk_size_one():
+    doc = {"relationships_following": [
+        {"string_list_data": [{"value": "ñandú_ü", "timestamp": 1.7e9}]},
+    ]}
+    data = json.dumps(doc, ensure_ascii=False).encode()
+    assert _items(data, 1) == [("relationships_following", doc["relationships_following"][0])]
+
+
+def test_truncated_document_raises():
+    with pytest.raises(json.JSONDecodeError):
+        _items(b'{"a": [1, 2', 1)
+
+
+@pytest.mark.parametrize("data", [
+    b'["' + b"a" * (20 * MAX_VALUE_SIZE),
+    b"[1." + b"1" * (20 * MAX_VALUE_SIZE) + b"]",
+    b"[" + b"1" * (20 * MAX_VALUE_SIZE) + b"]",
+], ids=["unterminated_string", "long_float", "long_int"])
+def test_oversized_value_fails_without_reading_whole_file(data):
+    stream = io.BytesIO(data)
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_items(stream, _all_keys, 1024))
+    assert stream.tell() < 2 * MAX_VALUE_SIZE
+
+
+def test_large_item_within_limit():
+    item = {"value": "x" * (MAX_VALUE_SIZE // 2)}
+    data = json.dumps([item, 1]).encode()
+    assert _items(data, 1024) == [("root", item), ("root", 1)]
+
+
+# ══════════════════════════════════════════════
+#  Export ZIP / JSON
+# ══════════════════════════════════════════════
+
+def _entry(username: str) -> dict:
+    return {
+        "title": "",
+        "media_list_data": [],
+        "string_list_data": [{
+            "href": f"https://www.instagram.com/{username}",
+            "value": username,
+            "timestamp": 1700000000,
+        }],
+    }
+
+
+def _write_export(path, followers: int, following: list) -> None:
+    """Tulis export sintetis per item agar pembuatan tes juga hemat memori."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("followers_and_following/followers_1.json", "w") as f:
+            f.write(b"[")
+            for i in range(followers):
+                if i:
+                    f.write(b",")
+                f.write(json.dumps(_entry(f"user{i:06d}")).encode())
+            f.write(b"]")
+        zf.writestr(
+            "followers_and_following/following.json",
+            json.dumps({"relationships_following": [_entry(u) for u in following]}),
+        )
+
+
+def test_zip_memory_bounded(tmp_path):
+    path = tmp_path / "export.zip"
+    _write_export(path, ENTRIES, ["user000001", "ghost_a", "ghost_b"])
+
+    tracemalloc.start()
+    try:
+        result = parse_instagram_zip(str(path))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert result["success"]
+    assert result["followers_count"] == ENTRIES
+    assert result["following_count"] == 3
+    assert result["unfollowers"] == ["ghost_a", "ghost_b"]
+    assert peak < PEAK_LIMIT, f"peak {peak / 2**20:.1f} MB"
+
+
+def test_zip_with_invalid_json(tmp_path):
+    path = tmp_path / "export.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("followers_1.json", '[{"string_list_data": [')
+    assert parse_instagram_zip(str(path)) == {
+        "success": False, "error": "invalid_json",
+    }
+
+
+def test_bad_zip(tmp_path):
+    path = tmp_path / "export.zip"
+    path.write_bytes(b"not a zip")
+    assert parse_instagram_zip(str(path))["error"] == "bad_zip"
+
+
+def test_single_json(tmp_path):
+    path = tmp_path / "followers.json"
+    path.write_text(json.dumps({
+        "relationships_followers": [_entry("a")],
+        "relationships_following": [_entry("a"), _entry("b")],
+    }))
+    result = parse_instagram_json(str(path))
+    assert result["unfollowers"] == ["b"]
@@ -0,0 +1,40 @@
+"""
+Tes pool proses parsing: hasil dari proses anak & isolasi dari default executor.
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services.parse_pool import parse_file
+
+
+def _write_export(path) -> None:
+    entry = {"string_list_data": [{"value": "a", "timestamp": 1700000000}]}
+    ghost = {"string_list_data": [{"value": "b", "timestamp": 1700000000}]}
+    path.write_text(json.dumps({
+        "relationships_followers": [entry],
+        "relationships_following": [entry, ghost],
+    }))
+
+
+def test_parse_file_not_blocked_by_busy_default_executor(tmp_path):
+    path = tmp_path / "followers.json"
+    _write_export(path)
+    release = threading.Event()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        # Default executor penuh (mis. panggilan Instagram yang lama)
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+        busy = loop.run_in_executor(None, release.wait, 30)
+        try:
+            return await asyncio.wait_for(parse_file("json", str(path)), 20)
+        finally:
+            release.set()
+            await busy
+
+    result = asyncio.run(main())
+    assert result["success"]
+    assert result["unfollowers"] == ["b"]
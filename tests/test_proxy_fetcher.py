@@ -0,0 +1,430 @@
+"""
+Tes proxy fetcher: validasi bertahap, race validasi, warm pool,
+blacklist & daftar proxy (tanpa jaringan — measure_proxy / HTTP dipalsukan).
+"""
+
+import asyncio
+
+import pytest
+
+import utils.proxy_fetcher as pf
+
+
+@pytest.fixture(autouse=True)
+def _reset_state():
+    """Kosongkan state modul sebelum & sesudah tiap tes."""
+    state = (
+        pf._pool, pf._pool_heap, pf._blacklist, pf._blacklist_heap,
+        pf._reputation, pf._reputation_dirty, pf._sources, pf._source_deltas,
+        pf._source_of,
+        pf._lists, pf._proxy_cache, pf._last_fetch,
+    )
+    for item in state:
+        item.clear()
+    yield
+    for item in state:
+        item.clear()
+
+
+def _stub_measure(monkeypatch, results: dict, delays: dict = None):
+    """measure_proxy palsu: url → latency / None / Exception, dengan jeda."""
+    delays = delays or {}
+    cancelled = []
+
+    async def measure(url):
+        try:
+            await asyncio.sleep(delays.get(url, 0))
+        except asyncio.CancelledError:
+            cancelled.append(url)
+            raise
+        result = results[url]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(pf, "measure_proxy", measure)
+    return cancelled
+
+
+# ══════════════════════════════════════════════
+#  VALIDASI BERTAHAP
+# ══════════════════════════════════════════════
+
+@pytest.mark.parametrize("raw", ["1..2.3:80", "a" * 64 + ".example.com:80"])
+def test_measure_proxy_malformed_host_returns_none(raw):
+    url = pf.format_proxy_url(raw)
+    assert asyncio.run(pf.measure_proxy(url)) is None
+    assert pf._stage_stats[pf.STAGE_TCP]["failed"] >= 1
+
+
+def test_measure_proxy_unknown_scheme_returns_none():
+    assert asyncio.run(pf.measure_proxy("ftp://1.2.3.4:21")) is None
+
+
+def test_race_treats_raising_task_as_failed(monkeypatch):
+    _stub_measure(
+        monkeypatch,
+        {"http://1.1.1.1:80": UnicodeError("label empty"), "http://2.2.2.2:80": 0.3},
+        {"http://2.2.2.2:80": 0.01},
+    )
+    candidates = [
+        ("1.1.1.1:80", "http://1.1.1.1:80"),
+        ("2.2.2.2:80", "http://2.2.2.2:80"),
+    ]
+
+    assert asyncio.run(pf._race_validate(candidates)) == "http://2.2.2.2:80"
+    assert pf.is_blacklisted("1.1.1.1:80")
+
+
+# ══════════════════════════════════════════════
+#  RACE VALIDASI — yang pertama lolos menang
+# ══════════════════════════════════════════════
+
+def test_race_first_success_wins_and_cancels_rest(monkeypatch):
+    fast, slow, dead = "http://1.1.1.1:80", "http://2.2.2.2:80", "http://3.3.3.3:80"
+    cancelled = _stub_measure(
+        monkeypatch,
+        {fast: 0.2, slow: 0.1, dead: None},
+        {fast: 0.02, slow: 5, dead: 0.01},
+    )
+    candidates = [("2.2.2.2:80", slow), ("1.1.1.1:80", fast), ("3.3.3.3:80", dead)]
+
+    assert asyncio.run(pf._race_validate(candidates)) == fast
+    assert cancelled == [slow]
+    assert fast in pf._pool and slow not in pf._pool
+    assert pf.is_blacklisted(dead)
+
+
+def test_race_deadline_returns_none(monkeypatch):
+    url = "http://1.1.1.1:80"
+    cancelled = _stub_measure(monkeypatch, {url: 0.1}, {url: 5})
+
+    winner, elapsed = asyncio.run(
+        _timed(pf._race_validate([("1.1.1.1:80", url)], deadline=0.05))
+    )
+
+    assert winner is None
+    assert elapsed < 1
+    assert cancelled == [url]
+
+
+def test_race_without_candidates():
+    assert asyncio.run(pf._race_validate([])) is None
+
+
+async def _timed(coro):
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    result = await coro
+    return result, loop.time() - start
+
+
+# ══════════════════════════════════════════════
+#  WARM POOL
+# ══════════════════════════════════════════════
+
+def test_pool_best_is_lowest_score():
+    pf._pool_success("http://1.1.1.1:80", 0.9)
+    pf._pool_success("http://2.2.2.2:80", 0.2)
+    pf._pool_success("http://3.3.3.3:80", 0.5)
+    assert pf._pool_best() == "http://2.2.2.2:80"
+
+    # Latency memburuk → urutan ikut berubah (entri heap lama jadi basi)
+    for _ in range(10):
+        pf._pool_success("http://2.2.2.2:80", 3.0)
+    assert pf._pool_best() == "http://3.3.3.3:80"
+
+
+def test_pool_evicts_after_max_streak():
+    url = "http://1.1.1.1:80"
+    pf._pool_success(url, 0.2)
+    for _ in range(pf.POOL_MAX_STREAK - 1):
+        pf._pool_failure(url)
+        assert url in pf._pool
+    pf._pool_failure(url)
+
+    assert url not in pf._pool
+    assert pf._pool_best() is None
+    assert pf.is_blacklisted(url)
+
+
+def test_success_resets_streak():
+    url = "http://1.1.1.1:80"
+    pf._pool_success(url, 0.2)
+    for _ in range(3 * pf.POOL_MAX_STREAK):
+        pf._pool_failure(url)
+        pf._pool_success(url, 0.2)
+    assert url in pf._pool
+
+
+@pytest.mark.parametrize("form", [
+    "1.2.3.4:1080",
+    "socks5://1.2.3.4:1080",
+    "socks5h://user:pw@1.2.3.4:1080",
+])
+def test_blacklist_evicts_pool_entry_in_any_form(form):
+    pf._pool_success("socks5h://1.2.3.4:1080", 0.1)
+    pf._pool_success("http://5.6.7.8:80", 0.5)
+
+    pf.blacklist_proxy(form, pf.FAIL_IG_BLACKLISTED)
+
+    assert "socks5h://1.2.3.4:1080" not in pf._pool
+    assert pf._pool_best() == "http://5.6.7.8:80"
+
+
+# ══════════════════════════════════════════════
+#  BLACKLIST
+# ══════════════════════════════════════════════
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Jam palsu untuk time.time(); majukan lewat clock.now."""
+    class _Clock:
+        now = 1_000_000.0
+
+    monkeypatch.setattr(pf.time, "time", lambda: _Clock.now)
+    return _Clock
+
+
+def test_blacklist_expires_after_ttl(clock):
+    pf.blacklist_proxy("1.2.3.4:80", pf.FAIL_TIMEOUT)
+    ttl = pf.BLACKLIST_TTL[pf.FAIL_TIMEOUT]
+
+    clock.now += ttl - 1
+    assert pf.is_blacklisted("1.2.3.4:80")
+
+    clock.now += 1
+    assert not pf.is_blacklisted("1.2.3.4:80")
+    pf._expire_blacklist(clock.now)
+    assert pf._blacklist == {}
+
+
+def test_blacklist_keeps_longer_ttl(clock):
+    pf.blacklist_proxy("1.2.3.4:80", pf.FAIL_HIJACKED)
+    pf.blacklist_proxy("1.2.3.4:80", pf.FAIL_TIMEOUT)
+
+    clock.now += pf.BLACKLIST_TTL[pf.FAIL_TIMEOUT] + 1
+    assert pf.is_blacklisted("1.2.3.4:80")
+    assert pf._blacklist["1.2.3.4:80"][1] == pf.FAIL_HIJACKED
+
+
+def test_blacklist_extends_with_longer_ttl(clock):
+    pf.blacklist_proxy("1.2.3.4:80", pf.FAIL_TIMEOUT)
+    pf.blacklist_proxy("1.2.3.4:80", pf.FAIL_IG_BLACKLISTED)
+
+    clock.now += pf.BLACKLIST_TTL[pf.FAIL_TIMEOUT] + 1
+    pf._expire_blacklist(clock.now)  # entri heap lama tidak boleh menghapus yang baru
+    assert pf.is_blacklisted("1.2.3.4:80")
+
+    clock.now += pf.BLACKLIST_TTL[pf.FAIL_IG_BLACKLISTED]
+    assert not pf.is_blacklisted("1.2.3.4:80")
+
+
+@pytest.mark.parametrize("form", [
+    "1.2.3.4:1080",
+    "http://1.2.3.4:1080",
+    "SOCKS5H://user:pw@1.2.3.4:1080/",
+    " socks5://1.2.3.4:1080 ",
+])
+def test_blacklist_matches_canonical_form(clock, form):
+    pf.blacklist_proxy("socks5h://user:pw@1.2.3.4:1080", pf.FAIL_TIMEOUT)
+    assert pf.is_blacklisted(form)
+    assert not pf.is_blacklisted("1.2.3.4:1081")
+
+
+def test_blacklist_full_drops_soonest_expiry(clock, monkeypatch):
+    monkeypatch.setattr(pf, "MAX_BLACKLIST", 2)
+    pf.blacklist_proxy("1.1.1.1:80", pf.FAIL_HIJACKED)
+    pf.blacklist_proxy("2.2.2.2:80", pf.FAIL_TIMEOUT)
+    pf.blacklist_proxy("3.3.3.3:80", pf.FAIL_LOGIN)
+
+    assert set(pf._blacklist) == {"1.1.1.1:80", "3.3.3.3:80"}
+
+
+# ══════════════════════════════════════════════
+#  DAFTAR PROXY — revalidasi & cache disk
+# ══════════════════════════════════════════════
+
+SOURCE = "https://example.com/lists/http.txt"
+
+
+class _Response:
+    def __init__(self, status, body="", headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+
+    async def text(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Session:
+    """Session palsu: balas 304 jika ETag cocok, selain itu 200 + daftar."""
+
+    def __init__(self, body, etag="v1", fail=False):
+        self.body, self.etag, self.fail = body, etag, fail
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(dict(headers or {}))
+        if self.fail:
+            raise OSError("connection reset")
+        if (headers or {}).get("If-None-Match") == self.etag:
+            return _Response(304)
+        return _Response(200, self.body, {
+            "ETag": self.etag, "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+        })
+
+
+@pytest.fixture
+def session(monkeypatch, tmp_path):
+    """Session palsu + direktori cache sementara."""
+    monkeypatch.setattr(pf, "PROXY_CACHE_DIR", str(tmp_path))
+    fake = _Session("1.1.1.1:80\n2.2.2.2:8080\n\nbukan-proxy\n")
+    monkeypatch.setattr(pf, "_http_session", lambda: fake)
+    return fake
+
+
+def test_fetch_list_revalidates_with_etag(session):
+    first = asyncio.run(pf._fetch_proxy_list(SOURCE))
+    second = asyncio.run(pf._fetch_proxy_list(SOURCE))
+
+    assert first == second == ["1.1.1.1:80", "2.2.2.2:8080"]
+    assert session.requests[0] == {}
+    assert session.requests[1] == {
+        "If-None-Match": "v1",
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+
+
+def test_fetch_list_failure_returns_last_list(session):
+    asyncio.run(pf._fetch_proxy_list(SOURCE))
+    session.fail = True
+    assert asyncio.run(pf._fetch_proxy_list(SOURCE)) == ["1.1.1.1:80", "2.2.2.2:8080"]
+
+
+def test_fetch_list_revalidates_from_disk_after_restart(session):
+    asyncio.run(pf._fetch_proxy_list(SOURCE))
+    pf._lists.clear()  # proses baru: memori kosong, file cache tetap ada
+
+    assert asyncio.run(pf._fetch_proxy_list(SOURCE)) == ["1.1.1.1:80", "2.2.2.2:8080"]
+    assert session.requests[-1]["If-None-Match"] == "v1"
+
+
+def test_corrupt_disk_cache_is_ignored(session):
+    with open(pf._cache_path(SOURCE), "w") as f:
+        f.write("{bukan json")
+    assert asyncio.run(pf._load_cached_list(SOURCE)) is None
+
+
+def test_cold_start_serves_disk_cache(session, monkeypatch):
+    monkeypatch.setattr(pf, "PROXY_SOURCES", {"http": [SOURCE]})
+    refreshed = []
+    monkeypatch.setattr(pf, "_refresh_in_background", refreshed.append)
+    asyncio.run(pf._save_cached_list(SOURCE, {
+        "url": SOURCE, "etag": "v1", "last_modified": None,
+        "proxies": ["1.1.1.1:80", "3.3.3.3:3128"],
+    }))
+    pf.blacklist_proxy("3.3.3.3:3128", pf.FAIL_TIMEOUT)
+
+    proxies = asyncio.run(pf.fetch_all_proxies("http"))
+
+    assert proxies == ["1.1.1.1:80"]
+    assert session.requests == []       # tidak menunggu jaringan
+    assert refreshed == ["http"]        # refresh jalan di background
+    assert pf._last_fetch["http"] == 0  # dianggap kedaluwarsa
+    assert pf._source_of["http"]["3.3.3.3:3128"] == SOURCE
+
+
+# ══════════════════════════════════════════════
+#  STATISTIK SUMBER — delta $inc antar proses
+# ══════════════════════════════════════════════
+
+class _SourcesDB:
+    """Koleksi proxy_sources palsu yang menerapkan $inc per url."""
+
+    def __init__(self, docs=(), fail=None):
+        self.docs = {doc["url"]: dict(doc) for doc in docs}
+        self.fail = fail  # Exception, atau set url yang gagal ditulis
+
+    async def save(self, deltas):
+        if isinstance(self.fail, Exception):
+            raise self.fail
+        failed = {}
+        for url, counts in deltas.items():
+            if self.fail and url in self.fail:
+                failed[url] = counts
+                continue
+            doc = self.docs.setdefault(url, {"url": url})
+            for field, n in counts.items():
+                doc[field] = doc.get(field, 0) + n
+        return failed
+
+    async def load(self):
+        return [dict(doc) for doc in self.docs.values()]
+
+
+@pytest.fixture
+def sources_db(monkeypatch):
+    db = _SourcesDB([{"url": SOURCE, "fetched": 100, "tested": 10, "passed": 5}])
+    monkeypatch.setattr(pf, "save_proxy_sources", db.save)
+    monkeypatch.setattr(pf, "load_proxy_sources", db.load)
+
+    async def no_reputation(*args):
+        return []
+
+    monkeypatch.setattr(pf, "save_proxy_reputation", no_reputation)
+    monkeypatch.setattr(pf, "load_proxy_reputation", no_reputation)
+    return db
+
+
+def test_flush_sources_writes_deltas_not_totals(sources_db):
+    asyncio.run(pf.load_reputation())
+    pf._source_add(SOURCE, "tested", 2)
+    pf._source_add(SOURCE, "passed", 1)
+    # Proses lain menambah di antara load & flush
+    sources_db.docs[SOURCE]["tested"] += 7
+
+    asyncio.run(pf.flush_reputation())
+
+    assert sources_db.docs[SOURCE]["tested"] == 19
+    assert sources_db.docs[SOURCE]["passed"] == 6
+    assert pf._sources[SOURCE]["tested"] == 19  # total terbaru dimuat ulang
+    assert pf._source_deltas == {}
+
+    asyncio.run(pf.flush_reputation())  # tanpa delta baru → tidak berubah
+    assert sources_db.docs[SOURCE]["tested"] == 19
+
+
+def test_flush_sources_failure_keeps_deltas(sources_db):
+    asyncio.run(pf.load_reputation())
+    pf._source_add(SOURCE, "fetched", 20)
+    sources_db.fail = OSError("network")
+
+    with pytest.raises(OSError):
+        asyncio.run(pf.flush_reputation())
+    assert pf._source_deltas == {SOURCE: {"fetched": 20}}
+    assert pf._sources[SOURCE]["fetched"] == 120
+
+    sources_db.fail = None
+    asyncio.run(pf.flush_reputation())
+    assert sources_db.docs[SOURCE]["fetched"] == 120
+
+
+def test_flush_sources_retries_only_failed_urls(sources_db):
+    other = "https://example.com/lists/other.txt"
+    pf._source_add(SOURCE, "tested", 1)
+    pf._source_add(other, "tested", 3)
+    sources_db.fail = {other}
+
+    asyncio.run(pf.flush_reputation())
+
+    assert sources_db.docs[SOURCE]["tested"] == 11
+    assert pf._source_deltas == {other: {"tested": 3}}
+    assert pf._sources[other]["tested"] == 3  # belum ada di DB, tetap lokal
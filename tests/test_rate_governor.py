@@ -0,0 +1,67 @@
+"""
+Tes governor akun IG: circuit breaker vs panggilan yang menunggu token.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from instagrapi.exceptions import PleaseWaitFewMinutes
+
+from services.rate_governor import OPEN, CircuitOpen, Governor
+
+
+def _throttled():
+    raise PleaseWaitFewMinutes("Please wait a few minutes")
+
+
+def test_call_waiting_for_token_is_refused_after_circuit_opens():
+    # burst 1 → panggilan kedua menunggu token ~0.1 detik
+    governor = Governor("akun", rate_per_minute=600, burst=1)
+    ran = []
+
+    async def main():
+        return await asyncio.gather(
+            governor.call(_throttled),
+            governor.call(ran.append, "kedua"),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(main())
+
+    assert isinstance(first, PleaseWaitFewMinutes)
+    assert isinstance(second, CircuitOpen)
+    assert ran == []  # tidak dikirim ke Instagram saat circuit terbuka
+    assert governor.state == OPEN
+    assert governor.strikes == 1
+    assert governor.total_calls == 1
+
+
+def test_calls_in_flight_when_circuit_opens_add_one_strike():
+    governor = Governor("akun", rate_per_minute=600, burst=2)
+    both_started = threading.Barrier(2)
+
+    def throttled_together():
+        both_started.wait(timeout=5)
+        _throttled()
+
+    async def main():
+        return await asyncio.gather(
+            governor.call(throttled_together),
+            governor.call(throttled_together),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(r, PleaseWaitFewMinutes) for r in results)
+    assert governor.total_throttles == 2
+    assert governor.strikes == 1
+
+
+def test_open_circuit_refuses_immediately():
+    governor = Governor("akun", rate_per_minute=600, burst=1)
+    with pytest.raises(PleaseWaitFewMinutes):
+        asyncio.run(governor.call(_throttled))
+    with pytest.raises(CircuitOpen):
+        asyncio.run(governor.call(lambda: None))
@@ -0,0 +1,94 @@
+"""
+Tes write-behind: insert history yang gagal sebagian & batas buffer
+(tanpa database — fungsi MongoDB dipalsukan).
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+import services.write_buffer as wb
+
+
+@pytest.fixture(autouse=True)
+def _reset_state():
+    """Kosongkan buffer sebelum & sesudah tiap tes."""
+    for item in (wb._users, wb._history, wb._unrecorded):
+        item.clear()
+    yield
+    for item in (wb._users, wb._history, wb._unrecorded):
+        item.clear()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Database palsu: catat history yang tersimpan & batch statistik."""
+    class _DB:
+        history = {}       # _id → doc
+        recorded = []      # (batch_id, users, [_id history])
+        fail_codes = {}    # _id → kode error pada insert berikutnya
+
+    async def insert_history(docs):
+        errors = []
+        for i, doc in enumerate(docs):
+            code = _DB.fail_codes.pop(doc["_id"], None)
+            if code is None and doc["_id"] in _DB.history:
+                code = 11000
+            if code is not None:
+                errors.append({"index": i, "code": code})
+            else:
+                _DB.history[doc["_id"]] = doc
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": 0})
+        return docs
+
+    async def record_stats(batch_id, new_users, history):
+        _DB.recorded.append((batch_id, new_users, [doc["_id"] for doc in history]))
+
+    monkeypatch.setattr(wb, "insert_history", insert_history)
+    monkeypatch.setattr(wb, "record_stats", record_stats)
+    return _DB
+
+
+def _doc(i):
+    return {"_id": f"h{i}", "user_id": i, "method": "auto",
+            "checked_at": datetime.now(timezone.utc)}
+
+
+def test_partial_history_failure_counts_inserted_docs(db):
+    db.history["h2"] = _doc(2)       # tersimpan di percobaan sebelumnya
+    db.fail_codes["h1"] = 121        # validasi dokumen gagal
+    wb._history.extend([_doc(0), _doc(1), _doc(2)])
+
+    asyncio.run(wb.flush())
+
+    assert [doc["_id"] for doc in wb._history] == ["h1"]  # hanya yang gagal
+    assert [
+        [doc["_id"] for doc in stats["history"]] for stats in wb._unrecorded
+    ] == [["h0"]]
+
+    asyncio.run(wb.flush())
+
+    assert wb._history == []
+    assert [ids for _, _, ids in db.recorded] == [["h0"], ["h1"]]
+
+
+def test_requeue_caps_every_buffer(monkeypatch):
+    monkeypatch.setattr(wb, "MAX_PENDING", 3)
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    users = {
+        i: {"set": {"lang": "id"}, "upsert": True,
+            "created_at": old + timedelta(minutes=i)}
+        for i in range(5)
+    }
+    wb._unrecorded.extend(
+        {"id": str(i), "users": 0, "history": [_doc(i)]} for i in range(5)
+    )
+
+    wb._requeue(users, [_doc(i) for i in range(5)])
+
+    assert sorted(wb._users) == [2, 3, 4]
+    assert [doc["_id"] for doc in wb._history] == ["h2", "h3", "h4"]
+    assert [stats["id"] for stats in wb._unrecorded] == ["2", "3", "4"]
@@ -47,6 +47,19 @@ TEXTS: Dict[str, Dict[str, str]] = {
             "4. Download & upload file ZIP-nya ke sini"
         ),
         "proses": "⏳ Sedang memproses, mohon tunggu...",
+        "proses_progress": (
+            "⏳ Mengambil data <code>{username}</code>...\n\n"
+            "👥 Followers: <b>{followers_done}</b> / {followers_total}\n"
+            "👥 Following: <b>{following_done}</b> / {following_total}"
+        ),
+        "antrean_posisi": (
+            "⏳ Kamu di antrean <b>#{position}</b>.\n"
+            "Pengecekan <code>{username}</code> dimulai otomatis, "
+            "hasilnya akan dikirim ke sini."
+        ),
+        "tombol_batal_cek": "❌ Batalkan",
+        "cek_dibatalkan": "Pengecekan dibatalkan.",
+        "cek_tidak_ada": "Tidak ada pengecekan yang berjalan.",
         "hasil_unfollowers": (
             "📋 <b>Hasil Cek Unfollowers</b>\n\n"
             "👤 Username: <code>{username}</code>\n"
@@ -58,6 +71,13 @@ TEXTS: Dict[str, Dict[str, str]] = {
         "tidak_ada_unfollowers": (
             "✅ Semua orang yang kamu follow sudah follow-back!"
         ),
+        "hasil_cache": (
+            "\n\n🕐 <i>Data diambil {minutes} menit lalu (cache).</i>"
+        ),
+        "delta_title": "🔄 <b>Perubahan sejak cek terakhir</b> ({date})\n\n",
+        "delta_kosong": "Tidak ada perubahan followers.",
+        "delta_lost": "➖ <b>{count}</b> berhenti follow:\n{users}\n\n",
+        "delta_new": "➕ <b>{count}</b> follower baru:\n{users}\n\n",
         "error_username": (
             "❌ Username tidak ditemukan atau akun bersifat private.\n"
             "Pastikan username benar dan akun tidak di-private."
@@ -66,6 +86,15 @@ TEXTS: Dict[str, Dict[str, str]] = {
             "❌ File tidak valid. Pastikan kamu upload file ZIP/JSON "
             "yang benar dari Instagram Data Download."
         ),
+        "error_sibuk": (
+            "⏳ Bot sedang sibuk memproses banyak file.\n"
+            "Silakan coba lagi beberapa menit lagi."
+        ),
+        "error_file_timeout": (
+            "⌛ File terlalu besar untuk diproses.\n"
+            "Pastikan kamu hanya memilih data <b>Followers and following</b> "
+            "saat download data Instagram."
+        ),
         "error_ig_login": (
             "❌ Bot tidak bisa login ke Instagram saat ini.\n"
             "Silakan coba metode Manual (upload file)."
@@ -81,6 +110,14 @@ TEXTS: Dict[str, Dict[str, str]] = {
             "Gunakan metode <b>📁 Manual (Upload File)</b> sebagai alternatif.\n\n"
             "<i>Admin: tambahkan proxy residensial di .env</i>"
         ),
+        "error_antrean_ada": (
+            "⏳ Pengecekan kamu sebelumnya masih berjalan.\n"
+            "Tunggu hasilnya dulu atau batalkan pengecekan tersebut."
+        ),
+        "error_antrean_penuh": (
+            "⏳ Antrean pengecekan sedang penuh.\n"
+            "Silakan coba lagi beberapa menit lagi."
+        ),
         "error_umum": "❌ Terjadi kesalahan. Silakan coba lagi nanti.",
         "error_private": (
             "🔒 Akun <code>{username}</code> bersifat <b>private</b>.\n"
@@ -110,6 +147,11 @@ TEXTS: Dict[str, Dict[str, str]] = {
             "📊 Rasio F/F: <b>{ratio}</b>\n"
             "🚫 Tidak Follow-back: <b>{unfollowers}</b>"
         ),
+        "stats_delta": (
+            "\n\n🔄 Sejak cek sebelumnya:\n"
+            "➖ Berhenti follow: <b>{lost}</b>\n"
+            "➕ Follower baru: <b>{new}</b>"
+        ),
         "stats_kosong": (
             "📊 Belum ada data statistik.\n"
             "Lakukan pengecekan terlebih dahulu."
@@ -145,6 +187,63 @@ TEXTS: Dict[str, Dict[str, str]] = {
             "👥 Total User: <b>{total_users}</b>\n"
             "🔍 Total Pengecekan: <b>{total_checks}</b>"
         ),
+        "admin_trend": (
+            "\n\n📈 <b>Hari Ini</b>\n"
+            "• {checks} cek (auto {auto} · manual {manual})\n"
+            "• {active_users} user aktif · {new_users} user baru\n"
+            "• Rata-rata unfollowers: {avg_unfollowers}\n"
+            "📅 <b>{days} Hari</b>: {week_checks} cek ({trend}) · "
+            "rata-rata unfollowers {week_avg}\n"
+            "• Cek per hari: {series}"
+        ),
+        "admin_ig_title": "\n\n📱 <b>Akun Instagram</b>\n",
+        "admin_ig_kosong": "Belum ada akun dikonfigurasi.\n",
+        "admin_ig_item": (
+            "• <code>@{username}</code> — {status}\n"
+            "   ⚡ {active} aktif · 🔍 {total_checks} cek · ❌ {total_errors} gagal\n"
+        ),
+        "admin_proxy": (
+            "\n🌐 <b>Proxy</b>\n"
+            "• Pool siap: {pool} · Latency terbaik: {best_latency_ms} ms\n"
+            "• Dikenal: {known} · Blacklist: {blacklisted}\n"
+            "• Sumber terbaik: {best_source} ({best_yield}% lolos)\n"
+            "• Validasi ({validated}): TCP {tcp_pass}% → Handshake "
+            "{handshake_pass}% → IG {ig_pass}%\n"
+        ),
+        "admin_cache": (
+            "\n🗄 <b>Cache Snapshot</b>\n"
+            "• Isi: {size}/{maxsize}\n"
+            "• Hit: {l1_hits} memori · {l2_hits} database\n"
+            "• Miss: {misses} · Dibuang: {evictions}\n"
+        ),
+        "admin_profile_cache": (
+            "🗂 <b>Cache Profil</b>\n"
+            "• Isi: {size}/{maxsize} · Hit: {hits} · Miss: {misses}\n"
+        ),
+        "admin_user_cache": (
+            "👥 <b>Cache User</b>\n"
+            "• Isi: {size}/{maxsize} · Hit: {hits} · Miss: {misses}\n"
+        ),
+        "admin_write_buffer": (
+            "💾 <b>Write-behind</b>\n"
+            "• Antre: {pending} · Flush: {flushes} · Gagal: {failures}\n"
+            "• Batch rata-rata: {avg_batch} (maks {max_batch})\n"
+            "• Latency flush: {avg_latency_ms} ms (terakhir {last_latency_ms} ms)\n"
+        ),
+        "admin_antrean": (
+            "\n🧵 <b>Antrean Cek Auto</b>\n"
+            "• Worker: {workers} · Berjalan: {running} ({active} di proses ini)\n"
+            "• Menunggu: {pending} · Selesai: {completed} · Dead: {dead}\n"
+        ),
+        "admin_ig_governor": (
+            "   🚦 {circuit} · {rate}/{max_rate} req/mnt · throttle {throttles}x\n"
+        ),
+        "admin_circuit_closed": "normal",
+        "admin_circuit_open": "circuit terbuka {minutes} mnt",
+        "admin_circuit_half_open": "menguji (half-open)",
+        "admin_ig_siap": "🟢 siap",
+        "admin_ig_belum_login": "⚪ belum login",
+        "admin_ig_karantina": "🔴 karantina {minutes} mnt ({reason})",
         "bukan_admin": "⛔ Kamu tidak memiliki akses admin.",
 
         # Broadcast (admin)
@@ -184,6 +283,19 @@ TEXTS: Dict[str, Dict[str, str]] = {
             "4. Download & upload the ZIP file here"
         ),
         "proses": "⏳ Processing, please wait...",
+        "proses_progress": (
+            "⏳ Fetching data for <code>{username}</code>...\n\n"
+            "👥 Followers: <b>{followers_done}</b> / {followers_total}\n"
+            "👥 Following: <b>{following_done}</b> / {following_total}"
+        ),
+        "antrean_posisi": (
+            "⏳ You are <b>#{position}</b> in the queue.\n"
+            "The check for <code>{username}</code> starts automatically, "
+            "the result will be sent here."
+        ),
+        "tombol_batal_cek": "❌ Cancel",
+        "cek_dibatalkan": "Check cancelled.",
+        "cek_tidak_ada": "No check is running.",
         "hasil_unfollowers": (
             "📋 <b>Unfollowers Check Result</b>\n\n"
             "👤 Username: <code>{username}</code>\n"
@@ -195,6 +307,13 @@ TEXTS: Dict[str, Dict[str, str]] = {
         "tidak_ada_unfollowers": (
             "✅ Everyone you follow is following you back!"
         ),
+        "hasil_cache": (
+            "\n\n🕐 <i>Data fetched {minutes} minutes ago (cached).</i>"
+        ),
+        "delta_title": "🔄 <b>Changes since last check</b> ({date})\n\n",
+        "delta_kosong": "No follower changes.",
+        "delta_lost": "➖ <b>{count}</b> unfollowed you:\n{users}\n\n",
+        "delta_new": "➕ <b>{count}</b> new followers:\n{users}\n\n",
         "error_username": (
             "❌ Username not found or account is private.\n"
             "Make sure the username is correct and the account is public."
@@ -203,6 +322,15 @@ TEXTS: Dict[str, Dict[str, str]] = {
             "❌ Invalid file. Make sure you upload the correct "
             "ZIP/JSON file from Instagram Data Download."
         ),
+        "error_sibuk": (
+            "⏳ The bot is busy processing many files.\n"
+            "Please try again in a few minutes."
+        ),
+        "error_file_timeout": (
+            "⌛ The file is too large to process.\n"
+            "Make sure you only select <b>Followers and following</b> "
+            "when downloading your Instagram data."
+        ),
         "error_ig_login": (
             "❌ Bot can't login to Instagram right now.\n"
             "Please try the Manual method (upload file)."
@@ -218,6 +346,14 @@ TEXTS: Dict[str, Dict[str, str]] = {
             "Use <b>📁 Manual (Upload File)</b> method instead.\n\n"
             "<i>Admin: add a residential proxy in .env</i>"
         ),
+        "error_antrean_ada": (
+            "⏳ Your previous check is still running.\n"
+            "Wait for its result or cancel it first."
+        ),
+        "error_antrean_penuh": (
+            "⏳ The check queue is full right now.\n"
+            "Please try again in a few minutes."
+        ),
         "error_umum": "❌ An error occurred. Please try again later.",
         "error_private": (
             "🔒 Account <code>{username}</code> is <b>private</b>.\n"
@@ -245,6 +381,11 @@ TEXTS: Dict[str, Dict[str, str]] = {
             "📊 Ratio F/F: <b>{ratio}</b>\n"
             "🚫 Not Following Back: <b>{unfollowers}</b>"
         ),
+        "stats_delta": (
+            "\n\n🔄 Since previous check:\n"
+            "➖ Unfollowed: <b>{lost}</b>\n"
+            "➕ New followers: <b>{new}</b>"
+        ),
         "stats_kosong": (
             "📊 No statistics data yet.\n"
             "Run a check first."
@@ -277,6 +418,63 @@ TEXTS: Dict[str, Dict[str, str]] = {
             "👥 Total Users: <b>{total_users}</b>\n"
             "🔍 Total Checks: <b>{total_checks}</b>"
         ),
+        "admin_trend": (
+            "\n\n📈 <b>Today</b>\n"
+            "• {checks} checks (auto {auto} · manual {manual})\n"
+            "• {active_users} active users · {new_users} new users\n"
+            "• Avg unfollowers: {avg_unfollowers}\n"
+            "📅 <b>{days} Days</b>: {week_checks} checks ({trend}) · "
+            "avg unfollowers {week_avg}\n"
+            "• Checks per day: {series}"
+        ),
+        "admin_ig_title": "\n\n📱 <b>Instagram Accounts</b>\n",
+        "admin_ig_kosong": "No accounts configured yet.\n",
+        "admin_ig_item": (
+            "• <code>@{username}</code> — {status}\n"
+            "   ⚡ {active} active · 🔍 {total_checks} checks · ❌ {total_errors} failed\n"
+        ),
+        "admin_proxy": (
+            "\n🌐 <b>Proxies</b>\n"
+            "• Warm pool: {pool} · Best latency: {best_latency_ms} ms\n"
+            "• Known: {known} · Blacklisted: {blacklisted}\n"
+            "• Best source: {best_source} ({best_yield}% pass)\n"
+            "• Validation ({validated}): TCP {tcp_pass}% → Handshake "
+            "{handshake_pass}% → IG {ig_pass}%\n"
+        ),
+        "admin_cache": (
+            "\n🗄 <b>Snapshot Cache</b>\n"
+            "• Entries: {size}/{maxsize}\n"
+            "• Hits: {l1_hits} memory · {l2_hits} database\n"
+            "• Misses: {misses} · Evicted: {evictions}\n"
+        ),
+        "admin_profile_cache": (
+            "🗂 <b>Profile Cache</b>\n"
+            "• Entries: {size}/{maxsize} · Hits: {hits} · Misses: {misses}\n"
+        ),
+        "admin_user_cache": (
+            "👥 <b>User Cache</b>\n"
+            "• Entries: {size}/{maxsize} · Hits: {hits} · Misses: {misses}\n"
+        ),
+        "admin_write_buffer": (
+            "💾 <b>Write-behind</b>\n"
+            "• Pending: {pending} · Flushes: {flushes} · Failures: {failures}\n"
+            "• Avg batch: {avg_batch} (max {max_batch})\n"
+            "• Flush latency: {avg_latency_ms} ms (last {last_latency_ms} ms)\n"
+        ),
+        "admin_antrean": (
+            "\n🧵 <b>Auto Check Queue</b>\n"
+            "• Workers: {workers} · Running: {running} ({active} in this process)\n"
+            "• Waiting: {pending} · Completed: {completed} · Dead: {dead}\n"
+        ),
+        "admin_ig_governor": (
+            "   🚦 {circuit} · {rate}/{max_rate} req/min · throttled {throttles}x\n"
+        ),
+        "admin_circuit_closed": "normal",
+        "admin_circuit_open": "circuit open {minutes} min",
+        "admin_circuit_half_open": "probing (half-open)",
+        "admin_ig_siap": "🟢 ready",
+        "admin_ig_belum_login": "⚪ not logged in",
+        "admin_ig_karantina": "🔴 quarantined {minutes} min ({reason})",
         "bukan_admin": "⛔ You don't have admin access.",
 
         "broadcast_kirim": "📢 Send the message you want to broadcast to all users:",
@@ -0,0 +1,173 @@
+"""
+Pembaca JSON streaming — iterasi item array tanpa memuat seluruh dokumen.
+Dipakai parser Instagram Data Download agar file followers/following
+yang besar dibaca per potongan, bukan json.load() sekaligus.
+
+Yang didukung (cukup untuk format export Instagram):
+- Dokumen berupa array:  [item, item, ...]
+- Dokumen berupa object: {"key": [item, ...], "lain": ...}
+  → item array di-yield per key, value non-array dilewati.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024  # ukuran baca per potongan (byte)
+# Batas satu value yang belum lengkap di buffer (item export Instagram
+# hanya ratusan byte) — lebih dari ini dianggap JSON rusak, bukan dibaca
+# terus sampai akhir file
+MAX_VALUE_SIZE = 4 * CHUNK_SIZE
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = frozenset("0123456789.eE+-")  # karakter lanjutan sebuah angka
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffer teks kecil di atas stream biner (decode UTF-8 inkremental)."""
+
+    def __init__(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._max_value = max(MAX_VALUE_SIZE, 4 * chunk_size)
+        self._decode = codecs.getincrementaldecoder("utf-8-sig")().decode
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Tambah isi buffer. Return False jika stream sudah habis."""
+        if self._eof:
+            return False
+        raw = self._stream.read(self._chunk_size)
+        if not raw:
+            self._eof = True
+            self._buf = self._buf[self._pos:] + self._decode(b"", final=True)
+        else:
+            self._buf = self._buf[self._pos:] + self._decode(raw)
+        self._pos = 0
+        return True
+
+    def _more(self) -> bool:
+        """Baca lagi untuk value yang terpotong; False jika melebihi batas."""
+        if len(self._buf) - self._pos > self._max_value:
+            return False
+        return self._fill()
+
+    def peek(self) -> str:
+        """Karakter non-spasi berikutnya ('' jika EOF)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Konsumsi satu karakter struktural, error jika tidak cocok."""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self._buf, self._pos)
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode satu value JSON utuh dari posisi sekarang."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Value terpotong di batas chunk → baca lagi
+                if self._more():
+                    continue
+                raise
+            except ValueError as e:
+                # Integer melebihi batas digit Python (sys.int_info)
+                raise json.JSONDecodeError(str(e), self._buf, self._pos) from e
+            # Angka yang terpotong di batas chunk ("1." / "1.5e" / "12|34")
+            # ter-decode lebih pendek → baca lagi jika sisa buffer setelahnya
+            # hanya karakter lanjutan angka
+            if (
+                not self._eof
+                and isinstance(obj, (int, float))
+                and _NUMBER_CHARS.issuperset(self._buf[end:])
+            ):
+                if not self._more():
+                    raise json.JSONDecodeError(
+                        "Number too long", self._buf, self._pos
+                    )
+                continue
+            self._pos = end
+            return obj
+
+
+def _iter_array(reader: _Reader) -> Iterator[Any]:
+    """Yield item array satu per satu (posisi reader tepat di '[')."""
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.expect("]")
+        return
+    while True:
+        yield reader.value()
+        if reader.peek() == ",":
+            reader.expect(",")
+            continue
+        reader.expect("]")
+        return
+
+
+def _skip_value(reader: _Reader) -> None:
+    """Lewati satu value; array besar dilewati per item agar hemat memori."""
+    if reader.peek() == "[":
+        for _ in _iter_array(reader):
+            pass
+    else:
+        reader.value()
+
+
+def iter_json_items(
+    stream: BinaryIO,
+    classify: Callable[[Optional[str]], Optional[str]],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Iterasi item array dari dokumen JSON secara streaming.
+
+    classify(key) menentukan label untuk item di bawah key tersebut
+    (key=None untuk dokumen yang langsung berupa array). Return None
+    berarti key dilewati tanpa di-decode ke memori.
+
+    Yields:
+        (label, item)
+    """
+    reader = _Reader(stream, chunk_size)
+    first = reader.peek()
+
+    if first == "[":
+        label = classify(None)
+        if label is None:
+            return
+        for item in _iter_array(reader):
+            yield label, item
+        return
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        label = classify(key) if isinstance(key, str) else None
+        if label is not None and reader.peek() == "[":
+            for item in _iter_array(reader):
+                yield label, item
+        else:
+            _skip_value(reader)
+        if reader.peek() == ",":
+            reader.expect(",")
+            continue
+        reader.expect("}")
+        return
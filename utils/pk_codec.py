@@ -0,0 +1,60 @@
+"""
+Encoding ringkas untuk daftar pk (user id) Instagram
+Format: pk diurutkan → disimpan sebagai selisih (delta) berurutan dalam
+varint (LEB128) → dikompres zlib. Delta antar pk terurut jauh lebih
+kecil dari pk itu sendiri, jadi varint-nya pendek & mudah dikompres.
+
+Username disimpan terpisah sebagai teks ber-newline terkompres, urutannya
+sama dengan urutan pk.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Iterable, List
+
+COMPRESS_LEVEL = 6
+
+
+def encode_pks(pks: Iterable[int]) -> bytes:
+    """Encode pk (harus sudah terurut naik, tanpa duplikat)."""
+    out = bytearray()
+    prev = 0
+    for pk in pks:
+        delta = pk - prev
+        prev = pk
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return zlib.compress(bytes(out), COMPRESS_LEVEL)
+
+
+def decode_pks(blob: bytes) -> List[int]:
+    """Kebalikan encode_pks — return pk terurut naik."""
+    raw = zlib.decompress(blob)
+    pks: List[int] = []
+    prev = 0
+    value = 0
+    shift = 0
+    for byte in raw:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        prev += value
+        pks.append(prev)
+        value = 0
+        shift = 0
+    return pks
+
+
+def encode_names(names: Iterable[str]) -> bytes:
+    """Encode daftar username (urutan dipertahankan)."""
+    return zlib.compress("\n".join(names).encode("utf-8"), COMPRESS_LEVEL)
+
+
+def decode_names(blob: bytes) -> List[str]:
+    """Kebalikan encode_names."""
+    text = zlib.decompress(blob).decode("utf-8")
+    return text.split("\n") if text else []
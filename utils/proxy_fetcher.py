@@ -3,21 +3,58 @@ Proxy Fetcher v2 — sistem proxy cerdas untuk Instagram
 Fitur:
 - 7+ sumber proxy gratis (HTTP & SOCKS5)
 - Validasi proxy sebelum dipakai (test koneksi)
-- Cache proxy yang sudah terbukti jalan (working proxies)
-- Rotasi otomatis: HTTP → SOCKS5 → SOCKS4
-- Blacklist proxy yang gagal agar tidak dipakai ulang
+- Warm pool di background: proxy tervalidasi diurutkan berdasarkan
+  latency & tingkat keberhasilan (heap), dicek ulang berkala, diisi
+  ulang saat di bawah low water sampai high water
+- Blacklist dengan masa berlaku per jenis kegagalan (hijack, timeout,
+  diblokir IG); key dinormalisasi ke host:port, entri kedaluwarsa
+  dibuang lewat heap
+- Reputasi persisten (MongoDB): success rate & latency (EWMA) per proxy
+  dan yield per sumber. Proxy terbukti dicoba lebih dulu, proxy sampah
+  tidak dites ulang, sumber dengan yield tinggi lebih sering di-sample
+- Validasi bertahap: TCP connect (murah, timeout < 1 detik) → handshake
+  proxy + TLS ke Instagram → probe landing_info. Tiap tahap punya batas
+  konkurensi & statistik lolos sendiri, jadi proxy mati gugur cepat
+- Validasi paralel lintas tipe (HTTP, SOCKS5, SOCKS4): proxy pertama
+  yang lolos dipakai, sisanya dibatalkan (dengan deadline global)
+- Daftar proxy diambil lewat satu session bersama (keep-alive, batas
+  koneksi per host) dengan revalidasi ETag / If-Modified-Since; daftar
+  terakhir disimpan di disk agar saat start proxy langsung tersedia
+  sementara daftar baru diambil di background
 """
 
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import heapq
+import json
+import math
+import os
 import random
+import ssl
 import time
 import logging
-from typing import Optional, List, Set
+from collections import OrderedDict
+from itertools import chain, zip_longest
+from typing import Dict, Optional, List, Set, Tuple
+from urllib.parse import unquote, urlparse
 
+import aiofiles
+import aiofiles.os
 import aiohttp
 from aiohttp_socks import ProxyConnector
+from python_socks import ProxyType
+from python_socks.async_.asyncio import Proxy
+
+from config import PROXY_CACHE_DIR
+from database.mongodb import (
+    load_proxy_reputation,
+    load_proxy_sources,
+    save_proxy_reputation,
+    save_proxy_sources,
+)
+from utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -53,83 +90,361 @@ PROXY_SOURCES = {
 # ── Cache & State ──
 _proxy_cache: dict[str, List[str]] = {}  # per-type cache
 _last_fetch: dict[str, float] = {}       # waktu fetch terakhir per type
-_working_proxies: List[str] = []         # proxy yang sudah terbukti jalan
-_blacklisted: Set[str] = set()           # proxy yang gagal, jangan pakai lagi
 CACHE_TTL = 900       # 15 menit cache (lebih sering refresh)
-VALIDATE_TIMEOUT = 7  # timeout validasi proxy (detik)
-MAX_BLACKLIST = 500    # batas blacklist agar tidak terlalu besar
+VALIDATE_TIMEOUT = 7  # timeout probe Instagram (detik)
+VALIDATE_CONCURRENCY = 20  # maksimal probe Instagram bersamaan (global)
+VALIDATE_DEADLINE = 20     # batas total waktu mencari proxy valid (detik)
+PROXY_TYPES = ("http", "socks5", "socks4")
 
+# ── Download daftar proxy ──
+FETCH_TIMEOUT = 15          # batas waktu download satu daftar (detik)
+FETCH_LIMIT = 20            # koneksi maksimal session daftar proxy
+FETCH_LIMIT_PER_HOST = 4    # per host (sebagian besar sumber di GitHub)
 
-async def _fetch_proxy_list(url: str) -> List[str]:
-    """Ambil daftar proxy dari satu URL."""
+_http: Optional[aiohttp.ClientSession] = None
+_lists: Dict[str, dict] = {}  # url sumber → daftar terakhir + ETag / Last-Modified
+_refresh_flight = SingleFlight()  # satu refresh per tipe proxy
+
+# ── Blacklist ──
+# Lama proxy dikecualikan per jenis kegagalan (detik)
+FAIL_TIMEOUT = "timeout"              # tidak merespons / koneksi gagal
+FAIL_HIJACKED = "hijacked"            # response bukan dari Instagram
+FAIL_IG_BLACKLISTED = "ig_blacklisted"  # IP diblokir Instagram
+FAIL_LOGIN = "login_failed"           # login IG lewat proxy gagal
+BLACKLIST_TTL = {
+    FAIL_TIMEOUT: 15 * 60,
+    FAIL_HIJACKED: 24 * 60 * 60,
+    FAIL_IG_BLACKLISTED: 6 * 60 * 60,
+    FAIL_LOGIN: 30 * 60,
+}
+MAX_BLACKLIST = 5000   # batas entri; jika penuh, yang paling cepat habis dibuang
+
+_blacklist: Dict[str, Tuple[float, str]] = {}  # host:port → (habis epoch, jenis)
+# (habis epoch, host:port) — entri basi dibuang saat dibaca
+_blacklist_heap: List[Tuple[float, str]] = []
+
+# ── Validasi bertahap ──
+STAGE_TCP = "tcp"              # TCP connect ke proxy
+STAGE_HANDSHAKE = "handshake"  # handshake proxy (CONNECT / SOCKS) + TLS ke IG
+STAGE_IG = "ig"                # request landing_info ke Instagram
+STAGES = (STAGE_TCP, STAGE_HANDSHAKE, STAGE_IG)
+TCP_TIMEOUT = 0.8
+HANDSHAKE_TIMEOUT = 3
+STAGE_CONCURRENCY = {
+    STAGE_TCP: 100,
+    STAGE_HANDSHAKE: 40,
+    STAGE_IG: VALIDATE_CONCURRENCY,
+}
+IG_HOST = "i.instagram.com"
+
+_PROXY_SCHEMES = {
+    "http": ProxyType.HTTP,
+    "https": ProxyType.HTTP,
+    "socks4": ProxyType.SOCKS4,
+    "socks5": ProxyType.SOCKS5,
+    "socks5h": ProxyType.SOCKS5,  # DNS di-resolve lewat proxy (rdns)
+}
+
+# Slot tiap tahap dipakai bersama semua pencarian proxy yang berjalan
+_stage_slots = {
+    stage: asyncio.Semaphore(limit) for stage, limit in STAGE_CONCURRENCY.items()
+}
+_stage_stats = {stage: {"passed": 0, "failed": 0} for stage in STAGES}
+_tls_context = ssl.create_default_context()
+
+# Kandidat validasi: (proxy mentah untuk blacklist / None, URL proxy)
+Candidate = Tuple[Optional[str], str]
+
+# ── Warm pool ──
+POOL_LOW_WATER = 5          # di bawah ini → mulai isi ulang
+POOL_HIGH_WATER = 15        # isi ulang berhenti setelah sebanyak ini
+POOL_RECHECK_AGE = 5 * 60   # proxy di pool dicek ulang setelah 5 menit
+POOL_LOOP_INTERVAL = 60     # jeda putaran maintenance pool (detik)
+POOL_MAX_STREAK = 2         # gagal berturut-turut sebelum dibuang dari pool
+LATENCY_ALPHA = 0.3         # bobot pengukuran baru pada rata-rata latency
+
+
+class _PoolEntry:
+    """Proxy di warm pool beserta hasil pengukurannya."""
+
+    __slots__ = ("url", "latency", "successes", "failures", "streak", "checked_at")
+
+    def __init__(self, url: str, latency: float) -> None:
+        self.url = url
+        self.latency = latency   # rata-rata bergerak (EWMA), detik
+        self.successes = 0
+        self.failures = 0
+        self.streak = 0          # gagal berturut-turut
+        self.checked_at = time.time()
+
+    @property
+    def score(self) -> float:
+        """Makin kecil makin baik: latency dibagi peluang berhasil."""
+        success_rate = (self.successes + 1) / (self.successes + self.failures + 2)
+        return self.latency / success_rate
+
+
+_pool: Dict[str, _PoolEntry] = {}
+# (score, url) — entri basi dibuang saat dibaca
+_pool_heap: List[Tuple[float, str]] = []
+_pool_wakeup = asyncio.Event()
+
+# ── Reputasi proxy & sumber ──
+REPUTATION_ALPHA = 0.3        # bobot hasil validasi terbaru pada EWMA
+REPUTATION_MAX = 5000         # batas entri reputasi di memori (LRU)
+GARBAGE_MIN_TESTS = 2         # proxy sampah: sudah dites minimal 2x ...
+GARBAGE_SUCCESS = 0.25        # ... dan success rate di bawah ini
+PROVEN_SUCCESS = 0.6          # proxy terbukti: success rate minimal ini ...
+PROVEN_MAX_AGE = 24 * 60 * 60  # ... & dites dalam 24 jam terakhir
+
+_reputation: "OrderedDict[str, dict]" = OrderedDict()  # url → reputasi
+_reputation_dirty: Set[str] = set()
+_sources: Dict[str, dict] = {}          # url sumber → statistik yield
+_source_deltas: Dict[str, Dict[str, int]] = {}  # url sumber → tambahan sejak flush
+_source_of: Dict[str, Dict[str, str]] = {}  # tipe → {proxy mentah → url sumber}
+
+
+# ══════════════════════════════════════════════
+#  DAFTAR PROXY — session bersama & cache disk
+# ══════════════════════════════════════════════
+
+def _http_session() -> aiohttp.ClientSession:
+    """Session bersama untuk semua sumber daftar proxy (keep-alive)."""
+    global _http
+    if _http is None or _http.closed:
+        _http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=FETCH_LIMIT,
+                limit_per_host=FETCH_LIMIT_PER_HOST,
+                ttl_dns_cache=300,
+            ),
+            timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT),
+        )
+    return _http
+
+
+async def close_proxy_session() -> None:
+    """Tutup session daftar proxy (dipanggil saat bot berhenti)."""
+    if _http is not None and not _http.closed:
+        await _http.close()
+
+
+def _cache_path(url: str) -> str:
+    name = hashlib.sha1(url.encode()).hexdigest()[:16]
+    return os.path.join(PROXY_CACHE_DIR, f"{name}.json")
+
+
+async def _load_cached_list(url: str) -> Optional[dict]:
+    """Daftar terakhir sumber ini: dari memori, atau dari disk saat start."""
+    entry = _lists.get(url)
+    if entry is not None:
+        return entry
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                url, timeout=aiohttp.ClientTimeout(total=15)
-            ) as resp:
-                if resp.status == 200:
-                    text = await resp.text()
-                    proxies = [
-                        line.strip()
-                        for line in text.splitlines()
-                        if line.strip() and ":" in line and "." in line
-                    ]
-                    logger.info(
-                        "✓ %d proxy dari %s",
-                        len(proxies),
-                        url.split("/")[-1][:40],
-                    )
-                    return proxies
-    except Exception as e:
-        logger.debug("Gagal fetch: %s — %s", url.split("/")[-1][:40], e)
-    return []
+        async with aiofiles.open(_cache_path(url), "r") as f:
+            entry = json.loads(await f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Cache daftar proxy rusak (%s): %s", _source_name(url), e)
+        return None
+    _lists[url] = entry
+    return entry
 
 
-async def fetch_all_proxies(proxy_type: str = "http") -> List[str]:
+async def _save_cached_list(url: str, entry: dict) -> None:
+    """Simpan daftar ke disk (tulis file sementara lalu rename, atomik)."""
+    path = _cache_path(url)
+    tmp = f"{path}.tmp"
+    try:
+        await aiofiles.os.makedirs(PROXY_CACHE_DIR, exist_ok=True)
+        async with aiofiles.open(tmp, "w") as f:
+            await f.write(json.dumps(entry))
+        await aiofiles.os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Gagal simpan cache daftar proxy: %s", e)
+
+
+def _parse_list(text: str) -> List[str]:
+    return [
+        line.strip()
+        for line in text.splitlines()
+        if line.strip() and ":" in line and "." in line
+    ]
+
+
+async def _fetch_proxy_list(url: str) -> List[str]:
     """
-    Ambil semua proxy dari berbagai sumber.
-    proxy_type: "http", "socks5", atau "socks4"
+    Ambil daftar proxy dari satu URL.
+    Daftar yang sudah dimiliki direvalidasi (ETag / Last-Modified) — jika
+    tidak berubah server cukup membalas 304. Jika gagal, daftar terakhir
+    yang berhasil dipakai lagi.
     """
-    global _proxy_cache, _last_fetch
+    cached = await _load_cached_list(url)
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
 
-    now = time.time()
-    last = _last_fetch.get(proxy_type, 0)
+    try:
+        async with _http_session().get(url, headers=headers) as resp:
+            if resp.status == 304 and cached:
+                logger.debug("= Daftar tidak berubah: %s", url.split("/")[-1][:40])
+                return cached["proxies"]
+            if resp.status == 200:
+                proxies = _parse_list(await resp.text())
+                logger.info(
+                    "✓ %d proxy dari %s",
+                    len(proxies),
+                    url.split("/")[-1][:40],
+                )
+                _source_add(url, "fetched", len(proxies))
+                if proxies:
+                    entry = {
+                        "url": url,
+                        "etag": resp.headers.get("ETag"),
+                        "last_modified": resp.headers.get("Last-Modified"),
+                        "proxies": proxies,
+                    }
+                    _lists[url] = entry
+                    await _save_cached_list(url, entry)
+                return proxies
+    except Exception as e:
+        logger.debug("Gagal fetch: %s — %s", url.split("/")[-1][:40], e)
+    return cached["proxies"] if cached else []
 
-    # Gunakan cache jika masih valid
-    if proxy_type in _proxy_cache and (now - last) < CACHE_TTL:
-        return _proxy_cache[proxy_type]
 
-    urls = PROXY_SOURCES.get(proxy_type, PROXY_SOURCES["http"])
-    tasks = [_fetch_proxy_list(url) for url in urls]
-    results = await asyncio.gather(*tasks)
+def _store_proxies(
+    proxy_type: str, urls: List[str], results: List[List[str]], fetched_at: float
+) -> List[str]:
+    """Gabungkan daftar semua sumber satu tipe ke cache memori."""
+    # Ingat asal tiap proxy untuk statistik yield sumber
+    _source_of[proxy_type] = {
+        proxy: url for url, result in zip(urls, results) for proxy in result
+    }
 
     # Gabungkan, hapus duplikat & blacklisted
     all_proxies = list(set(
         proxy for result in results for proxy in result
-        if proxy not in _blacklisted
+        if not is_blacklisted(proxy)
     ))
     random.shuffle(all_proxies)
 
     _proxy_cache[proxy_type] = all_proxies
-    _last_fetch[proxy_type] = now
+    _last_fetch[proxy_type] = fetched_at
+    return all_proxies
+
 
+async def _refresh_proxies(proxy_type: str) -> List[str]:
+    """Download ulang (revalidasi) semua sumber satu tipe proxy."""
+    urls = PROXY_SOURCES.get(proxy_type, PROXY_SOURCES["http"])
+    results = await asyncio.gather(*(_fetch_proxy_list(url) for url in urls))
+    all_proxies = _store_proxies(proxy_type, urls, results, time.time())
     logger.info("Total %s proxy tersedia: %d", proxy_type, len(all_proxies))
     return all_proxies
 
 
-async def validate_proxy(proxy_url: str) -> bool:
+def _refresh_in_background(proxy_type: str) -> None:
+    if not _refresh_flight.in_flight(proxy_type):
+        asyncio.ensure_future(
+            _refresh_flight.do(proxy_type, lambda: _refresh_proxies(proxy_type))
+        )
+
+
+async def fetch_all_proxies(proxy_type: str = "http") -> List[str]:
     """
-    Test apakah proxy bisa konek ke Instagram (bukan cuma internet biasa).
-    Cek bahwa response benar-benar dari Instagram, bukan intercepted/hijacked.
-    Mendukung HTTP, SOCKS4, SOCKS5 proxy via aiohttp-socks.
+    Ambil semua proxy dari berbagai sumber.
+    proxy_type: "http", "socks5", atau "socks4"
+
+    Cache kedaluwarsa tetap langsung dipakai sementara daftar baru diambil
+    di background. Saat start, daftar terakhir dari disk dipakai dulu.
     """
+    if proxy_type in _proxy_cache:
+        if time.time() - _last_fetch.get(proxy_type, 0) >= CACHE_TTL:
+            _refresh_in_background(proxy_type)
+        return _proxy_cache[proxy_type]
+
+    # Cold start → daftar dari disk (jika ada), refresh di background
+    urls = PROXY_SOURCES.get(proxy_type, PROXY_SOURCES["http"])
+    cached = [await _load_cached_list(url) for url in urls]
+    if any(cached):
+        results = [entry["proxies"] if entry else [] for entry in cached]
+        all_proxies = _store_proxies(proxy_type, urls, results, 0)
+        logger.info(
+            "Total %s proxy dari cache disk: %d", proxy_type, len(all_proxies)
+        )
+        _refresh_in_background(proxy_type)
+        return all_proxies
+
+    return await _refresh_flight.do(
+        proxy_type, lambda: _refresh_proxies(proxy_type)
+    )
+
+
+# ══════════════════════════════════════════════
+#  VALIDASI BERTAHAP — TCP → handshake → Instagram
+# ══════════════════════════════════════════════
+
+def _parse_proxy(proxy_url: str) -> dict:
+    """URL proxy → argumen Proxy / ProxyConnector (socks5h = socks5 + rdns)."""
+    parsed = urlparse(proxy_url)
+    return {
+        "proxy_type": _PROXY_SCHEMES[parsed.scheme],
+        "host": parsed.hostname,
+        "port": parsed.port,
+        "username": unquote(parsed.username) if parsed.username else None,
+        "password": unquote(parsed.password) if parsed.password else None,
+        "rdns": True if parsed.scheme == "socks5h" else None,
+    }
+
+
+async def _check_tcp(proxy_url: str, proxy: dict) -> bool:
+    """Tahap 1: port proxy menerima koneksi TCP."""
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(proxy["host"], proxy["port"]), TCP_TIMEOUT
+        )
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def _check_handshake(proxy_url: str, proxy: dict) -> bool:
+    """
+    Tahap 2: proxy mau membuka tunnel ke Instagram & TLS handshake lolos.
+    Sertifikat yang tidak valid berarti koneksi disadap → hijack.
+    """
+    try:
+        sock = await Proxy(**proxy).connect(IG_HOST, 443, timeout=HANDSHAKE_TIMEOUT)
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                sock=sock, ssl=_tls_context, server_hostname=IG_HOST
+            ),
+            HANDSHAKE_TIMEOUT,
+        )
+    except ssl.SSLCertVerificationError:
+        logger.debug("✗ Proxy hijacked (sertifikat TLS palsu): %s", proxy_url)
+        blacklist_proxy(proxy_url, FAIL_HIJACKED)
+        return False
+    except Exception:
+        return False
+    writer.close()
+    return True
+
+
+async def _check_instagram(proxy_url: str, proxy: dict) -> Optional[float]:
+    """
+    Tahap 3: request sungguhan ke Instagram lewat proxy.
+    Return latency (detik) jika response benar dari Instagram.
+    """
+    started = time.monotonic()
     try:
-        # Gunakan ProxyConnector untuk semua tipe proxy (HTTP/SOCKS)
-        connector = ProxyConnector.from_url(proxy_url, ssl=False)
+        connector = ProxyConnector(**proxy, ssl=False)
         async with aiohttp.ClientSession(connector=connector) as session:
             # Test langsung ke Instagram API endpoint
             async with session.get(
-                "https://i.instagram.com/api/v1/public/landing_info/",
+                f"https://{IG_HOST}/api/v1/public/landing_info/",
                 timeout=aiohttp.ClientTimeout(total=VALIDATE_TIMEOUT),
                 headers={
                     "User-Agent": "Instagram 269.0.0.18.75 Android",
@@ -140,30 +455,143 @@ async def validate_proxy(proxy_url: str) -> bool:
                     # Pastikan response benar dari IG (JSON), bukan HTML hijack
                     if text.strip().startswith("{"):
                         logger.info("✓ Proxy valid (IG OK): %s", proxy_url)
-                        return True
+                        return time.monotonic() - started
                     else:
                         logger.debug("✗ Proxy hijacked: %s", proxy_url)
-                        return False
+                        blacklist_proxy(proxy_url, FAIL_HIJACKED)
+                        return None
                 # Status 429 = rate limited tapi proxy tetap konek ke IG
                 if resp.status == 429:
                     logger.info("✓ Proxy valid (IG 429): %s", proxy_url)
-                    return True
+                    return time.monotonic() - started
     except Exception:
         pass
-    return False
+    return None
+
+
+_STAGE_CHECKS = {
+    STAGE_TCP: _check_tcp,
+    STAGE_HANDSHAKE: _check_handshake,
+    STAGE_IG: _check_instagram,
+}
+
+
+async def measure_proxy(proxy_url: str) -> Optional[float]:
+    """
+    Test apakah proxy bisa konek ke Instagram (bukan cuma internet biasa).
+    Return latency request Instagram (detik) jika valid, None jika tidak.
+    Proxy diuji bertahap (TCP → handshake + TLS → Instagram); tahap
+    berikutnya hanya dijalankan jika tahap sebelumnya lolos.
+    Mendukung HTTP, SOCKS4, SOCKS5 proxy via aiohttp-socks.
+    """
+    try:
+        proxy = _parse_proxy(proxy_url)
+    except (KeyError, ValueError):
+        return None  # Skema / port tidak dikenal
+
+    result = None
+    for stage in STAGES:
+        async with _stage_slots[stage]:
+            try:
+                result = await _STAGE_CHECKS[stage](proxy_url, proxy)
+            except Exception as e:
+                # Baris rusak dari daftar publik (mis. host "1..2.3" →
+                # UnicodeError) cukup dianggap gagal, bukan menghentikan
+                # pencarian proxy
+                logger.debug("✗ Tahap %s error (%s): %s", stage, proxy_url, e)
+                result = None
+        _stage_stats[stage]["passed" if result else "failed"] += 1
+        if not result:
+            return None
+    return result
+
+
+def _pass_rate(stage: str) -> int:
+    """Persentase proxy yang lolos satu tahap validasi."""
+    stats = _stage_stats[stage]
+    tested = stats["passed"] + stats["failed"]
+    return stats["passed"] * 100 // tested if tested else 0
+
+
+def _overall_pass_rate() -> float:
+    """Peluang satu kandidat lolos semua tahap (smoothed)."""
+    return (_stage_stats[STAGE_IG]["passed"] + 1) / (
+        _stage_stats[STAGE_TCP]["passed"] + _stage_stats[STAGE_TCP]["failed"] + 2
+    )
+
+
+async def validate_proxy(proxy_url: str) -> bool:
+    """Test koneksi proxy ke Instagram; hasilnya ikut dicatat di warm pool."""
+    if is_blacklisted(proxy_url):
+        return False
+    latency = await measure_proxy(proxy_url)
+    _rep_record(None, proxy_url, latency)
+    if latency is None:
+        _pool_failure(proxy_url)
+        return False
+    _pool_success(proxy_url, latency)
+    return True
+
+
+# ══════════════════════════════════════════════
+#  BLACKLIST — kedaluwarsa per jenis kegagalan
+# ══════════════════════════════════════════════
 
+def _canonical(proxy: str) -> str:
+    """Key blacklist: host:port tanpa skema & kredensial (ip:port mentah = URL)."""
+    host = proxy.strip().split("://", 1)[-1].rsplit("@", 1)[-1]
+    return host.rstrip("/").lower()
 
-def blacklist_proxy(proxy: str) -> None:
-    """Tambahkan proxy ke blacklist agar tidak dipakai lagi."""
-    global _blacklisted
-    # Ekstrak ip:port dari URL
-    clean = proxy.replace("http://", "").replace("socks5://", "").replace("socks4://", "")
-    _blacklisted.add(clean)
 
-    # Bersihkan blacklist jika terlalu banyak (reset)
-    if len(_blacklisted) > MAX_BLACKLIST:
-        _blacklisted = set(list(_blacklisted)[-200:])
-        logger.info("Blacklist di-reset, simpan 200 terakhir")
+def _expire_blacklist(now: float) -> None:
+    """Buang entri yang sudah habis masa berlakunya (dari puncak heap)."""
+    while _blacklist_heap and _blacklist_heap[0][0] <= now:
+        expires, key = heapq.heappop(_blacklist_heap)
+        entry = _blacklist.get(key)
+        if entry is not None and entry[0] == expires:
+            del _blacklist[key]
+
+
+def is_blacklisted(proxy: str) -> bool:
+    """True jika proxy (mentah atau URL) masih di blacklist."""
+    entry = _blacklist.get(_canonical(proxy))
+    return entry is not None and entry[0] > time.time()
+
+
+def blacklist_proxy(proxy: str, reason: str = FAIL_TIMEOUT) -> None:
+    """
+    Kecualikan proxy selama BLACKLIST_TTL[reason].
+    Jika sudah di-blacklist lebih lama (mis. hijack), masa itu dipertahankan.
+    """
+    global _blacklist_heap
+    key = _canonical(proxy)
+    # Pool memakai URL sebagai key → buang semua bentuk proxy yang sama
+    # (ip:port mentah, socks5:// vs socks5h://, dengan kredensial)
+    evicted = [url for url in _pool if _canonical(url) == key]
+    for url in evicted:
+        del _pool[url]
+    if evicted and len(_pool) < POOL_LOW_WATER:
+        _pool_wakeup.set()
+
+    now = time.time()
+    _expire_blacklist(now)
+    expires = now + BLACKLIST_TTL[reason]
+    current = _blacklist.get(key)
+    if current is not None and current[0] >= expires:
+        return
+    _blacklist[key] = (expires, reason)
+    heapq.heappush(_blacklist_heap, (expires, key))
+
+    # Penuh → buang entri yang paling cepat habis
+    while len(_blacklist) > MAX_BLACKLIST:
+        expires, key = heapq.heappop(_blacklist_heap)
+        entry = _blacklist.get(key)
+        if entry is not None and entry[0] == expires:
+            del _blacklist[key]
+    # Terlalu banyak entri basi → susun ulang heap dari blacklist
+    if len(_blacklist_heap) > 2 * len(_blacklist) + 32:
+        _blacklist_heap = [(exp, key) for key, (exp, _) in _blacklist.items()]
+        heapq.heapify(_blacklist_heap)
 
 
 def format_proxy_url(proxy: str, proxy_type: str = "http") -> str:
@@ -184,79 +612,433 @@ def format_proxy_for_requests(proxy_url: str) -> str:
     return proxy_url
 
 
-async def get_validated_proxy(
-    proxy_type: str = "http",
-    max_test: int = 15,
+# ══════════════════════════════════════════════
+#  REPUTASI — per proxy & per sumber (persisten)
+# ══════════════════════════════════════════════
+
+def _source_stats(source: str) -> dict:
+    return _sources.setdefault(
+        source, {"url": source, "fetched": 0, "tested": 0, "passed": 0}
+    )
+
+
+def _source_add(source: str, field: str, n: int) -> None:
+    """Tambah counter sumber & catat deltanya untuk flush berikutnya."""
+    if not n:
+        return
+    _source_stats(source)[field] += n
+    delta = _source_deltas.setdefault(source, {})
+    delta[field] = delta.get(field, 0) + n
+
+
+def _restore_deltas(deltas: Dict[str, Dict[str, int]]) -> None:
+    """Kembalikan delta yang gagal disimpan (tanpa menambah counter lokal lagi)."""
+    for source, counts in deltas.items():
+        delta = _source_deltas.setdefault(source, {})
+        for field, n in counts.items():
+            delta[field] = delta.get(field, 0) + n
+
+
+def _merge_sources(docs: List[dict]) -> None:
+    """Pakai total dari database + delta lokal yang belum tersimpan."""
+    for doc in docs:
+        stats = {"fetched": 0, "tested": 0, "passed": 0, **doc}
+        for field, n in _source_deltas.get(doc["url"], {}).items():
+            stats[field] += n
+        _sources[doc["url"]] = stats
+
+
+def _source_yield(source: Optional[str]) -> float:
+    """Peluang proxy dari sumber ini lolos validasi (smoothed, 0..1)."""
+    stats = _sources.get(source) if source else None
+    if not stats:
+        return 0.5
+    return (stats["passed"] + 1) / (stats["tested"] + 2)
+
+
+def _source_for(raw: str) -> Optional[str]:
+    for mapping in _source_of.values():
+        if raw in mapping:
+            return mapping[raw]
+    return None
+
+
+def _rep_record(raw: Optional[str], url: str, latency: Optional[float]) -> None:
+    """Perbarui reputasi proxy (& yield sumbernya pada tes pertama)."""
+    ok = latency is not None
+    rep = _reputation.pop(url, None)
+    if rep is None:
+        rep = {
+            "url": url,
+            "success": 0.5,
+            "latency": latency if ok else float(VALIDATE_TIMEOUT),
+            "tests": 0,
+            "source": _source_for(raw) if raw else None,
+        }
+        # Yield sumber = berapa proxy baru darinya yang lolos tes pertama
+        if rep["source"]:
+            _source_add(rep["source"], "tested", 1)
+            _source_add(rep["source"], "passed", int(ok))
+
+    rep["success"] += REPUTATION_ALPHA * (float(ok) - rep["success"])
+    if ok:
+        rep["latency"] += REPUTATION_ALPHA * (latency - rep["latency"])
+    rep["tests"] += 1
+    rep["updated_at"] = time.time()
+
+    _reputation[url] = rep
+    _reputation_dirty.add(url)
+    while len(_reputation) > REPUTATION_MAX:
+        old_url, _ = _reputation.popitem(last=False)
+        _reputation_dirty.discard(old_url)
+
+
+def _is_garbage(url: str) -> bool:
+    """Proxy yang sudah berkali-kali gagal → tidak perlu dites lagi."""
+    rep = _reputation.get(url)
+    return bool(
+        rep
+        and rep["tests"] >= GARBAGE_MIN_TESTS
+        and rep["success"] < GARBAGE_SUCCESS
+    )
+
+
+def _proven_candidates(limit: int) -> List[Candidate]:
+    """Proxy yang pernah terbukti bagus (belum ada di pool), terbaik dulu."""
+    now = time.time()
+    proven = [
+        rep for rep in _reputation.values()
+        if rep["success"] >= PROVEN_SUCCESS
+        and now - rep["updated_at"] < PROVEN_MAX_AGE
+        and rep["url"] not in _pool
+        and not is_blacklisted(rep["url"])
+    ]
+    proven.sort(key=lambda rep: rep["latency"] / rep["success"])
+    return [(rep["url"], rep["url"]) for rep in proven[:limit]]
+
+
+async def load_reputation() -> None:
+    """Muat reputasi proxy & statistik sumber dari database."""
+    for doc in await load_proxy_reputation(REPUTATION_MAX):
+        _reputation[doc["url"]] = doc
+    _merge_sources(await load_proxy_sources())
+    logger.info(
+        "Reputasi dimuat: %d proxy, %d sumber", len(_reputation), len(_sources)
+    )
+
+
+async def flush_reputation() -> None:
+    """
+    Simpan reputasi & statistik sumber yang berubah ke database.
+    Statistik sumber ditulis sebagai delta ($inc), lalu total terbaru
+    (termasuk hasil proses lain) dimuat ulang.
+    """
+    global _source_deltas
+    deltas, _source_deltas = _source_deltas, {}
+    try:
+        failed = await save_proxy_sources(deltas)
+    except Exception:
+        _restore_deltas(deltas)
+        raise
+    _restore_deltas(failed)
+    _merge_sources(await load_proxy_sources())
+
+    entries = [_reputation[url] for url in _reputation_dirty if url in _reputation]
+    _reputation_dirty.clear()
+    await save_proxy_reputation(entries)
+
+
+def _source_name(url: str) -> str:
+    """Nama pendek sumber: owner repo GitHub atau host API."""
+    parsed = urlparse(url)
+    if parsed.netloc == "raw.githubusercontent.com":
+        return parsed.path.split("/")[1]
+    return parsed.netloc
+
+
+# ══════════════════════════════════════════════
+#  WARM POOL — proxy tervalidasi, urut skor (heap)
+# ══════════════════════════════════════════════
+
+def _pool_success(proxy_url: str, latency: float) -> None:
+    """Catat validasi berhasil & masukkan / perbarui proxy di pool."""
+    entry = _pool.get(proxy_url)
+    if entry is None:
+        entry = _pool[proxy_url] = _PoolEntry(proxy_url, latency)
+    else:
+        entry.latency += LATENCY_ALPHA * (latency - entry.latency)
+    entry.successes += 1
+    entry.streak = 0
+    entry.checked_at = time.time()
+    _push(entry)
+
+
+def _pool_failure(proxy_url: str) -> None:
+    """Catat validasi gagal; buang dari pool jika gagal berturut-turut."""
+    entry = _pool.get(proxy_url)
+    if entry is None:
+        return
+    entry.failures += 1
+    entry.streak += 1
+    entry.checked_at = time.time()
+    if entry.streak >= POOL_MAX_STREAK:
+        blacklist_proxy(proxy_url, FAIL_TIMEOUT)
+    else:
+        _push(entry)
+
+
+def _push(entry: _PoolEntry) -> None:
+    global _pool_heap
+    heapq.heappush(_pool_heap, (entry.score, entry.url))
+    # Terlalu banyak entri basi → susun ulang heap dari pool
+    if len(_pool_heap) > 4 * len(_pool) + 32:
+        _pool_heap = [(e.score, e.url) for e in _pool.values()]
+        heapq.heapify(_pool_heap)
+
+
+def _pool_best() -> Optional[str]:
+    """Proxy dengan skor terbaik di pool (O(1) kecuali ada entri basi)."""
+    while _pool_heap:
+        score, url = _pool_heap[0]
+        entry = _pool.get(url)
+        if entry is not None and entry.score == score:
+            return url
+        heapq.heappop(_pool_heap)
+    return None
+
+
+def _record(candidate: Candidate, latency: Optional[float]) -> None:
+    """Catat hasil validasi satu kandidat ke reputasi, pool / blacklist."""
+    raw, url = candidate
+    _rep_record(raw, url, latency)
+    if latency is not None:
+        _pool_success(url, latency)
+    elif raw is None:
+        _pool_failure(url)  # Proxy dari pool
+    else:
+        # Hijack sudah di-blacklist lebih lama oleh measure_proxy
+        blacklist_proxy(raw, FAIL_TIMEOUT)
+
+
+async def _race_validate(
+    candidates: List[Candidate],
+    deadline: float = VALIDATE_DEADLINE,
 ) -> Optional[str]:
     """
-    Ambil proxy yang sudah divalidasi (test koneksi dulu).
-    Mencoba max_test proxy, return yang pertama berhasil.
+    Validasi banyak proxy bersamaan (dibatasi per tahap validasi).
+    Return proxy pertama yang lolos; validasi lain langsung dibatalkan.
+    Return None jika tidak ada yang lolos sebelum deadline.
     """
-    global _working_proxies
-
-    # Coba dari working proxies dulu (sudah pernah jalan)
-    if _working_proxies:
-        proxy = random.choice(_working_proxies)
-        logger.info("Coba working proxy: %s", proxy)
-        if await validate_proxy(proxy):
-            return proxy
-        # Hapus dari working list jika sudah tidak jalan
-        _working_proxies = [p for p in _working_proxies if p != proxy]
-
-    # Fetch proxy baru & test satu-satu
-    proxies = await fetch_all_proxies(proxy_type)
-    if not proxies:
+    if not candidates:
         return None
 
-    # Ambil sample acak untuk di-test
-    sample = random.sample(proxies, min(max_test, len(proxies)))
-
-    for raw_proxy in sample:
-        proxy_url = format_proxy_url(raw_proxy, proxy_type)
-        if await validate_proxy(proxy_url):
-            # Simpan ke working list
-            if proxy_url not in _working_proxies:
-                _working_proxies.append(proxy_url)
-                # Batasi working list
-                if len(_working_proxies) > 20:
-                    _working_proxies = _working_proxies[-20:]
-            return proxy_url
-        else:
-            blacklist_proxy(raw_proxy)
+    tasks = {
+        asyncio.create_task(measure_proxy(url)): (raw, url)
+        for raw, url in candidates
+    }
+    pending = set(tasks)
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+    winner: Optional[str] = None
 
-    return None
+    try:
+        while pending and winner is None:
+            timeout = end - loop.time()
+            if timeout <= 0:
+                logger.warning("Deadline validasi proxy (%ds) habis", deadline)
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is not None:
+                    # Validasi yang error = kandidat gagal, race tetap jalan
+                    logger.debug(
+                        "Validasi %s error: %r", tasks[task][1], task.exception()
+                    )
+                    latency = None
+                else:
+                    latency = task.result()
+                _record(tasks[task], latency)
+                if latency is not None and winner is None:
+                    winner = tasks[task][1]
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    return winner
+
+
+def _sample_candidates(
+    proxy_type: str, proxies: List[str], max_test: int
+) -> List[Candidate]:
+    """
+    Ambil sample proxy mentah & format ke URL.
+    Proxy sampah & yang masuk blacklist setelah daftar di-cache dilewati;
+    sisanya di-sample berbobot yield sumbernya
+    (weighted sampling tanpa pengembalian: key = u^(1/bobot)).
+    """
+    source_of = _source_of.get(proxy_type, {})
+    weighted = []
+    for raw in proxies:
+        url = format_proxy_url(raw, proxy_type)
+        if _is_garbage(url) or is_blacklisted(raw):
+            continue
+        weight = _source_yield(source_of.get(raw))
+        weighted.append((random.random() ** (1 / weight), raw, url))
+    return [(raw, url) for _, raw, url in heapq.nlargest(max_test, weighted)]
 
 
 async def get_random_proxy(proxy_type: str = "http") -> Optional[str]:
     """Ambil satu proxy acak (tanpa validasi, untuk fallback cepat)."""
-    proxies = await fetch_all_proxies(proxy_type)
+    proxies = [
+        p for p in await fetch_all_proxies(proxy_type) if not is_blacklisted(p)
+    ]
     if not proxies:
         return None
     proxy = random.choice(proxies)
     return format_proxy_url(proxy, proxy_type)
 
 
+def _interleaved_candidates(lists: List[List[str]], per_type: int) -> List[Candidate]:
+    """Sample kandidat tiap tipe proxy, diselang-seling HTTP / SOCKS5 / SOCKS4."""
+    sampled = [
+        _sample_candidates(ptype, proxies, per_type)
+        for ptype, proxies in zip(PROXY_TYPES, lists)
+    ]
+    return [
+        c for c in chain.from_iterable(zip_longest(*sampled)) if c is not None
+    ]
+
+
 async def get_best_proxy() -> Optional[str]:
     """
-    Strategi cerdas: coba semua tipe proxy sampai dapat yang jalan.
-    Urutan: HTTP → SOCKS5 → SOCKS4
+    Proxy terbaik dari warm pool (langsung, tanpa validasi ulang).
+    Pool kosong (cold start) → validasi proxy semua tipe sekaligus,
+    yang pertama lolos dipakai.
     """
-    for ptype in ["http", "socks5", "socks4"]:
-        logger.info("Mencari proxy %s yang valid...", ptype.upper())
-        proxy = await get_validated_proxy(ptype, max_test=10)
-        if proxy:
-            return proxy
+    best = _pool_best()
+    if len(_pool) < POOL_LOW_WATER:
+        _pool_wakeup.set()  # Bangunkan maintenance pool untuk isi ulang
+    if best:
+        return best
+
+    lists = await asyncio.gather(*(fetch_all_proxies(t) for t in PROXY_TYPES))
+    candidates = _proven_candidates(VALIDATE_CONCURRENCY)
+    candidates += _interleaved_candidates(lists, 10)
+
+    logger.info("Validasi %d kandidat proxy secara paralel...", len(candidates))
+    proxy = await _race_validate(candidates)
+    if proxy:
+        return proxy
 
     # Fallback: random tanpa validasi (yolo)
     logger.warning("Tidak ada proxy valid, coba random tanpa test...")
     return await get_random_proxy("http")
 
 
+# ══════════════════════════════════════════════
+#  MAINTENANCE POOL — task background
+# ══════════════════════════════════════════════
+
+async def _recheck_pool() -> None:
+    """Validasi ulang proxy di pool yang sudah lama tidak dicek."""
+    now = time.time()
+    stale = [
+        (None, url) for url, entry in _pool.items()
+        if now - entry.checked_at > POOL_RECHECK_AGE
+    ]
+    if not stale:
+        return
+    results = await asyncio.gather(*(measure_proxy(url) for _, url in stale))
+    for candidate, latency in zip(stale, results):
+        _record(candidate, latency)
+    logger.info(
+        "Cek ulang %d proxy pool: %d lolos",
+        len(stale), sum(r is not None for r in results),
+    )
+
+
+async def _refill_pool() -> None:
+    """Validasi kandidat baru per batch sampai pool mencapai high water."""
+    lists = await asyncio.gather(*(fetch_all_proxies(t) for t in PROXY_TYPES))
+    candidates = _proven_candidates(POOL_HIGH_WATER)
+    candidates += [
+        c for c in _interleaved_candidates(lists, POOL_HIGH_WATER * 2)
+        if c[1] not in _pool
+    ]
+    while candidates and len(_pool) < POOL_HIGH_WATER:
+        # Batch seukuran kekurangan dibagi peluang lolos yang teramati
+        # (sebagian besar kandidat gugur murah di tahap TCP)
+        shortfall = POOL_HIGH_WATER - len(_pool)
+        size = min(
+            STAGE_CONCURRENCY[STAGE_TCP],
+            max(shortfall * 2, math.ceil(shortfall / _overall_pass_rate())),
+        )
+        batch, candidates = candidates[:size], candidates[size:]
+        results = await asyncio.gather(*(measure_proxy(url) for _, url in batch))
+        for candidate, latency in zip(batch, results):
+            _record(candidate, latency)
+    logger.info("Pool proxy diisi ulang: %d proxy siap", len(_pool))
+
+
+async def run_proxy_pool() -> None:
+    """
+    Task background: jaga warm pool tetap terisi.
+    Tiap putaran proxy lama dicek ulang; jika pool di bawah low water,
+    kandidat baru divalidasi sampai high water. Putaran berikutnya
+    dimulai setelah POOL_LOOP_INTERVAL atau saat pool menipis.
+    Reputasi dimuat saat mulai & disimpan tiap putaran.
+    """
+    try:
+        await load_reputation()
+    except Exception as e:
+        logger.warning("Gagal memuat reputasi proxy: %s", e)
+
+    try:
+        while True:
+            _pool_wakeup.clear()
+            try:
+                await _recheck_pool()
+                if len(_pool) < POOL_LOW_WATER:
+                    await _refill_pool()
+                await flush_reputation()
+            except Exception as e:
+                logger.warning("Maintenance pool proxy gagal: %s", e)
+
+            try:
+                await asyncio.wait_for(_pool_wakeup.wait(), POOL_LOOP_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        # Simpan hasil validasi terakhir sebelum berhenti
+        try:
+            await flush_reputation()
+        except Exception as e:
+            logger.warning("Gagal menyimpan reputasi proxy: %s", e)
+
+
 def get_proxy_stats() -> dict:
     """Statistik proxy untuk admin panel."""
+    _expire_blacklist(time.time())
+    best = _pool_best()
+    # Sumber terbaik dari yang sudah cukup banyak dites
+    tested = [src for src in _sources.values() if src["tested"] >= 10]
+    best_source = max(tested, key=lambda src: _source_yield(src["url"]), default=None)
     return {
-        "working": len(_working_proxies),
-        "blacklisted": len(_blacklisted),
+        "pool": len(_pool),
+        "best_latency_ms": int(_pool[best].latency * 1000) if best else 0,
+        "blacklisted": len(_blacklist),
+        "known": len(_reputation),
+        "best_source": _source_name(best_source["url"]) if best_source else "-",
+        "best_yield": (
+            int(_source_yield(best_source["url"]) * 100) if best_source else 0
+        ),
+        "tcp_pass": _pass_rate(STAGE_TCP),
+        "handshake_pass": _pass_rate(STAGE_HANDSHAKE),
+        "ig_pass": _pass_rate(STAGE_IG),
+        "validated": sum(_stage_stats[STAGE_TCP].values()),
         "cached_http": len(_proxy_cache.get("http", [])),
         "cached_socks5": len(_proxy_cache.get("socks5", [])),
         "cached_socks4": len(_proxy_cache.get("socks4", [])),
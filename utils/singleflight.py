@@ -0,0 +1,45 @@
+"""
+Single-flight — gabungkan panggilan paralel dengan key yang sama
+Jika beberapa coroutine meminta pekerjaan yang sama bersamaan
+(mis. login akun yang sama), hanya satu yang benar-benar dijalankan;
+sisanya menunggu & menerima hasil (atau exception) yang sama.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Registry pekerjaan yang sedang berjalan, per key."""
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Cek apakah pekerjaan untuk key ini sedang berjalan."""
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Jalankan fn() sekali untuk key ini, atau ikut menunggu hasil
+        pekerjaan yang sudah berjalan.
+        Pembatalan satu penunggu tidak membatalkan pekerjaan bersama.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Ambil exception agar tidak muncul warning "never retrieved"
+        # saat semua penunggu sudah dibatalkan
+        if not task.cancelled():
+            task.exception()
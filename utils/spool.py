@@ -0,0 +1,60 @@
+"""
+Spool upload Telegram ke file sementara di disk
+File didownload per potongan (streaming) & ditulis via aiofiles,
+jadi isi upload tidak pernah ditahan utuh di RAM.
+File sementara selalu dihapus: saat sukses, error, maupun dibatalkan.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import aiofiles
+import aiofiles.os
+from aiogram import Bot
+from aiogram.types import Document
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024     # ukuran potongan download (byte)
+DOWNLOAD_TIMEOUT = 120     # batas waktu download file (detik)
+
+
+@asynccontextmanager
+async def spool_document(
+    bot: Bot, document: Document, suffix: str = ""
+) -> AsyncIterator[str]:
+    """
+    Download dokumen Telegram ke file sementara & yield path-nya.
+
+    Contoh:
+        async with spool_document(bot, doc, ".zip") as path:
+            result = await parse_file("zip", path)
+    """
+    fd, path = tempfile.mkstemp(prefix="cekunfol_", suffix=suffix)
+    os.close(fd)
+    try:
+        tg_file = await bot.get_file(document.file_id)
+        url = bot.session.api.file_url(bot.token, tg_file.file_path)
+
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in bot.session.stream_content(
+                url=url,
+                timeout=DOWNLOAD_TIMEOUT,
+                chunk_size=CHUNK_SIZE,
+                raise_for_status=True,
+            ):
+                await f.write(chunk)
+
+        yield path
+    finally:
+        try:
+            await aiofiles.os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Gagal hapus file sementara %s: %s", path, e)
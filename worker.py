@@ -0,0 +1,86 @@
+"""
+Worker Antrean — proses tambahan untuk menjalankan pengecekan auto
+Mengambil job dari koleksi check_jobs (MongoDB) yang sama dengan bot,
+jadi bisa dijalankan beberapa kali di satu server atau server lain.
+Jalankan dengan: python worker.py
+
+Hasil dikirim langsung lewat Bot API (tanpa polling update).
+"""
+
+import asyncio
+import logging
+import signal
+from functools import partial
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+
+from config import BOT_TOKEN
+from database.mongodb import check_query_plans, ensure_indexes, ensure_stats
+from handlers.tools import notify_queue_position, run_check_job
+from services.check_queue import start_workers, stop_workers
+from services.account_pool import uses_free_proxies
+from services.instagram import restore_sessions
+from services.write_buffer import start_write_buffer, stop_write_buffer
+from utils.proxy_fetcher import close_proxy_session, run_proxy_pool
+
+# ── Logging ──
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)-7s | %(name)s | %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    """Jalankan worker antrean sampai dihentikan (SIGINT / SIGTERM)."""
+
+    # Validasi token
+    if not BOT_TOKEN:
+        logger.error("BOT_TOKEN belum diisi! Cek file .env")
+        return
+
+    # Index MongoDB (idempotent), cek query yang sering dipakai & statistik awal
+    await ensure_indexes()
+    await check_query_plans()
+    await ensure_stats()
+
+    bot = Bot(
+        token=BOT_TOKEN,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+
+    # Berhenti dengan rapi saat deploy → job berjalan dikembalikan ke antrean
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    background = [asyncio.create_task(restore_sessions())]
+    if uses_free_proxies():
+        background.append(asyncio.create_task(run_proxy_pool()))
+    # Penulisan user & history di-batch (write-behind)
+    start_write_buffer()
+
+    start_workers(
+        partial(run_check_job, bot), partial(notify_queue_position, bot)
+    )
+    logger.info("Worker antrean berjalan")
+
+    try:
+        await stop.wait()
+    finally:
+        for task in background:
+            task.cancel()
+        # Tunggu task background selesai beres-beres (simpan reputasi proxy)
+        await asyncio.gather(*background, return_exceptions=True)
+        await stop_workers()
+        # Setelah worker berhenti → history terakhir ikut tersimpan
+        await stop_write_buffer()
+        await close_proxy_session()
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())